@@ -52,6 +52,10 @@ __version__ = "0.24.0.dev0"
 # WARNING: any comment added in this dictionary definition will be lost when
 # re-generating the file !
 _SUBMOD_ATTRS = {
+    "_async_download": [
+        "ahf_hub_download",
+        "asnapshot_download",
+    ],
     "_commit_scheduler": [
         "CommitScheduler",
     ],
@@ -62,6 +66,9 @@ _SUBMOD_ATTRS = {
         "InferenceEndpointTimeoutError",
         "InferenceEndpointType",
     ],
+    "_lazy_snapshot": [
+        "LazySnapshot",
+    ],
     "_login": [
         "interpreter_login",
         "login",
@@ -82,6 +89,9 @@ _SUBMOD_ATTRS = {
         "SpaceStorage",
         "SpaceVariable",
     ],
+    "_streaming_download": [
+        "hf_hub_open",
+    ],
     "_tensorboard_logger": [
         "HFSummaryWriter",
     ],
@@ -133,7 +143,9 @@ _SUBMOD_ATTRS = {
         "get_hf_file_metadata",
         "hf_hub_download",
         "hf_hub_url",
+        "open_cached",
         "try_to_load_from_cache",
+        "try_to_load_many_from_cache",
     ],
     "hf_api": [
         "Collection",
@@ -438,13 +450,25 @@ _SUBMOD_ATTRS = {
         "DeleteCacheStrategy",
         "HFCacheInfo",
         "HfFolder",
+        "TransferEvent",
+        "TransferJob",
+        "TransferScheduler",
+        "add_transfer_callback",
         "cached_assets_path",
         "configure_http_backend",
+        "configure_transfer_scheduler",
         "dump_environment_info",
+        "evict_cache",
         "get_session",
         "get_token",
+        "get_transfer_scheduler",
         "logging",
+        "pin_cached_revision",
+        "remove_transfer_callback",
         "scan_cache_dir",
+        "transfer_callback",
+        "transfer_job",
+        "unpin_cached_revision",
     ],
 }
 
@@ -552,6 +576,10 @@ if os.environ.get("EAGER_IMPORT", ""):
 # make style
 # ```
 if TYPE_CHECKING:  # pragma: no cover
+    from ._async_download import (
+        ahf_hub_download,  # noqa: F401
+        asnapshot_download,  # noqa: F401
+    )
     from ._commit_scheduler import CommitScheduler  # noqa: F401
     from ._inference_endpoints import (
         InferenceEndpoint,  # noqa: F401
@@ -560,6 +588,7 @@ if TYPE_CHECKING:  # pragma: no cover
         InferenceEndpointTimeoutError,  # noqa: F401
         InferenceEndpointType,  # noqa: F401
     )
+    from ._lazy_snapshot import LazySnapshot  # noqa: F401
     from ._login import (
         interpreter_login,  # noqa: F401
         login,  # noqa: F401
@@ -578,6 +607,7 @@ if TYPE_CHECKING:  # pragma: no cover
         SpaceStorage,  # noqa: F401
         SpaceVariable,  # noqa: F401
     )
+    from ._streaming_download import hf_hub_open  # noqa: F401
     from ._tensorboard_logger import HFSummaryWriter  # noqa: F401
     from ._webhooks_payload import (
         WebhookPayload,  # noqa: F401
@@ -627,7 +657,9 @@ if TYPE_CHECKING:  # pragma: no cover
         get_hf_file_metadata,  # noqa: F401
         hf_hub_download,  # noqa: F401
         hf_hub_url,  # noqa: F401
+        open_cached,  # noqa: F401
         try_to_load_from_cache,  # noqa: F401
+        try_to_load_many_from_cache,  # noqa: F401
     )
     from .hf_api import (
         Collection,  # noqa: F401
@@ -926,11 +958,23 @@ if TYPE_CHECKING:  # pragma: no cover
         DeleteCacheStrategy,  # noqa: F401
         HFCacheInfo,  # noqa: F401
         HfFolder,  # noqa: F401
+        TransferEvent,  # noqa: F401
+        TransferJob,  # noqa: F401
+        TransferScheduler,  # noqa: F401
+        add_transfer_callback,  # noqa: F401
         cached_assets_path,  # noqa: F401
         configure_http_backend,  # noqa: F401
+        configure_transfer_scheduler,  # noqa: F401
         dump_environment_info,  # noqa: F401
+        evict_cache,  # noqa: F401
         get_session,  # noqa: F401
         get_token,  # noqa: F401
+        get_transfer_scheduler,  # noqa: F401
         logging,  # noqa: F401
+        pin_cached_revision,  # noqa: F401
+        remove_transfer_callback,  # noqa: F401
         scan_cache_dir,  # noqa: F401
+        transfer_callback,  # noqa: F401
+        transfer_job,  # noqa: F401
+        unpin_cached_revision,  # noqa: F401
     )
@@ -0,0 +1,1116 @@
+"""Async counterparts of [`hf_hub_download`] and [`snapshot_download`], built on `aiohttp`.
+
+Files are downloaded to the same cache folder, with the same layout, file locks and metadata semantics as the sync
+methods. This means sync and async downloads can be mixed freely, including concurrently from different processes.
+
+Download tasks are plain coroutines: they can be cancelled at any time (an interrupted download is resumed on next
+call) and do not use any thread for network I/O.
+"""
+
+import asyncio
+import contextlib
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Tuple, Type, Union
+from urllib.parse import quote, urlparse
+
+import requests
+from filelock import BaseFileLock, FileLock, Timeout
+from requests.structures import CaseInsensitiveDict
+
+from . import constants
+from .file_download import (
+    REGEX_COMMIT_HASH,
+    REGEX_SHA256,
+    _cache_commit_hash_for_specific_revision,
+    _check_disk_space,
+    _check_sha256,
+    _check_snapshot_disk_space,
+    _chmod_and_move,
+    _copy_from_cache_tier,
+    _create_symlink,
+    _get_cache_tier_file_metadata,
+    _get_lower_cache_tiers,
+    _get_pointer_path,
+    _get_pointer_path_from_fresh_revision,
+    _get_relative_filename,
+    _get_shared_blob_path,
+    _int_or_none,
+    _link_from_shared_blob_store,
+    _link_to_shared_blob_store,
+    _normalize_etag,
+    _preallocate,
+    _raise_on_head_call_error,
+    _ranges_state_path,
+    _try_to_load_from_cache_dir,
+    hf_hub_url,
+    repo_folder_name,
+)
+from .hf_api import DatasetInfo, ModelInfo, RepoSibling, SpaceInfo
+from .utils import (
+    EntryNotFoundError,
+    FileMetadataError,
+    GatedRepoError,
+    LocalEntryNotFoundError,
+    OfflineModeIsEnabled,
+    RepositoryNotFoundError,
+    RevisionNotFoundError,
+    build_hf_headers,
+    default_transfer_job,
+    filter_repo_objects,
+    get_transfer_scheduler,
+    hf_raise_for_status,
+    is_aiohttp_available,
+    logging,
+    tqdm,
+    validate_hf_hub_args,
+)
+from .utils._cache_eviction import _on_blob_added
+from .utils.insecure_hashlib import sha256
+
+
+if TYPE_CHECKING:
+    import hashlib
+
+    from aiohttp import ClientResponse, ClientSession
+
+
+logger = logging.get_logger(__name__)
+
+# Interval between 2 attempts to acquire a file lock held by another process (or another task)
+_LOCK_POLLING_INTERVAL = 0.1
+
+
+@validate_hf_hub_args
+async def ahf_hub_download(
+    repo_id: str,
+    filename: str,
+    *,
+    subfolder: Optional[str] = None,
+    repo_type: Optional[str] = None,
+    revision: Optional[str] = None,
+    endpoint: Optional[str] = None,
+    cache_dir: Union[str, Path, None] = None,
+    library_name: Optional[str] = None,
+    library_version: Optional[str] = None,
+    user_agent: Union[Dict, str, None] = None,
+    etag_timeout: float = constants.DEFAULT_ETAG_TIMEOUT,
+    force_download: bool = False,
+    token: Union[bool, str, None] = None,
+    local_files_only: bool = False,
+    headers: Optional[Dict[str, str]] = None,
+    session: Optional["ClientSession"] = None,
+) -> str:
+    """Download a given file if it's not already present in the local cache, asynchronously.
+
+    Async counterpart of [`hf_hub_download`]. The file is downloaded to the same cache folder, with the same layout
+    and locking mechanism. Downloading to a `local_dir` is not supported.
+
+    Requires `aiohttp` to be installed (`pip install aiohttp`).
+
+    Args:
+        repo_id (`str`):
+            A user or an organization name and a repo name separated by a `/`.
+        filename (`str`):
+            The name of the file in the repo.
+        subfolder (`str`, *optional*):
+            An optional value corresponding to a folder inside the model repo.
+        repo_type (`str`, *optional*):
+            Set to `"dataset"` or `"space"` if downloading from a dataset or space,
+            `None` or `"model"` if downloading from a model. Default is `None`.
+        revision (`str`, *optional*):
+            An optional Git revision id which can be a branch name, a tag, or a
+            commit hash.
+        endpoint (`str`, *optional*):
+            Hugging Face Hub base url. Will default to https://huggingface.co/. Otherwise, one can set the `HF_ENDPOINT`
+            environment variable.
+        cache_dir (`str`, `Path`, *optional*):
+            Path to the folder where cached files are stored.
+        library_name (`str`, *optional*):
+            The name of the library to which the object corresponds.
+        library_version (`str`, *optional*):
+            The version of the library.
+        user_agent (`dict`, `str`, *optional*):
+            The user-agent info in the form of a dictionary or a string.
+        etag_timeout (`float`, *optional*, defaults to `10`):
+            When fetching ETag, how many seconds to wait for the server to send
+            data before giving up.
+        force_download (`bool`, *optional*, defaults to `False`):
+            Whether the file should be downloaded even if it already exists in
+            the local cache.
+        token (`str`, `bool`, *optional*):
+            A token to be used for the download.
+                - If `True`, the token is read from the HuggingFace config
+                  folder.
+                - If a string, it's used as the authentication token.
+        local_files_only (`bool`, *optional*, defaults to `False`):
+            If `True`, avoid downloading the file and return the path to the
+            local cached file if it exists.
+        headers (`dict`, *optional*):
+            Additional headers to be sent with the request.
+        session (`aiohttp.ClientSession`, *optional*):
+            Session to use to make HTTP calls. If not provided, a new session is created for this call.
+
+    Returns:
+        `str`: Local path of file.
+
+    Raises:
+        [`~utils.RepositoryNotFoundError`]
+            If the repository to download from cannot be found. This may be because it doesn't exist,
+            or because it is set to `private` and you do not have access.
+        [`~utils.RevisionNotFoundError`]
+            If the revision to download from cannot be found.
+        [`~utils.EntryNotFoundError`]
+            If the file to download cannot be found.
+        [`~utils.LocalEntryNotFoundError`]
+            If network is disabled or unavailable and file is not found in cache.
+        [`EnvironmentError`](https://docs.python.org/3/library/exceptions.html#EnvironmentError)
+            If `token=True` but the token cannot be found.
+        [`ValueError`](https://docs.python.org/3/library/exceptions.html#ValueError)
+            If some parameter value is invalid.
+
+    Example:
+    ```py
+    >>> import asyncio
+    >>> from huggingface_hub import ahf_hub_download
+
+    >>> async def main():
+    ...     return await asyncio.gather(
+    ...         ahf_hub_download("gpt2", "config.json"),
+    ...         ahf_hub_download("bert-base-uncased", "config.json"),
+    ...     )
+    >>> asyncio.run(main())
+    ['/root/.cache/huggingface/hub/models--gpt2/snapshots/.../config.json', '/root/.cache/huggingface/hub/models--bert-base-uncased/snapshots/.../config.json']
+    ```
+    """
+    if constants.HF_HUB_ETAG_TIMEOUT != constants.DEFAULT_ETAG_TIMEOUT:
+        # Respect environment variable above user value
+        etag_timeout = constants.HF_HUB_ETAG_TIMEOUT
+
+    if cache_dir is None:
+        cache_dir = constants.HF_HUB_CACHE
+    if revision is None:
+        revision = constants.DEFAULT_REVISION
+    if isinstance(cache_dir, Path):
+        cache_dir = str(cache_dir)
+
+    if subfolder == "":
+        subfolder = None
+    if subfolder is not None:
+        # This is used to create a URL, and not a local path, hence the forward slash.
+        filename = f"{subfolder}/{filename}"
+
+    if repo_type is None:
+        repo_type = "model"
+    if repo_type not in constants.REPO_TYPES:
+        raise ValueError(f"Invalid repo type: {repo_type}. Accepted repo types are: {str(constants.REPO_TYPES)}")
+
+    hf_headers = build_hf_headers(
+        token=token,
+        library_name=library_name,
+        library_version=library_version,
+        user_agent=user_agent,
+        headers=headers,
+    )
+
+    async with _session_or_new(session) as _session:
+        return await _ahf_hub_download_to_cache_dir(
+            session=_session,
+            cache_dir=cache_dir,
+            repo_id=repo_id,
+            filename=filename,
+            repo_type=repo_type,
+            revision=revision,
+            headers=hf_headers,
+            etag_timeout=etag_timeout,
+            endpoint=endpoint,
+            local_files_only=local_files_only,
+            force_download=force_download,
+        )
+
+
+@validate_hf_hub_args
+async def asnapshot_download(
+    repo_id: str,
+    *,
+    repo_type: Optional[str] = None,
+    revision: Optional[str] = None,
+    cache_dir: Union[str, Path, None] = None,
+    library_name: Optional[str] = None,
+    library_version: Optional[str] = None,
+    user_agent: Optional[Union[Dict, str]] = None,
+    etag_timeout: float = constants.DEFAULT_ETAG_TIMEOUT,
+    force_download: bool = False,
+    token: Optional[Union[bool, str]] = None,
+    local_files_only: bool = False,
+    allow_patterns: Optional[Union[List[str], str]] = None,
+    ignore_patterns: Optional[Union[List[str], str]] = None,
+    max_workers: int = 8,
+    headers: Optional[Dict[str, str]] = None,
+    endpoint: Optional[str] = None,
+    session: Optional["ClientSession"] = None,
+) -> str:
+    """Download repo files, asynchronously.
+
+    Async counterpart of [`snapshot_download`]. Files are downloaded to the same cache folder, with the same layout
+    and locking mechanism. Downloading to a `local_dir` is not supported.
+
+    At most `max_workers` files are downloaded concurrently. If a download fails or if the task is cancelled, all
+    other downloads are cancelled as well. Partially downloaded files are resumed on next call.
+
+    Requires `aiohttp` to be installed (`pip install aiohttp`).
+
+    Args:
+        repo_id (`str`):
+            A user or an organization name and a repo name separated by a `/`.
+        repo_type (`str`, *optional*):
+            Set to `"dataset"` or `"space"` if downloading from a dataset or space,
+            `None` or `"model"` if downloading from a model. Default is `None`.
+        revision (`str`, *optional*):
+            An optional Git revision id which can be a branch name, a tag, or a
+            commit hash.
+        cache_dir (`str`, `Path`, *optional*):
+            Path to the folder where cached files are stored.
+        library_name (`str`, *optional*):
+            The name of the library to which the object corresponds.
+        library_version (`str`, *optional*):
+            The version of the library.
+        user_agent (`str`, `dict`, *optional*):
+            The user-agent info in the form of a dictionary or a string.
+        etag_timeout (`float`, *optional*, defaults to `10`):
+            When fetching ETag, how many seconds to wait for the server to send
+            data before giving up.
+        force_download (`bool`, *optional*, defaults to `False`):
+            Whether the file should be downloaded even if it already exists in the local cache.
+        token (`str`, `bool`, *optional*):
+            A token to be used for the download.
+                - If `True`, the token is read from the HuggingFace config
+                  folder.
+                - If a string, it's used as the authentication token.
+        local_files_only (`bool`, *optional*, defaults to `False`):
+            If `True`, avoid downloading the file and return the path to the
+            local cached file if it exists.
+        allow_patterns (`List[str]` or `str`, *optional*):
+            If provided, only files matching at least one pattern are downloaded.
+        ignore_patterns (`List[str]` or `str`, *optional*):
+            If provided, files matching any of the patterns are not downloaded.
+        max_workers (`int`, *optional*):
+            Maximum number of files downloaded concurrently. Defaults to 8.
+        headers (`dict`, *optional*):
+            Additional headers to include in the request. Those headers take precedence over the others.
+        endpoint (`str`, *optional*):
+            Hugging Face Hub base url. Will default to https://huggingface.co/. Otherwise, one can set the `HF_ENDPOINT`
+            environment variable.
+        session (`aiohttp.ClientSession`, *optional*):
+            Session to use to make HTTP calls. If not provided, a new session is created for this call.
+
+    Returns:
+        `str`: folder path of the repo snapshot.
+
+    Raises:
+        [`~utils.RepositoryNotFoundError`]
+            If the repository to download from cannot be found. This may be because it doesn't exist,
+            or because it is set to `private` and you do not have access.
+        [`~utils.RevisionNotFoundError`]
+            If the revision to download from cannot be found.
+        [`~utils.LocalEntryNotFoundError`]
+            If network is disabled or unavailable and the snapshot is not found in cache.
+        [`EnvironmentError`](https://docs.python.org/3/library/exceptions.html#EnvironmentError)
+            If `token=True` and the token cannot be found.
+        [`ValueError`](https://docs.python.org/3/library/exceptions.html#ValueError)
+            if some parameter value is invalid.
+    """
+    if cache_dir is None:
+        cache_dir = constants.HF_HUB_CACHE
+    if revision is None:
+        revision = constants.DEFAULT_REVISION
+    if isinstance(cache_dir, Path):
+        cache_dir = str(cache_dir)
+
+    if repo_type is None:
+        repo_type = "model"
+    if repo_type not in constants.REPO_TYPES:
+        raise ValueError(f"Invalid repo type: {repo_type}. Accepted repo types are: {str(constants.REPO_TYPES)}")
+
+    storage_folder = os.path.join(cache_dir, repo_folder_name(repo_id=repo_id, repo_type=repo_type))
+    hf_headers = build_hf_headers(
+        token=token,
+        library_name=library_name,
+        library_version=library_version,
+        user_agent=user_agent,
+        headers=headers,
+    )
+
+    async with _session_or_new(session) as _session:
+        repo_info: Union[ModelInfo, DatasetInfo, SpaceInfo, None] = None
+        api_call_error: Optional[Exception] = None
+        if not local_files_only:
+            # try/except logic to handle different errors => taken from `snapshot_download`
+            try:
+                repo_info = await _arepo_info(
+                    _session,
+                    repo_id=repo_id,
+                    repo_type=repo_type,
+                    revision=revision,
+                    endpoint=endpoint,
+                    headers=hf_headers,
+                )
+            except _network_errors(OfflineModeIsEnabled) as error:
+                # Internet connection is down
+                # => will try to use local files only
+                api_call_error = error
+            except RevisionNotFoundError:
+                # The repo was found but the revision doesn't exist on the Hub (never existed or got deleted)
+                raise
+            except requests.HTTPError as error:
+                # Repo is private/gated and invalid/missing token sent or Hub is down
+                # => let's switch to 'local_files_only=True' to check if the files are already cached.
+                api_call_error = error
+
+        # Cannot fetch repo info => look for the appropriate folder in the cache (same as `snapshot_download`)
+        if repo_info is None:
+            commit_hash = None
+            if REGEX_COMMIT_HASH.match(revision):
+                commit_hash = revision
+            else:
+                ref_path = os.path.join(storage_folder, "refs", revision)
+                if os.path.exists(ref_path):
+                    with open(ref_path) as f:
+                        commit_hash = f.read()
+
+            if commit_hash is not None:
+                snapshot_folder = os.path.join(storage_folder, "snapshots", commit_hash)
+                if os.path.exists(snapshot_folder):
+                    return snapshot_folder
+
+            if local_files_only or isinstance(api_call_error, OfflineModeIsEnabled):
+                raise LocalEntryNotFoundError(
+                    "Cannot find an appropriate cached snapshot folder for the specified revision on the local disk and "
+                    "outgoing traffic has been disabled."
+                ) from api_call_error
+            elif isinstance(api_call_error, RepositoryNotFoundError) or isinstance(api_call_error, GatedRepoError):
+                raise api_call_error
+            else:
+                raise LocalEntryNotFoundError(
+                    "An error happened while trying to locate the files on the Hub and we cannot find the appropriate"
+                    " snapshot folder for the specified revision on the local disk. Please check your internet"
+                    " connection and try again."
+                ) from api_call_error
+
+        assert repo_info.sha is not None, "Repo info returned from server must have a revision sha."
+        assert repo_info.siblings is not None, "Repo info returned from server must have a siblings list."
+        siblings: Dict[str, RepoSibling] = {sibling.rfilename: sibling for sibling in repo_info.siblings}
+        filtered_repo_files = list(
+            filter_repo_objects(items=list(siblings), allow_patterns=allow_patterns, ignore_patterns=ignore_patterns)
+        )
+
+        def _file_size(repo_file: str) -> int:
+            sibling = siblings[repo_file]
+            return (sibling.lfs.size if sibling.lfs is not None else sibling.size) or 0
+
+        # Largest files first (same as `snapshot_download`) => the biggest file does not become the long tail
+        filtered_repo_files.sort(key=_file_size, reverse=True)
+        commit_hash = repo_info.sha
+        snapshot_folder = os.path.join(storage_folder, "snapshots", commit_hash)
+        _cache_commit_hash_for_specific_revision(storage_folder, revision, commit_hash)
+
+        def _is_cached(repo_file: str) -> bool:
+            sibling = siblings[repo_file]
+            etag = sibling.lfs.sha256 if sibling.lfs is not None else sibling.blob_id
+            return etag is not None and os.path.exists(os.path.join(storage_folder, "blobs", etag))
+
+        # Fail fast if the snapshot doesn't fit on disk (blobs already cached are not downloaded again)
+        _check_snapshot_disk_space(
+            sum(_file_size(f) for f in filtered_repo_files if force_download or not _is_cached(f)), storage_folder
+        )
+
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def _inner_download(repo_file: str, progress: tqdm) -> None:
+            async with semaphore:
+                sibling = siblings[repo_file]
+                if sibling.blob_id is not None and sibling.size is not None:
+                    # Files metadata are known from the repo listing => no HEAD call
+                    await _ahf_hub_download_blob_to_cache_dir(
+                        session=_session,
+                        cache_dir=cache_dir,
+                        repo_id=repo_id,
+                        repo_type=repo_type,
+                        filename=repo_file,
+                        revision=commit_hash,
+                        commit_hash=commit_hash,
+                        etag=sibling.lfs.sha256 if sibling.lfs is not None else sibling.blob_id,
+                        url_to_download=hf_hub_url(
+                            repo_id, repo_file, repo_type=repo_type, revision=commit_hash, endpoint=endpoint
+                        ),
+                        expected_size=sibling.lfs.size if sibling.lfs is not None else sibling.size,
+                        headers=dict(hf_headers),
+                        force_download=force_download,
+                    )
+                else:
+                    await _ahf_hub_download_to_cache_dir(
+                        session=_session,
+                        cache_dir=cache_dir,
+                        repo_id=repo_id,
+                        filename=repo_file,
+                        repo_type=repo_type,
+                        revision=commit_hash,
+                        headers=dict(hf_headers),
+                        etag_timeout=etag_timeout,
+                        endpoint=endpoint,
+                        local_files_only=False,
+                        force_download=force_download,
+                    )
+            progress.update(_file_size(repo_file))
+
+        # Progress is reported in bytes, same as `snapshot_download`
+        with tqdm(
+            total=sum(_file_size(repo_file) for repo_file in filtered_repo_files),
+            unit="B",
+            unit_scale=True,
+            desc=f"Fetching {len(filtered_repo_files)} files",
+            name="huggingface_hub.snapshot_download",
+        ) as progress, default_transfer_job(name=repo_id):
+            # Tasks inherit the current context => all files are downloaded as a single transfer job
+            tasks = [asyncio.ensure_future(_inner_download(repo_file, progress)) for repo_file in filtered_repo_files]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                # A download failed or the task has been cancelled => cancel all other downloads
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+
+    return snapshot_folder
+
+
+async def _ahf_hub_download_to_cache_dir(
+    *,
+    session: "ClientSession",
+    # Destination
+    cache_dir: str,
+    # File info
+    repo_id: str,
+    filename: str,
+    repo_type: str,
+    revision: str,
+    # HTTP info
+    headers: Dict[str, str],
+    etag_timeout: float,
+    endpoint: Optional[str],
+    # Additional options
+    local_files_only: bool,
+    force_download: bool,
+) -> str:
+    """Async version of `_hf_hub_download_to_cache_dir`."""
+    storage_folder = os.path.join(cache_dir, repo_folder_name(repo_id=repo_id, repo_type=repo_type))
+    relative_filename = _get_relative_filename(filename)
+
+    # if user provides a commit_hash and they already have the file on disk, shortcut everything.
+    if REGEX_COMMIT_HASH.match(revision):
+        pointer_path = _get_pointer_path(storage_folder, revision, relative_filename)
+        if os.path.exists(pointer_path) and not force_download:
+            return pointer_path
+
+    # if the revision has been resolved recently (see `HF_HUB_REVISION_CACHE_TTL`), same shortcut.
+    if not force_download:
+        cached_path = _get_pointer_path_from_fresh_revision(storage_folder, revision, relative_filename)
+        if cached_path is not None:
+            return cached_path
+
+    # Try to get metadata (etag, commit_hash, url, size) from the server.
+    # If we can't, a HEAD request error is returned.
+    (url_to_download, etag, commit_hash, expected_size, head_call_error) = await _aget_metadata_or_catch_error(
+        session=session,
+        repo_id=repo_id,
+        filename=filename,
+        repo_type=repo_type,
+        revision=revision,
+        endpoint=endpoint,
+        etag_timeout=etag_timeout,
+        headers=headers,
+        local_files_only=local_files_only,
+        storage_folder=storage_folder,
+        relative_filename=relative_filename,
+    )
+
+    if head_call_error is not None:
+        # Couldn't make a HEAD call => let's try to find a local file
+        if not force_download:
+            commit_hash = None
+            if REGEX_COMMIT_HASH.match(revision):
+                commit_hash = revision
+            else:
+                ref_path = os.path.join(storage_folder, "refs", revision)
+                if os.path.isfile(ref_path):
+                    with open(ref_path) as f:
+                        commit_hash = f.read()
+
+            # Return pointer file if exists
+            if commit_hash is not None:
+                pointer_path = _get_pointer_path(storage_folder, commit_hash, relative_filename)
+                if os.path.exists(pointer_path):
+                    return pointer_path
+
+            # Multi-tier cache (see `HF_HUB_CACHE_TIERS`) => file might be cached in a lower tier
+            for tier in _get_lower_cache_tiers(cache_dir):
+                cached_path = _try_to_load_from_cache_dir(repo_id, filename, tier, revision, repo_type)
+                if not isinstance(cached_path, str):
+                    continue
+                tier_metadata = _get_cache_tier_file_metadata(tier, storage_folder, cached_path)
+                if tier_metadata is None:
+                    return cached_path
+                # Promote the file to the first tier so that next loads are fast, even offline
+                tier_commit_hash, tier_etag, tier_size = tier_metadata
+                return await _ahf_hub_download_blob_to_cache_dir(
+                    session=session,
+                    cache_dir=cache_dir,
+                    repo_id=repo_id,
+                    repo_type=repo_type,
+                    filename=filename,
+                    revision=revision,
+                    commit_hash=tier_commit_hash,
+                    etag=tier_etag,
+                    url_to_download=hf_hub_url(
+                        repo_id, filename, repo_type=repo_type, revision=tier_commit_hash, endpoint=endpoint
+                    ),
+                    expected_size=tier_size,
+                    headers=headers,
+                    force_download=False,
+                )
+
+        # Otherwise, raise appropriate error
+        _raise_on_head_call_error(head_call_error, force_download, local_files_only)
+
+    # From now on, etag, commit_hash, url and size are not None.
+    assert etag is not None, "etag must have been retrieved from server"
+    assert commit_hash is not None, "commit_hash must have been retrieved from server"
+    assert url_to_download is not None, "file location must have been retrieved from server"
+    assert expected_size is not None, "expected_size must have been retrieved from server"
+    return await _ahf_hub_download_blob_to_cache_dir(
+        session=session,
+        cache_dir=cache_dir,
+        repo_id=repo_id,
+        repo_type=repo_type,
+        filename=filename,
+        revision=revision,
+        commit_hash=commit_hash,
+        etag=etag,
+        url_to_download=url_to_download,
+        expected_size=expected_size,
+        headers=headers,
+        force_download=force_download,
+    )
+
+
+async def _ahf_hub_download_blob_to_cache_dir(
+    *,
+    session: "ClientSession",
+    # Destination
+    cache_dir: str,
+    # File info
+    repo_id: str,
+    repo_type: str,
+    filename: str,
+    revision: str,
+    # File metadata
+    commit_hash: str,
+    etag: str,
+    url_to_download: str,
+    expected_size: int,
+    # HTTP info
+    headers: Dict[str, str],
+    # Additional options
+    force_download: bool,
+) -> str:
+    """Async version of `_hf_hub_download_blob_to_cache_dir`."""
+    locks_dir = os.path.join(cache_dir, ".locks")
+    storage_folder = os.path.join(cache_dir, repo_folder_name(repo_id=repo_id, repo_type=repo_type))
+    relative_filename = _get_relative_filename(filename)
+
+    blob_path = os.path.join(storage_folder, "blobs", etag)
+    pointer_path = _get_pointer_path(storage_folder, commit_hash, relative_filename)
+
+    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+    os.makedirs(os.path.dirname(pointer_path), exist_ok=True)
+
+    # if passed revision is not identical to commit_hash
+    # then revision has to be a branch name or tag name.
+    # In that case store a ref.
+    _cache_commit_hash_for_specific_revision(storage_folder, revision, commit_hash)
+
+    # If file already exists, return it (except if force_download=True)
+    if not force_download:
+        if os.path.exists(pointer_path):
+            return pointer_path
+
+        if os.path.exists(blob_path):
+            # we have the blob already, but not the pointer
+            _create_symlink(blob_path, pointer_path, new_blob=False)
+            return pointer_path
+
+    # Same lock as sync downloads => a file is never downloaded twice concurrently, even across processes
+    lock_path = os.path.join(locks_dir, repo_folder_name(repo_id=repo_id, repo_type=repo_type), f"{etag}.lock")
+    shared_blob_path = _get_shared_blob_path(cache_dir, etag) if constants.HF_HUB_ENABLE_SHARED_BLOBS else None
+    if shared_blob_path is not None:
+        lock_path = os.path.join(locks_dir, "blobs", f"{etag}.lock")
+
+    # Some Windows versions do not allow for paths longer than 255 characters.
+    # In this case, we must specify it is an extended path by using the "\\?\" prefix.
+    if os.name == "nt" and len(os.path.abspath(lock_path)) > 255:
+        lock_path = "\\\\?\\" + os.path.abspath(lock_path)
+
+    if os.name == "nt" and len(os.path.abspath(blob_path)) > 255:
+        blob_path = "\\\\?\\" + os.path.abspath(blob_path)
+
+    added_size = 0  # bytes added to the cache, tracked for eviction (hardlinks add nothing)
+    lower_tiers = _get_lower_cache_tiers(cache_dir)
+    Path(lock_path).parent.mkdir(parents=True, exist_ok=True)
+    async with _async_weak_file_lock(lock_path):
+        if os.path.exists(blob_path) and not force_download:
+            # Blob added by another process while waiting for the lock => nothing to do
+            pass
+        elif (
+            shared_blob_path is not None
+            and not force_download
+            and _link_from_shared_blob_store(shared_blob_path, blob_path)
+        ):
+            logger.info(f"Reusing blob '{etag}' from shared blob store for '{filename}'.")
+        elif len(lower_tiers) > 0 and not force_download:
+            # Same as sync downloads (see `HF_HUB_CACHE_TIERS`): copy from a lower tier, downloading to the last one
+            tier_blob_paths = [
+                os.path.join(tier, os.path.basename(storage_folder), "blobs", etag) for tier in lower_tiers
+            ]
+            tier_blob_path = next((path for path in tier_blob_paths if os.path.exists(path)), None)
+            if tier_blob_path is None:
+                tier_pointer_path = await _ahf_hub_download_blob_to_cache_dir(
+                    session=session,
+                    cache_dir=lower_tiers[-1],
+                    repo_id=repo_id,
+                    repo_type=repo_type,
+                    filename=filename,
+                    revision=revision,
+                    commit_hash=commit_hash,
+                    etag=etag,
+                    url_to_download=url_to_download,
+                    expected_size=expected_size,
+                    headers=headers,
+                    force_download=False,
+                )
+                tier_blob_path = os.path.realpath(tier_pointer_path)
+            await asyncio.get_running_loop().run_in_executor(None, _copy_from_cache_tier, tier_blob_path, blob_path)
+            added_size = expected_size
+        else:
+            # Blob can only exist here if `force_download=True` => replaced, no bytes added
+            added_size = 0 if os.path.exists(blob_path) else expected_size
+            await _adownload_to_tmp_and_move(
+                session=session,
+                incomplete_path=Path(blob_path + ".incomplete"),
+                destination_path=Path(blob_path),
+                url_to_download=url_to_download,
+                headers=headers,
+                expected_size=expected_size,
+                filename=filename,
+                force_download=force_download,
+                etag=etag,
+            )
+            if shared_blob_path is not None:
+                _link_to_shared_blob_store(blob_path, shared_blob_path)
+        _create_symlink(blob_path, pointer_path, new_blob=True)
+
+    if added_size > 0:
+        # Same as sync downloads (see `HF_HUB_CACHE_MAX_SIZE`), without blocking the event loop
+        await asyncio.get_running_loop().run_in_executor(None, _on_blob_added, cache_dir, added_size)
+
+    return pointer_path
+
+
+async def _aget_metadata_or_catch_error(
+    *,
+    session: "ClientSession",
+    repo_id: str,
+    filename: str,
+    repo_type: str,
+    revision: str,
+    endpoint: Optional[str],
+    etag_timeout: Optional[float],
+    headers: Dict[str, str],  # mutated inplace!
+    local_files_only: bool,
+    relative_filename: str,
+    storage_folder: str,
+) -> Union[Tuple[None, None, None, None, Exception], Tuple[str, str, str, int, None]]:
+    """Async version of `_get_metadata_or_catch_error`.
+
+    NOTE: This function mutates `headers` inplace! It removes the `authorization` header
+          if the file is a LFS blob and the domain of the url is different from the
+          domain of the location (typically an S3 bucket).
+    """
+    if local_files_only:
+        return (
+            None,
+            None,
+            None,
+            None,
+            OfflineModeIsEnabled(
+                f"Cannot access file since 'local_files_only=True' as been set. (repo_id: {repo_id}, repo_type: {repo_type}, revision: {revision}, filename: {filename})"
+            ),
+        )
+
+    url = hf_hub_url(repo_id, filename, repo_type=repo_type, revision=revision, endpoint=endpoint)
+    url_to_download = url
+    try:
+        try:
+            response = await _arequest(
+                session,
+                "HEAD",
+                url,
+                # prevent any compression => we want to know the real size of the file
+                headers={**headers, "Accept-Encoding": "identity"},
+                timeout=etag_timeout,
+                follow_relative_redirects=True,
+            )
+            hf_raise_for_status(response)
+        except EntryNotFoundError as http_error:
+            # Cache the non-existence of the file
+            commit_hash = (
+                http_error.response.headers.get(constants.HUGGINGFACE_HEADER_X_REPO_COMMIT)
+                if http_error.response is not None
+                else None
+            )
+            if commit_hash is not None:
+                no_exist_file_path = Path(storage_folder) / ".no_exist" / commit_hash / relative_filename
+                no_exist_file_path.parent.mkdir(parents=True, exist_ok=True)
+                no_exist_file_path.touch()
+                _cache_commit_hash_for_specific_revision(storage_folder, revision, commit_hash)
+            raise
+
+        commit_hash = response.headers.get(constants.HUGGINGFACE_HEADER_X_REPO_COMMIT)
+        if commit_hash is None:
+            raise FileMetadataError(
+                "Distant resource does not seem to be on huggingface.co. It is possible that a configuration issue"
+                " prevents you from downloading resources from https://huggingface.co. Please check your firewall"
+                " and proxy settings and make sure your SSL certificates are updated."
+            )
+        etag = _normalize_etag(
+            response.headers.get(constants.HUGGINGFACE_HEADER_X_LINKED_ETAG) or response.headers.get("ETag")
+        )
+        if etag is None:
+            raise FileMetadataError(
+                "Distant resource does not have an ETag, we won't be able to reliably ensure reproducibility."
+            )
+        expected_size = _int_or_none(
+            response.headers.get(constants.HUGGINGFACE_HEADER_X_LINKED_SIZE) or response.headers.get("Content-Length")
+        )
+        if expected_size is None:
+            raise FileMetadataError("Distant resource does not have a Content-Length.")
+
+        # Download from the redirected location (CDN) directly. Don't send auth to another domain.
+        location = response.headers.get("Location") or response.url
+        if url != location:
+            url_to_download = location
+            if urlparse(url).netloc != urlparse(location).netloc:
+                headers.pop("authorization", None)
+    except _network_errors(OfflineModeIsEnabled) as error:
+        # Internet connection is down
+        return (None, None, None, None, error)
+    except (RevisionNotFoundError, EntryNotFoundError):
+        # The repo was found but the revision or entry doesn't exist on the Hub (never existed or got deleted)
+        raise
+    except (requests.HTTPError, FileMetadataError) as error:
+        # Repo is private/gated and invalid/missing token sent, Hub is down or network is misconfigured
+        # => let's switch to 'local_files_only=True' to check if the files are already cached.
+        return (None, None, None, None, error)
+
+    return (url_to_download, etag, commit_hash, expected_size, None)
+
+
+async def _adownload_to_tmp_and_move(
+    *,
+    session: "ClientSession",
+    incomplete_path: Path,
+    destination_path: Path,
+    url_to_download: str,
+    headers: Dict[str, str],
+    expected_size: int,
+    filename: str,
+    force_download: bool,
+    etag: str,
+) -> None:
+    """Async version of `_download_to_tmp_and_move`.
+
+    Content is streamed to `incomplete_path` (resuming from existing content if any), checked against `expected_size`
+    and `etag` (if sha256) and moved to `destination_path`.
+    """
+    if destination_path.exists() and not force_download:
+        # Do nothing if already exists (except if force_download=True)
+        return
+
+    ranges_state_path = _ranges_state_path(incomplete_path)
+    if incomplete_path.exists() and (force_download or ranges_state_path.exists()):
+        # Do not resume download if force_download=True or if the incomplete file has been preallocated by a
+        # download with concurrent range requests (content is not contiguous).
+        logger.info(f"Removing incomplete file '{incomplete_path}'")
+        incomplete_path.unlink(missing_ok=True)
+    ranges_state_path.unlink(missing_ok=True)
+
+    expected_sha256 = etag if REGEX_SHA256.match(etag) is not None else None
+
+    with incomplete_path.open("ab") as f:
+        resume_size = f.tell()
+        message = f"Downloading '{filename}' to '{incomplete_path}'"
+        if resume_size > 0:
+            message += f" (resume from {resume_size}/{expected_size})"
+        logger.info(message)
+
+        # Check disk space in both tmp and destination path
+        _check_disk_space(expected_size, incomplete_path.parent)
+        _check_disk_space(expected_size, destination_path.parent)
+        if resume_size < expected_size:
+            # Reserve disk space upfront, without changing the file size (content is appended)
+            _preallocate(f.fileno(), expected_size, keep_size=True)
+
+        sha = None
+        if expected_sha256 is not None:
+            sha = sha256()
+            if resume_size > 0:
+                # Hash the content already on disk in a thread to avoid blocking the event loop
+                await asyncio.get_running_loop().run_in_executor(None, _hash_file, incomplete_path, sha)
+
+        await _ahttp_get(
+            session,
+            url_to_download,
+            f,
+            resume_size=resume_size,
+            headers=headers,
+            expected_size=expected_size,
+            displayed_filename=filename,
+            sha=sha,
+        )
+
+    if sha is not None and expected_sha256 is not None:
+        _check_sha256(incomplete_path, sha.hexdigest(), expected_sha256, filename=filename)
+
+    logger.info(f"Download complete. Moving file to {destination_path}")
+    _chmod_and_move(incomplete_path, destination_path)
+
+
+async def _ahttp_get(
+    session: "ClientSession",
+    url: str,
+    temp_file,
+    *,
+    resume_size: int,
+    headers: Dict[str, str],
+    expected_size: int,
+    displayed_filename: str,
+    sha: Optional["hashlib._Hash"] = None,
+) -> None:
+    """Async version of `http_get`. Stream a remote file to `temp_file`, resuming on transient network errors."""
+    aiohttp = _import_aiohttp()
+    if len(displayed_filename) > 40:
+        displayed_filename = f"(…){displayed_filename[-40:]}"
+
+    nb_retries = 5
+    scheduler = get_transfer_scheduler()
+    with tqdm(
+        unit="B",
+        unit_scale=True,
+        total=expected_size,
+        initial=resume_size,
+        desc=displayed_filename,
+        disable=True if (logger.getEffectiveLevel() == logging.NOTSET) else None,
+        name="huggingface_hub.http_get",
+    ) as progress:
+        while True:
+            request_headers = {**headers, "Accept-Encoding": "identity"}  # bytes on disk must match the byte range
+            if resume_size > 0:
+                request_headers["Range"] = f"bytes={resume_size}-"
+            try:
+                async with scheduler.aconnection(), session.get(
+                    url,
+                    headers=request_headers,
+                    timeout=aiohttp.ClientTimeout(
+                        sock_connect=constants.HF_HUB_DOWNLOAD_TIMEOUT, sock_read=constants.HF_HUB_DOWNLOAD_TIMEOUT
+                    ),
+                ) as response:
+                    if response.status >= 400:
+                        hf_raise_for_status(_to_requests_response("GET", response, await response.read()))
+                    # Server does not support range requests => skip the bytes we already have
+                    to_skip = resume_size if response.status != 206 else 0
+                    async for chunk in response.content.iter_chunked(constants.DOWNLOAD_CHUNK_SIZE):
+                        if to_skip > 0:
+                            skipped = min(to_skip, len(chunk))
+                            to_skip -= skipped
+                            chunk = chunk[skipped:]
+                            if not chunk:
+                                continue
+                        await scheduler.athrottle(len(chunk))
+                        # Writing and hashing a chunk takes tens of ms => in a thread to avoid blocking the event loop
+                        await asyncio.get_running_loop().run_in_executor(None, _write_chunk, temp_file, chunk, sha)
+                        resume_size += len(chunk)
+                        progress.update(len(chunk))
+                        # Some data has been downloaded from the server so we reset the number of retries.
+                        nb_retries = 5
+                break
+            except _network_errors(aiohttp.ClientPayloadError) as e:
+                # Transient error (network outage?) => log a warning and try to resume the download
+                if nb_retries <= 0:
+                    logger.warning("Error while downloading from %s: %s\nMax retries exceeded.", url, str(e))
+                    raise
+                logger.warning("Error while downloading from %s: %s\nTrying to resume download...", url, str(e))
+                nb_retries -= 1
+                await asyncio.sleep(1)
+
+    if expected_size != temp_file.tell():
+        raise EnvironmentError(
+            f"Consistency check failed: file should be of size {expected_size} but has size {temp_file.tell()}"
+            f" ({displayed_filename}).\nWe are sorry for the inconvenience. Please retry with `force_download=True`."
+            "\nIf the issue persists, please let us know by opening an issue on"
+            " https://github.com/huggingface/huggingface_hub."
+        )
+
+
+def _write_chunk(temp_file, chunk: bytes, sha: Optional["hashlib._Hash"]) -> None:
+    temp_file.write(chunk)
+    if sha is not None:
+        sha.update(chunk)
+
+
+async def _arepo_info(
+    session: "ClientSession",
+    *,
+    repo_id: str,
+    repo_type: str,
+    revision: str,
+    endpoint: Optional[str],
+    headers: Dict[str, str],
+) -> Union[ModelInfo, DatasetInfo, SpaceInfo]:
+    """Async version of `HfApi.repo_info(..., files_metadata=True)`."""
+    url = f"{endpoint or constants.ENDPOINT}/api/{repo_type}s/{repo_id}/revision/{quote(revision, safe='')}"
+    response = await _arequest(session, "GET", f"{url}?blobs=True", headers=headers, timeout=None, read_body=True)
+    hf_raise_for_status(response)
+    data = response.json()
+    if repo_type == "dataset":
+        return DatasetInfo(**data)
+    if repo_type == "space":
+        return SpaceInfo(**data)
+    return ModelInfo(**data)
+
+
+async def _arequest(
+    session: "ClientSession",
+    method: str,
+    url: str,
+    *,
+    headers: Dict[str, str],
+    timeout: Optional[float],
+    follow_relative_redirects: bool = False,
+    read_body: bool = False,
+) -> requests.Response:
+    """Make an HTTP call with `aiohttp` and return it as a `requests.Response`.
+
+    Returning a `requests.Response` makes it possible to reuse `hf_raise_for_status` and get the exact same errors as
+    the sync methods. Like `_request_wrapper`, relative redirects are followed if `follow_relative_redirects=True` (repo
+    renamed) but not absolute ones (LFS file stored on a CDN). Only small bodies are expected (API calls).
+    """
+    if constants.HF_HUB_OFFLINE:
+        raise OfflineModeIsEnabled(
+            f"Cannot reach {url}: offline mode is enabled. To disable it, please unset the `HF_HUB_OFFLINE` environment"
+            " variable."
+        )
+    aiohttp = _import_aiohttp()
+    async with session.request(
+        method,
+        url,
+        headers=headers,
+        allow_redirects=False,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+    ) as response:
+        body = await response.read() if (read_body or response.status >= 400) else b""
+        requests_response = _to_requests_response(method, response, body)
+
+    if follow_relative_redirects and 300 <= requests_response.status_code <= 399:
+        parsed_target = urlparse(requests_response.headers["Location"])
+        if parsed_target.netloc == "":
+            # Relative redirect => follow it (same logic as `_request_wrapper`)
+            next_url = urlparse(url)._replace(path=parsed_target.path).geturl()
+            return await _arequest(
+                session,
+                method,
+                next_url,
+                headers=headers,
+                timeout=timeout,
+                follow_relative_redirects=True,
+                read_body=read_body,
+            )
+    return requests_response
+
+
+def _to_requests_response(method: str, response: "ClientResponse", body: bytes) -> requests.Response:
+    """Convert an `aiohttp` response into a `requests.Response` (to reuse `hf_raise_for_status`)."""
+    requests_response = requests.Response()
+    requests_response.status_code = response.status
+    requests_response.reason = response.reason or ""
+    requests_response.headers = CaseInsensitiveDict(response.headers)
+    requests_response.url = str(response.url)
+    requests_response._content = body
+    requests_response.request = requests.Request(
+        method=method, url=str(response.request_info.url), headers=dict(response.request_info.headers)
+    ).prepare()
+    return requests_response
+
+
+@contextlib.asynccontextmanager
+async def _async_weak_file_lock(lock_file: Union[str, Path]) -> AsyncIterator[BaseFileLock]:
+    """Async version of `WeakFileLock`: the event loop is not blocked while waiting for the lock."""
+    lock = FileLock(lock_file)
+    while True:
+        try:
+            lock.acquire(timeout=0)
+            break
+        except Timeout:
+            await asyncio.sleep(_LOCK_POLLING_INTERVAL)  # cancellation point
+
+    try:
+        yield lock
+    finally:
+        try:
+            lock.release()
+        except OSError:
+            try:
+                Path(lock_file).unlink()
+            except OSError:
+                pass
+
+
+@contextlib.asynccontextmanager
+async def _session_or_new(session: Optional["ClientSession"]) -> AsyncIterator["ClientSession"]:
+    """Yield the provided session or a new one (closed on exit)."""
+    if session is not None:
+        yield session
+        return
+    aiohttp = _import_aiohttp()
+    async with aiohttp.ClientSession(trust_env=True) as new_session:
+        yield new_session
+
+
+def _hash_file(path: Path, sha: "hashlib._Hash") -> None:
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(constants.DOWNLOAD_CHUNK_SIZE), b""):
+            sha.update(chunk)
+
+
+def _network_errors(*extra_errors: Type[Exception]) -> Tuple[Type[Exception], ...]:
+    """Errors considered as 'network unavailable' (similar to `requests.ConnectionError` and `requests.Timeout`)."""
+    aiohttp = _import_aiohttp()
+    return (aiohttp.ClientConnectionError, asyncio.TimeoutError, *extra_errors)
+
+
+def _import_aiohttp():
+    # Make sure `aiohttp` is installed on the machine.
+    if not is_aiohttp_available():
+        raise ImportError("Please install aiohttp to use async download methods (`pip install aiohttp`).")
+    import aiohttp
+
+    return aiohttp
@@ -0,0 +1,323 @@
+# coding=utf-8
+# Copyright 2024-present, the HuggingFace Inc. team.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Contains a HTTP server exposing a local cache directory with the same routes as the Hub.
+
+Machines of a cluster can download files from a peer instead of the Hub by setting `HF_ENDPOINT` to the address of
+the server. Files are served from the cache of the server. Missing files are downloaded from the Hub into that cache
+first, so that each file is downloaded from the Hub only once for the whole cluster.
+"""
+
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import unquote, urlparse
+
+import requests
+
+from . import constants
+from .file_download import get_hf_file_metadata, hf_hub_download, hf_hub_url, repo_folder_name
+from .utils import EntryNotFoundError, HfHubHTTPError, LocalEntryNotFoundError, get_session, logging
+
+
+logger = logging.get_logger(__name__)
+
+# Headers forwarded from the client to the Hub and from the Hub to the client
+_FORWARDED_REQUEST_HEADERS = ("authorization", "user-agent", "accept")
+_FORWARDED_ERROR_HEADERS = (
+    "X-Error-Code",
+    "X-Error-Message",
+    "X-Request-Id",
+    constants.HUGGINGFACE_HEADER_X_REPO_COMMIT,
+)
+_HOP_BY_HOP_HEADERS = ("connection", "keep-alive", "transfer-encoding", "content-encoding", "content-length")
+
+# Repo info at a given commit never changes => can be cached in memory
+_REGEX_IMMUTABLE_API_PATH = re.compile(r"^/api/(models|datasets|spaces)/.+/revision/[0-9a-f]{40}$")
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class _RangeNotSatisfiable(Exception):
+    pass
+
+
+class CacheServer(ThreadingHTTPServer):
+    """HTTP server exposing a local cache directory through the same routes as the Hub.
+
+    See `serve_cache`.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        server_address: Tuple[str, int],
+        cache_dir: Union[str, Path, None] = None,
+        endpoint: Optional[str] = None,
+    ) -> None:
+        super().__init__(server_address, _CacheRequestHandler)
+        self.cache_dir = str(cache_dir if cache_dir is not None else constants.HF_HUB_CACHE)
+        self.endpoint = (endpoint or constants.ENDPOINT).rstrip("/")
+        self._api_cache: Dict[Tuple[str, Optional[str]], Tuple[int, Dict[str, str], bytes]] = {}
+        self._api_cache_lock = threading.Lock()
+
+
+class _CacheRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    server: CacheServer
+
+    def do_HEAD(self) -> None:
+        self._handle(send_body=False)
+
+    def do_GET(self) -> None:
+        self._handle(send_body=True)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.info(f"{self.address_string()} - {format % args}")
+
+    def end_headers(self) -> None:
+        self._headers_sent = True
+        super().end_headers()
+
+    def _handle(self, send_body: bool) -> None:
+        self._headers_sent = False
+        try:
+            resolved = _parse_resolve_path(urlparse(self.path).path)
+            if resolved is not None:
+                self._serve_file(*resolved, send_body=send_body)
+            else:
+                self._proxy(send_body=send_body)
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug(f"Client disconnected while serving {self.path}")
+        except Exception as e:
+            logger.error(f"Error while serving {self.path}: {e}", exc_info=True)
+            if self._headers_sent:
+                # Response already started => cannot send an error, the client will see a truncated response
+                self.close_connection = True
+            else:
+                self._send_error(500, f"Internal server error: {e}")
+
+    def _serve_file(self, repo_type: str, repo_id: str, revision: str, filename: str, send_body: bool) -> None:
+        try:
+            # Cached files are returned directly, missing ones are downloaded from the Hub first
+            path = hf_hub_download(
+                repo_id=repo_id,
+                filename=filename,
+                repo_type=repo_type,
+                revision=revision,
+                cache_dir=self.server.cache_dir,
+                endpoint=self.server.endpoint,
+                token=self._client_token(),
+            )
+        except LocalEntryNotFoundError as e:
+            # File not cached and Hub unreachable
+            return self._send_error(502, str(e))
+        except HfHubHTTPError as e:
+            if e.response is not None:
+                headers = {
+                    name: e.response.headers[name] for name in _FORWARDED_ERROR_HEADERS if name in e.response.headers
+                }
+                return self._send_error(e.response.status_code, str(e), headers=headers)
+            if isinstance(e, EntryNotFoundError):  # non-existence of the file is cached
+                return self._send_error(404, str(e), headers={"X-Error-Code": "EntryNotFound"})
+            raise
+
+        snapshots_dir = os.path.join(
+            self.server.cache_dir, repo_folder_name(repo_id=repo_id, repo_type=repo_type), "snapshots"
+        )
+        commit_hash = Path(os.path.relpath(path, snapshots_dir)).parts[0]
+        blob_path = os.path.realpath(path)
+        if os.path.basename(os.path.dirname(blob_path)) == "blobs":
+            etag = os.path.basename(blob_path)
+        else:
+            # Cache without symlinks => etag is not part of the path
+            url = hf_hub_url(
+                repo_id, filename, repo_type=repo_type, revision=commit_hash, endpoint=self.server.endpoint
+            )
+            etag = get_hf_file_metadata(url, token=self._client_token()).etag  # type: ignore[assignment]
+
+        size = os.path.getsize(blob_path)
+        headers = {
+            constants.HUGGINGFACE_HEADER_X_REPO_COMMIT: commit_hash,
+            "ETag": f'"{etag}"',
+            constants.HUGGINGFACE_HEADER_X_LINKED_ETAG: f'"{etag}"',
+            constants.HUGGINGFACE_HEADER_X_LINKED_SIZE: str(size),
+            "Accept-Ranges": "bytes",
+            "Content-Type": "application/octet-stream",
+        }
+        try:
+            byte_range = _parse_range(self.headers.get("Range"), size)
+        except _RangeNotSatisfiable:
+            return self._send_error(416, "Range Not Satisfiable", headers={"Content-Range": f"bytes */{size}"})
+
+        if byte_range is None:
+            start, end = 0, size - 1
+            self.send_response(200)
+        else:
+            start, end = byte_range
+            self.send_response(206)
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+
+        if send_body and end >= start:
+            with open(blob_path, "rb") as f:
+                # Zero-copy when supported by the OS
+                self.connection.sendfile(f, offset=start, count=end - start + 1)
+
+    def _proxy(self, send_body: bool) -> None:
+        """Forward the request to the Hub (e.g. repo info)."""
+        authorization = self.headers.get("Authorization")
+        cache_key = (self.path, authorization)
+        cacheable = _REGEX_IMMUTABLE_API_PATH.match(urlparse(self.path).path) is not None
+
+        cached = self.server._api_cache.get(cache_key) if cacheable else None
+        if cached is not None:
+            status_code, headers, content = cached
+        else:
+            request_headers = {
+                name: value for name, value in self.headers.items() if name.lower() in _FORWARDED_REQUEST_HEADERS
+            }
+            try:
+                response = get_session().request(
+                    method=self.command,
+                    url=self.server.endpoint + self.path,
+                    headers=request_headers,
+                    allow_redirects=False,
+                    timeout=constants.DEFAULT_REQUEST_TIMEOUT,
+                )
+            except requests.RequestException as e:
+                return self._send_error(502, f"Could not reach {self.server.endpoint}: {e}")
+            status_code, content = response.status_code, response.content
+            headers = {
+                name: value for name, value in response.headers.items() if name.lower() not in _HOP_BY_HOP_HEADERS
+            }
+            if cacheable and status_code == 200 and self.command == "GET":
+                with self.server._api_cache_lock:
+                    self.server._api_cache[cache_key] = (status_code, headers, content)
+
+        self.send_response(status_code)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(content)
+
+    def _send_error(self, status_code: int, message: str, headers: Optional[Dict[str, str]] = None) -> None:
+        content = message.encode()
+        self.send_response(status_code)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(content)
+
+    def _client_token(self) -> Union[str, bool]:
+        """Token sent by the client, if any.
+
+        Never fall back to the token of the server: it would let any client download private or gated repos on its
+        behalf.
+        """
+        authorization = self.headers.get("Authorization", "")
+        if authorization.lower().startswith("bearer "):
+            return authorization[len("bearer ") :]
+        return False
+
+
+def _parse_resolve_path(path: str) -> Optional[Tuple[str, str, str, str]]:
+    """Parse a `/{repo_id}/resolve/{revision}/{filename}` path into (repo_type, repo_id, revision, filename)."""
+    path = path.lstrip("/")
+    if path.startswith("api/") or "/resolve/" not in path:
+        return None
+    repo_type = constants.REPO_TYPE_MODEL
+    for candidate, prefix in constants.REPO_TYPES_URL_PREFIXES.items():
+        if path.startswith(prefix):
+            repo_type, path = candidate, path[len(prefix) :]
+            break
+    repo_id, _, rest = path.partition("/resolve/")
+    revision, _, filename = rest.partition("/")
+    if not repo_id or not revision or not filename:
+        return None
+    return repo_type, unquote(repo_id), unquote(revision), unquote(filename)
+
+
+def _parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Return the (start, end) bytes requested by a `Range` header, both included.
+
+    Returns `None` if the whole file must be returned. Multiple ranges are not supported and are ignored, as allowed by
+    RFC 9110.
+    """
+    match = _RANGE_PATTERN.match(header.strip()) if header is not None else None
+    if match is None or match.group(1) == match.group(2) == "":
+        return None
+    if match.group(1) == "":
+        # Suffix range: last N bytes
+        suffix = int(match.group(2))
+        if suffix == 0:
+            raise _RangeNotSatisfiable()
+        return max(size - suffix, 0), size - 1
+    start = int(match.group(1))
+    end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+    if start >= size or end < start:
+        raise _RangeNotSatisfiable()
+    return start, end
+
+
+def serve_cache(
+    cache_dir: Union[str, Path, None] = None,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    endpoint: Optional[str] = None,
+) -> None:
+    """
+    Serve a local cache directory with the same routes as the Hub, until interrupted.
+
+    Files are served from `cache_dir` with the headers expected by [`hf_hub_download`] (commit hash, etag and size)
+    and support range requests. Files missing from the cache are first downloaded from `endpoint`. All other requests
+    (e.g. repo info) are forwarded to `endpoint`. Clients only need to set `HF_ENDPOINT` to the address of the server.
+
+    <Tip warning={true}>
+
+    Cached files are served to any client that can reach the server, without checking access rights. Files from
+    private or gated repos downloaded in the cache of the server might be exposed. Only expose the server on a trusted
+    network. Files missing from the cache are downloaded with the token sent by the client, never with the token of
+    the server.
+
+    </Tip>
+
+    Args:
+        cache_dir (`str` or `Path`, *optional*):
+            Cache directory to serve. Defaults to the default Hugging Face cache.
+        host (`str`, *optional*):
+            Address to listen on. Defaults to `"127.0.0.1"`. Use `"0.0.0.0"` to accept connections from other machines.
+        port (`int`, *optional*):
+            Port to listen on. Defaults to 8080.
+        endpoint (`str`, *optional*):
+            Endpoint used to download files missing from the cache. Defaults to `HF_ENDPOINT` (https://huggingface.co).
+    """
+    server = CacheServer((host, port), cache_dir=cache_dir, endpoint=endpoint)
+    logger.info(f"Serving cache '{server.cache_dir}' on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
@@ -4,17 +4,19 @@ Type definitions and utilities for the `create_commit` API
 
 import base64
 import io
+import json
 import os
+import time
 import warnings
 from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from contextlib import contextmanager
 from dataclasses import dataclass, field
 from itertools import groupby
 from pathlib import Path, PurePosixPath
-from typing import TYPE_CHECKING, Any, BinaryIO, Dict, Iterable, Iterator, List, Literal, Optional, Tuple, Union
-
-from tqdm.contrib.concurrent import thread_map
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, Iterable, Iterator, List, Literal, Optional, Set, Tuple, Union
 
+from ._upload_hash_cache import cache_upload_infos, get_cached_upload_infos
 from .constants import ENDPOINT, HF_HUB_ENABLE_HF_TRANSFER
 from .file_download import hf_hub_url
 from .lfs import UploadInfo, lfs_upload, post_lfs_batch_info
@@ -22,11 +24,13 @@ from .utils import (
     FORBIDDEN_FOLDERS,
     EntryNotFoundError,
     chunk_iterable,
+    default_transfer_job,
     get_session,
     hf_raise_for_status,
     logging,
     tqdm_stream_file,
     validate_hf_hub_args,
+    with_current_context,
 )
 from .utils import tqdm as hf_tqdm
 
@@ -123,6 +127,13 @@ class CommitOperationAdd:
             - a "file object" (subclass of `io.BufferedIOBase`), typically obtained
                 with `open(path, "rb")`. It must support `seek()` and `tell()` methods.
 
+    Attributes:
+        upload_info (`UploadInfo`):
+            Size, sha256 and first bytes of the file. When `path_or_fileobj` is a path, the file is hashed on first
+            access to this attribute rather than when the operation is created. [`HfApi.create_commit`] hashes files
+            concurrently and starts uploading them as soon as they are hashed. If `HF_HUB_ENABLE_UPLOAD_HASH_CACHE` is
+            set, hashes of files that have not been modified since a previous upload are read from a local cache.
+
     Raises:
         [`ValueError`](https://docs.python.org/3/library/exceptions.html#ValueError)
             If `path_or_fileobj` is not one of `str`, `Path`, `bytes` or `io.BufferedIOBase`.
@@ -135,10 +146,12 @@ class CommitOperationAdd:
 
     path_in_repo: str
     path_or_fileobj: Union[str, Path, bytes, BinaryIO]
-    upload_info: UploadInfo = field(init=False, repr=False)
 
     # Internal attributes
 
+    # computed on first access to `upload_info` if `path_or_fileobj` is a path
+    _upload_info: Optional[UploadInfo] = field(init=False, repr=False, compare=False, default=None)
+
     # set to "lfs" or "regular" once known
     _upload_mode: Optional[UploadMode] = field(init=False, repr=False, default=None)
 
@@ -153,7 +166,7 @@ class CommitOperationAdd:
     _is_committed: bool = field(init=False, repr=False, default=False)
 
     def __post_init__(self) -> None:
-        """Validates `path_or_fileobj` and compute `upload_info`."""
+        """Validates `path_or_fileobj` and compute `upload_info` (deferred for paths)."""
         self.path_in_repo = _validate_path_in_repo(self.path_in_repo)
 
         # Validate `path_or_fileobj` value
@@ -179,13 +192,22 @@ class CommitOperationAdd:
                     "path_or_fileobj is a file-like object but does not implement seek() and tell()"
                 ) from exc
 
-        # Compute "upload_info" attribute
-        if isinstance(self.path_or_fileobj, str):
-            self.upload_info = UploadInfo.from_path(self.path_or_fileobj)
-        elif isinstance(self.path_or_fileobj, bytes):
-            self.upload_info = UploadInfo.from_bytes(self.path_or_fileobj)
-        else:
-            self.upload_info = UploadInfo.from_fileobj(self.path_or_fileobj)
+        # Compute "upload_info" attribute. Hashing a file on disk is deferred => creating many operations is cheap.
+        if isinstance(self.path_or_fileobj, bytes):
+            self._upload_info = UploadInfo.from_bytes(self.path_or_fileobj)
+        elif not isinstance(self.path_or_fileobj, str):
+            self._upload_info = UploadInfo.from_fileobj(self.path_or_fileobj)
+
+    @property
+    def upload_info(self) -> UploadInfo:
+        if self._upload_info is None:
+            assert isinstance(self.path_or_fileobj, str)
+            self._upload_info = _upload_info_from_path(self.path_or_fileobj)
+        return self._upload_info
+
+    @upload_info.setter
+    def upload_info(self, upload_info: UploadInfo) -> None:
+        self._upload_info = upload_info
 
     @contextmanager
     def as_file(self, with_tqdm: bool = False) -> Iterator[BinaryIO]:
@@ -246,6 +268,22 @@ class CommitOperationAdd:
         with self.as_file() as file:
             return base64.b64encode(file.read())
 
+    def _iter_b64content(self, chunk_size: int = 3 * 1024 * 1024) -> Iterator[bytes]:
+        """Same as [`~CommitOperationAdd.b64content`] but read and encoded chunk by chunk."""
+        with self.as_file() as file:
+            remainder = b""
+            while True:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    break
+                # Encode a multiple of 3 bytes at a time => encoded chunks can be concatenated (no padding)
+                data = remainder + chunk
+                end = len(data) - len(data) % 3
+                yield base64.b64encode(data[:end])
+                remainder = data[end:]
+            if remainder:
+                yield base64.b64encode(remainder)
+
 
 def _validate_path_in_repo(path_in_repo: str) -> str:
     # Validate `path_in_repo` value to prevent a server-side issue
@@ -313,49 +351,37 @@ def _warn_on_overwriting_operations(operations: List[CommitOperation]) -> None:
                     )
 
 
-@validate_hf_hub_args
-def _upload_lfs_files(
+def _upload_info_from_path(path: str) -> UploadInfo:
+    """Return the `UploadInfo` of a file, from the upload hash cache if enabled and valid, otherwise by hashing it."""
+    upload_info = get_cached_upload_infos([path]).get(path)
+    if upload_info is None:
+        stat, upload_info = _hash_file(path)
+        cache_upload_infos([(path, stat, upload_info)])
+    return upload_info
+
+
+def _hash_file(path: str) -> Tuple[os.stat_result, UploadInfo]:
+    stat = os.stat(path)  # before hashing => cache entry is outdated if the file is modified while being hashed
+    return stat, UploadInfo.from_path(path)
+
+
+def _fetch_lfs_upload_actions(
     *,
     additions: List[CommitOperationAdd],
     repo_type: str,
     repo_id: str,
     headers: Dict[str, str],
     endpoint: Optional[str] = None,
-    num_threads: int = 5,
     revision: Optional[str] = None,
-):
+) -> List[Tuple[Dict, CommitOperationAdd]]:
     """
-    Uploads the content of `additions` to the Hub using the large file storage protocol.
+    Requests the LFS batch endpoint for upload instructions. Returns the instructions (and related operation) of the
+    files that are not already present upstream.
 
     Relevant external documentation:
         - LFS Batch API: https://github.com/git-lfs/git-lfs/blob/main/docs/api/batch.md
-
-    Args:
-        additions (`List` of `CommitOperationAdd`):
-            The files to be uploaded
-        repo_type (`str`):
-            Type of the repo to upload to: `"model"`, `"dataset"` or `"space"`.
-        repo_id (`str`):
-            A namespace (user or an organization) and a repo name separated
-            by a `/`.
-        headers (`Dict[str, str]`):
-            Headers to use for the request, including authorization headers and user agent.
-        num_threads (`int`, *optional*):
-            The number of concurrent threads to use when uploading. Defaults to 5.
-        revision (`str`, *optional*):
-            The git revision to upload to.
-
-    Raises:
-        [`EnvironmentError`](https://docs.python.org/3/library/exceptions.html#EnvironmentError)
-            If an upload failed for any reason
-        [`ValueError`](https://docs.python.org/3/library/exceptions.html#ValueError)
-            If the server returns malformed responses
-        [`HTTPError`](https://requests.readthedocs.io/en/latest/api/#requests.HTTPError)
-            If the LFS batch endpoint returned an HTTP error.
     """
-    # Step 1: retrieve upload instructions from the LFS batch endpoint.
-    #         Upload instructions are retrieved by chunk of 256 files to avoid reaching
-    #         the payload limit.
+    # Upload instructions are retrieved by chunk of 256 files to avoid reaching the payload limit.
     batch_actions: List[Dict] = []
     for chunk in chunk_iterable(additions, chunk_size=256):
         batch_actions_chunk, batch_errors_chunk = post_lfs_batch_info(
@@ -381,7 +407,7 @@ def _upload_lfs_files(
         batch_actions += batch_actions_chunk
     oid2addop = {add_op.upload_info.sha256.hex(): add_op for add_op in additions}
 
-    # Step 2: ignore files that have already been uploaded
+    # Ignore files that have already been uploaded
     filtered_actions = []
     for action in batch_actions:
         if action.get("actions") is None:
@@ -390,38 +416,179 @@ def _upload_lfs_files(
                 " present upstream - skipping upload."
             )
         else:
-            filtered_actions.append(action)
-
-    if len(filtered_actions) == 0:
-        logger.debug("No LFS files to upload.")
-        return
-
-    # Step 3: upload files concurrently according to these instructions
-    def _wrapped_lfs_upload(batch_action) -> None:
-        try:
-            operation = oid2addop[batch_action["oid"]]
-            lfs_upload(operation=operation, lfs_batch_action=batch_action, headers=headers, endpoint=endpoint)
-        except Exception as exc:
-            raise RuntimeError(f"Error while uploading '{operation.path_in_repo}' to the Hub.") from exc
-
-    if HF_HUB_ENABLE_HF_TRANSFER:
-        logger.debug(f"Uploading {len(filtered_actions)} LFS files to the Hub using `hf_transfer`.")
-        for action in hf_tqdm(filtered_actions, name="huggingface_hub.lfs_upload"):
-            _wrapped_lfs_upload(action)
-    elif len(filtered_actions) == 1:
-        logger.debug("Uploading 1 LFS file to the Hub")
-        _wrapped_lfs_upload(filtered_actions[0])
-    else:
-        logger.debug(
-            f"Uploading {len(filtered_actions)} LFS files to the Hub using up to {num_threads} threads concurrently"
+            filtered_actions.append((action, oid2addop[action["oid"]]))
+    return filtered_actions
+
+
+def _lfs_upload_or_raise(
+    operation: CommitOperationAdd, batch_action: Dict, headers: Dict[str, str], endpoint: Optional[str]
+) -> None:
+    try:
+        lfs_upload(operation=operation, lfs_batch_action=batch_action, headers=headers, endpoint=endpoint)
+    except Exception as exc:
+        raise RuntimeError(f"Error while uploading '{operation.path_in_repo}' to the Hub.") from exc
+
+
+# Files are sent to the preupload and LFS batch endpoints by batches of up to 256 files...
+_PIPELINE_BATCH_SIZE = 256
+# ...or as soon as hashed files have been waiting for this many seconds
+_PIPELINE_FLUSH_INTERVAL = 1.0
+# Hashing is paused while this many files are waiting to be uploaded (bounds how far hashing runs ahead of uploads)
+_PIPELINE_MAX_PENDING_UPLOADS = 2 * _PIPELINE_BATCH_SIZE
+
+
+def _preupload_additions(
+    *,
+    additions: List[CommitOperationAdd],
+    repo_type: str,
+    repo_id: str,
+    headers: Dict[str, str],
+    revision: str,
+    endpoint: Optional[str] = None,
+    create_pr: bool = False,
+    gitignore_content: Optional[str] = None,
+    num_threads: int = 5,
+) -> List[CommitOperationAdd]:
+    """
+    Hashes `additions`, fetches their upload mode and uploads the LFS ones, as a pipeline.
+
+    Each file goes through the stages hash -> preupload (regular or LFS?) -> LFS batch -> upload as soon as possible:
+    files are sent to the next stage by batches of up to `_PIPELINE_BATCH_SIZE` files, or after
+    `_PIPELINE_FLUSH_INTERVAL` seconds. The first files are therefore uploaded while the next ones are still being hashed,
+    instead of after all files have been hashed and checked. Files are hashed and uploaded by up to `num_threads` threads
+    each. Hashing is paused when more than `_PIPELINE_MAX_PENDING_UPLOADS` files are waiting to be uploaded.
+
+    Returns the LFS files that have been uploaded (or were already present upstream), excluding ignored ones.
+    """
+    # Files already hashed (or in the upload hash cache) are ready for the preupload stage
+    to_hash = [addition for addition in additions if addition._upload_info is None]
+    cached_upload_infos = get_cached_upload_infos([str(addition.path_or_fileobj) for addition in to_hash])
+    for addition in to_hash:
+        addition._upload_info = cached_upload_infos.get(str(addition.path_or_fileobj))
+    ready = [addition for addition in additions if addition._upload_info is not None]
+    to_hash_iter = iter(addition for addition in additions if addition._upload_info is None)
+
+    lfs_additions: List[CommitOperationAdd] = []
+    hashed_entries: List[Tuple[str, os.stat_result, UploadInfo]] = []
+    pending_hashes: Dict[Future, CommitOperationAdd] = {}
+    pending_uploads: Set[Future] = set()
+    ready_since = time.monotonic()
+    progress: Optional[hf_tqdm] = None
+    nb_ignored_files = 0
+
+    hash_executor = ThreadPoolExecutor(max_workers=num_threads, thread_name_prefix="hf-hash")
+    # `hf_transfer` already uploads each file with many connections => files are uploaded one by one
+    upload_executor = ThreadPoolExecutor(
+        max_workers=1 if HF_HUB_ENABLE_HF_TRANSFER else num_threads, thread_name_prefix="hf-lfs-upload"
+    )
+
+    def _upload(batch_action: Dict, operation: CommitOperationAdd) -> None:
+        _lfs_upload_or_raise(operation=operation, batch_action=batch_action, headers=headers, endpoint=endpoint)
+
+    def _flush(batch: List[CommitOperationAdd]) -> None:
+        nonlocal progress, nb_ignored_files
+        cache_upload_infos(hashed_entries)
+        hashed_entries.clear()
+
+        _fetch_upload_modes(
+            additions=batch,
+            repo_type=repo_type,
+            repo_id=repo_id,
+            headers=headers,
+            revision=revision,
+            endpoint=endpoint,
+            create_pr=create_pr,
+            gitignore_content=gitignore_content,
         )
-        thread_map(
-            _wrapped_lfs_upload,
-            filtered_actions,
-            desc=f"Upload {len(filtered_actions)} LFS files",
-            max_workers=num_threads,
-            tqdm_class=hf_tqdm,
+        batch_lfs_additions = []
+        for addition in batch:
+            if addition._upload_mode != "lfs":
+                continue
+            if addition._should_ignore:
+                logger.debug(f"Skipping upload for LFS file '{addition.path_in_repo}' (ignored by gitignore file).")
+                nb_ignored_files += 1
+            else:
+                batch_lfs_additions.append(addition)
+        if len(batch_lfs_additions) == 0:
+            return
+
+        actions = _fetch_lfs_upload_actions(
+            additions=batch_lfs_additions,
+            repo_type=repo_type,
+            repo_id=repo_id,
+            headers=headers,
+            endpoint=endpoint,
+            # If `create_pr`, we don't want to check user permission on the revision as users with read permission
+            # should still be able to create PRs even if they don't have write permission on the target branch of the
+            # PR (i.e. `revision`).
+            revision=revision if not create_pr else None,
         )
+        lfs_additions.extend(batch_lfs_additions)
+        if len(actions) == 0:
+            return
+        if progress is None:
+            progress = hf_tqdm(desc="Upload LFS files", total=0, unit="file", name="huggingface_hub.lfs_upload")
+        progress.total += len(actions)
+        progress.refresh()
+        for batch_action, operation in actions:
+            pending_uploads.add(upload_executor.submit(with_current_context(_upload), batch_action, operation))
+
+    # All files are uploaded as a single transfer job => fair share of connections with concurrent uploads
+    try:
+        with default_transfer_job(name="lfs_upload"):
+            while True:
+                # 1. Keep hash workers busy, unless too many files are waiting to be uploaded
+                while len(pending_hashes) < 2 * num_threads and len(pending_uploads) < _PIPELINE_MAX_PENDING_UPLOADS:
+                    next_addition = next(to_hash_iter, None)
+                    if next_addition is None:
+                        break
+                    future = hash_executor.submit(_hash_file, str(next_addition.path_or_fileobj))
+                    pending_hashes[future] = next_addition
+
+                # 2. Send hashed files to the preupload and LFS batch endpoints, then schedule their upload
+                if len(ready) > 0 and (
+                    len(ready) >= _PIPELINE_BATCH_SIZE
+                    or len(pending_hashes) == 0
+                    or time.monotonic() - ready_since >= _PIPELINE_FLUSH_INTERVAL
+                ):
+                    batch, ready = ready[:_PIPELINE_BATCH_SIZE], ready[_PIPELINE_BATCH_SIZE:]
+                    _flush(batch)
+                    ready_since = time.monotonic()
+                    continue
+
+                if len(pending_hashes) == 0 and len(pending_uploads) == 0 and len(ready) == 0:
+                    break
+
+                # 3. Wait for a file to be hashed or uploaded
+                done, _ = wait(
+                    [*pending_hashes, *pending_uploads], timeout=_PIPELINE_FLUSH_INTERVAL, return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    if future in pending_uploads:
+                        pending_uploads.remove(future)
+                        future.result()  # raise upload error if any
+                        if progress is not None:
+                            progress.update(1)
+                    else:
+                        addition = pending_hashes.pop(future)
+                        stat, upload_info = future.result()
+                        addition._upload_info = upload_info
+                        hashed_entries.append((str(addition.path_or_fileobj), stat, upload_info))
+                        if len(ready) == 0:
+                            ready_since = time.monotonic()
+                        ready.append(addition)
+    finally:
+        # On error, don't start pending tasks (running ones are awaited)
+        for future in [*pending_hashes, *pending_uploads]:
+            future.cancel()
+        hash_executor.shutdown(wait=True)
+        upload_executor.shutdown(wait=True)
+        if progress is not None:
+            progress.close()
+
+    if nb_ignored_files > 0:
+        logger.info(f"Skipped upload for {nb_ignored_files} LFS file(s) (ignored by gitignore file).")
+    return lfs_additions
 
 
 def _validate_preupload_info(preupload_info: dict):
@@ -607,12 +774,15 @@ def _prepare_commit_payload(
     commit_message: str,
     commit_description: Optional[str] = None,
     parent_commit: Optional[str] = None,
+    lazy_content: bool = False,
 ) -> Iterable[Dict[str, Any]]:
     """
     Builds the payload to POST to the `/commit` API of the Hub.
 
     Payload is returned as an iterator so that it can be streamed as a ndjson in the
-    POST request.
+    POST request. If `lazy_content=True`, the content of regular files is not read: the
+    `CommitOperationAdd` itself is set as `"content"` and read while serializing the
+    payload (see `_payload_as_ndjson`).
 
     For more information, see:
         - https://github.com/huggingface/huggingface_hub/issues/1085#issuecomment-1265208073
@@ -641,7 +811,7 @@ def _prepare_commit_payload(
             yield {
                 "key": "file",
                 "value": {
-                    "content": operation.b64content().decode(),
+                    "content": operation if lazy_content else operation.b64content().decode(),
                     "path": operation.path_in_repo,
                     "encoding": "base64",
                 },
@@ -697,3 +867,23 @@ def _prepare_commit_payload(
 
     if nb_ignored_files > 0:
         logger.info(f"Skipped {nb_ignored_files} file(s) in commit (ignored by gitignore file).")
+
+
+def _payload_as_ndjson(commit_payload: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    Serializes the commit payload as ndjson, one line per item.
+
+    Lazy contents (see `_prepare_commit_payload`) are read and base64-encoded chunk by chunk => the payload can be
+    streamed without holding the content of all regular files in memory.
+    """
+    for item in commit_payload:
+        content = item["value"].get("content")
+        if isinstance(content, CommitOperationAdd):
+            # Base64 doesn't need to be escaped in JSON => content is inserted in the serialized item as is
+            head, tail = json.dumps({**item, "value": {**item["value"], "content": ""}}).split('"content": ""', 1)
+            yield f'{head}"content": "'.encode()
+            yield from content._iter_b64content()
+            yield f'"{tail}\n'.encode()
+        else:
+            yield json.dumps(item).encode()
+            yield b"\n"
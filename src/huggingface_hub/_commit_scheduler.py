@@ -122,6 +122,7 @@ class CommitScheduler:
 
         # Keep track of already uploaded files
         self.last_uploaded: Dict[Path, float] = {}  # key is local path, value is timestamp
+        self.last_uploaded_sha256: Dict[Path, bytes] = {}  # key is local path, value is sha256 of uploaded content
 
         # Scheduler
         if not every > 0:
@@ -238,19 +239,31 @@ class CommitScheduler:
             for file_to_upload in files_to_upload
         ]
 
+        # Drop files modified but with the same content as previously uploaded (e.g. touched or rewritten as is)
+        to_upload = []
+        for file, op in zip(files_to_upload, add_operations):
+            if self.last_uploaded_sha256.get(file.local_path) == op.upload_info.sha256:
+                self.last_uploaded[file.local_path] = file.last_modified
+            else:
+                to_upload.append((file, op))
+        if len(to_upload) == 0:
+            logger.debug("Dropping schedule commit: no changed content to upload.")
+            return None
+
         # Upload files (append mode expected - no need for lock)
         logger.debug("Uploading files for scheduled commit.")
         commit_info = self.api.create_commit(
             repo_id=self.repo_id,
             repo_type=self.repo_type,
-            operations=add_operations,
+            operations=[op for _, op in to_upload],
             commit_message="Scheduled Commit",
             revision=self.revision,
         )
 
         # Successful commit: keep track of the latest "last_modified" for each file
-        for file in files_to_upload:
+        for file, op in to_upload:
             self.last_uploaded[file.local_path] = file.last_modified
+            self.last_uploaded_sha256[file.local_path] = op.upload_info.sha256
         return commit_info
 
 
@@ -0,0 +1,277 @@
+# coding=utf-8
+# Copyright 2024-present, the HuggingFace Inc. team.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Contains a lazy, read-only view of a repo snapshot whose files are downloaded to the cache on first access."""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+from .constants import DEFAULT_REVISION, HF_HUB_CACHE, REPO_TYPES
+from .file_download import (
+    _cache_commit_hash_for_specific_revision,
+    _hf_hub_download_blob_to_cache_dir,
+    hf_hub_download,
+    hf_hub_url,
+    repo_folder_name,
+)
+from .hf_api import HfApi
+from .utils import build_hf_headers, filter_repo_objects, logging, validate_hf_hub_args, with_current_context
+
+
+logger = logging.get_logger(__name__)
+
+
+class LazySnapshot(Mapping[str, str]):
+    """
+    A snapshot of a repo whose files are downloaded to the cache on first access.
+
+    The revision is resolved and the repo files are listed once, when the snapshot is created. The snapshot is then a
+    read-only mapping from each file path in the repo to its path in the cache: accessing a file downloads it (or
+    returns it directly if already cached) at the resolved commit, without any other call to the Hub. This is useful
+    when only a subset of the files of a repo is needed and this subset is only known at runtime (e.g. a repo with
+    fp16, fp32 and onnx weights side by side).
+
+    Files expected to be needed soon can be downloaded in the background with [`~LazySnapshot.prefetch`].
+
+    A `LazySnapshot` can be pickled, for instance to be shared with `DataLoader` workers: the pickled object contains
+    the resolved file listing (no call to the Hub is made on unpickling) but not the pending background downloads. The
+    token is not pickled either: an unpickled snapshot uses the token configured on the machine (e.g. `HF_TOKEN`).
+
+    <Tip warning={true}>
+
+    Since files are downloaded when accessed, iterating over `.values()` or `.items()` downloads all files of the
+    snapshot. Iterating over the keys or checking if a file exists (`"config.json" in snapshot`) doesn't download
+    anything.
+
+    </Tip>
+
+    Args:
+        repo_id (`str`):
+            A user or an organization name and a repo name separated by a `/`.
+        repo_type (`str`, *optional*):
+            Set to `"dataset"` or `"space"` if the snapshot is a dataset or space, `None` or `"model"` if it is a
+            model. Default is `None`.
+        revision (`str`, *optional*):
+            An optional Git revision id which can be a branch name, a tag, or a commit hash. It is resolved to a
+            commit hash when the snapshot is created.
+        cache_dir (`str`, `Path`, *optional*):
+            Path to the folder where cached files are stored.
+        allow_patterns (`List[str]` or `str`, *optional*):
+            If provided, only files matching at least one pattern are part of the snapshot.
+        ignore_patterns (`List[str]` or `str`, *optional*):
+            If provided, files matching any of the patterns are not part of the snapshot.
+        token (`str`, `bool`, *optional*):
+            A token to be used for the download (see [`hf_hub_download`]).
+        headers (`dict`, *optional*):
+            Additional headers to include in the requests.
+        endpoint (`str`, *optional*):
+            Hugging Face Hub base url. Defaults to https://huggingface.co.
+        max_workers (`int`, *optional*):
+            Number of concurrent threads used by [`~LazySnapshot.prefetch`]. Defaults to 8.
+
+    Example:
+    ```py
+    >>> from huggingface_hub import LazySnapshot
+
+    >>> snapshot = LazySnapshot("runwayml/stable-diffusion-v1-5")
+    >>> snapshot.prefetch("unet/*.fp16.safetensors")  # download in the background
+    >>> snapshot["model_index.json"]  # download only this file
+    '/home/user/.cache/huggingface/hub/models--runwayml--stable-diffusion-v1-5/snapshots/1d0c4eb.../model_index.json'
+    >>> "unet/diffusion_pytorch_model.fp16.safetensors" in snapshot  # nothing downloaded
+    True
+    ```
+    """
+
+    @validate_hf_hub_args
+    def __init__(
+        self,
+        repo_id: str,
+        *,
+        repo_type: Optional[str] = None,
+        revision: Optional[str] = None,
+        cache_dir: Union[str, Path, None] = None,
+        allow_patterns: Optional[Union[List[str], str]] = None,
+        ignore_patterns: Optional[Union[List[str], str]] = None,
+        token: Union[bool, str, None] = None,
+        headers: Optional[Dict[str, str]] = None,
+        endpoint: Optional[str] = None,
+        max_workers: int = 8,
+    ) -> None:
+        if repo_type is None:
+            repo_type = "model"
+        if repo_type not in REPO_TYPES:
+            raise ValueError(f"Invalid repo type: {repo_type}. Accepted repo types are: {str(REPO_TYPES)}")
+        if revision is None:
+            revision = DEFAULT_REVISION
+
+        self.repo_id = repo_id
+        self.repo_type = repo_type
+        self.cache_dir = str(cache_dir if cache_dir is not None else HF_HUB_CACHE)
+        self.endpoint = endpoint
+        self.max_workers = max_workers
+        # Headers are built on use => the token is never stored in the built headers (see `__getstate__`)
+        self._token = token
+        self._extra_headers = headers
+
+        # `files_metadata=True` to get blob ids and sizes => no HEAD call when a file is accessed
+        repo_info = HfApi(endpoint=endpoint).repo_info(
+            repo_id=repo_id, repo_type=repo_type, revision=revision, token=token, files_metadata=True
+        )
+        assert repo_info.sha is not None, "Repo info returned from server must have a revision sha."
+        assert repo_info.siblings is not None, "Repo info returned from server must have a siblings list."
+        self.commit_hash: str = repo_info.sha
+
+        storage_folder = os.path.join(self.cache_dir, repo_folder_name(repo_id=repo_id, repo_type=repo_type))
+        _cache_commit_hash_for_specific_revision(storage_folder, revision, self.commit_hash)
+        self.snapshot_folder = os.path.join(storage_folder, "snapshots", self.commit_hash)
+
+        # filename => (etag, size). Etag is the sha256 for LFS files and the git blob id otherwise.
+        filenames = set(
+            filter_repo_objects(
+                items=[sibling.rfilename for sibling in repo_info.siblings],
+                allow_patterns=allow_patterns,
+                ignore_patterns=ignore_patterns,
+            )
+        )
+        self._files: Dict[str, Tuple[Optional[str], Optional[int]]] = {
+            sibling.rfilename: (
+                (sibling.lfs.sha256, sibling.lfs.size) if sibling.lfs is not None else (sibling.blob_id, sibling.size)
+            )
+            for sibling in repo_info.siblings
+            if sibling.rfilename in filenames
+        }
+
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._prefetched: Dict[str, "Future[str]"] = {}
+
+    def __getitem__(self, filename: str) -> str:
+        """Return the path of `filename` in the cache, downloading it first if needed."""
+        if filename not in self._files:
+            raise KeyError(filename)
+        with self._lock:
+            future = self._prefetched.pop(filename, None)
+        if future is not None:
+            return future.result()  # re-raise prefetch error if any
+        return self._download(filename)
+
+    def __contains__(self, filename: object) -> bool:
+        # Don't use `Mapping.__contains__` which calls `__getitem__` (i.e. downloads the file)
+        return filename in self._files
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._files)
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __repr__(self) -> str:
+        return (
+            f"LazySnapshot(repo_id={self.repo_id!r}, repo_type={self.repo_type!r}, commit_hash={self.commit_hash!r})"
+        )
+
+    def prefetch(
+        self,
+        allow_patterns: Optional[Union[List[str], str]] = None,
+        ignore_patterns: Optional[Union[List[str], str]] = None,
+    ) -> None:
+        """Download files of the snapshot in the background.
+
+        Files are downloaded concurrently, by up to `max_workers` threads. Accessing a file being prefetched waits for
+        its download to complete. Errors happening during a prefetch are raised when the file is accessed.
+
+        Args:
+            allow_patterns (`List[str]` or `str`, *optional*):
+                If provided, only files matching at least one pattern are prefetched. A filename is a valid pattern.
+            ignore_patterns (`List[str]` or `str`, *optional*):
+                If provided, files matching any of the patterns are not prefetched.
+        """
+        filenames = filter_repo_objects(
+            items=list(self._files), allow_patterns=allow_patterns, ignore_patterns=ignore_patterns
+        )
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=f"LazySnapshot({self.repo_id})"
+                )
+            for filename in filenames:
+                if filename not in self._prefetched:
+                    self._prefetched[filename] = self._executor.submit(with_current_context(self._download), filename)
+
+    def close(self) -> None:
+        """Cancel pending prefetches and wait for the running ones to complete."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            for future in self._prefetched.values():
+                future.cancel()
+            self._prefetched.clear()
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def __enter__(self) -> "LazySnapshot":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Threads, lock and pending prefetches are specific to the current process
+        state = self.__dict__.copy()
+        state.update(_lock=None, _executor=None, _prefetched={})
+        # Never pickle the token (pickled objects might be saved to disk or sent to other processes)
+        if isinstance(self._token, str):
+            state["_token"] = None
+        if self._extra_headers is not None:
+            state["_extra_headers"] = {
+                name: value for name, value in self._extra_headers.items() if name.lower() != "authorization"
+            }
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _download(self, filename: str) -> str:
+        etag, size = self._files[filename]
+        headers = build_hf_headers(token=self._token, headers=self._extra_headers)
+        if etag is None or size is None:
+            # Metadata not available => let `hf_hub_download` fetch them
+            return hf_hub_download(
+                self.repo_id,
+                filename=filename,
+                repo_type=self.repo_type,
+                revision=self.commit_hash,
+                cache_dir=self.cache_dir,
+                endpoint=self.endpoint,
+                headers=headers,
+            )
+        return _hf_hub_download_blob_to_cache_dir(
+            cache_dir=self.cache_dir,
+            repo_id=self.repo_id,
+            repo_type=self.repo_type,
+            filename=filename,
+            revision=self.commit_hash,
+            commit_hash=self.commit_hash,
+            etag=etag,
+            url_to_download=hf_hub_url(
+                self.repo_id, filename, repo_type=self.repo_type, revision=self.commit_hash, endpoint=self.endpoint
+            ),
+            expected_size=size,
+            headers=headers,
+            proxies=None,
+            force_download=False,
+        )
@@ -22,11 +22,9 @@ using the cache).
 [4.0K]  data
 ├── [4.0K]  .cache
 │   └── [4.0K]  huggingface
+│       ├── [ 12K]  download.sqlite
 │       └── [4.0K]  download
-│           ├── [  16]  file.parquet.metadata
-│           ├── [  16]  file.txt.metadata
 │           └── [4.0K]  folder
-│               └── [  16]  file.parquet.metadata
 │
 ├── [6.5G]  file.parquet
 ├── [1.5K]  file.txt
@@ -34,7 +32,12 @@ using the cache).
     └── [   16]  file.parquet
 
 
-Metadata file structure:
+Download metadata of all files are stored in a single SQLite index (`download.sqlite`), so that a whole snapshot can be
+read or updated in one transaction. The `download` folder only contains temporary files (incomplete downloads and their
+locks). Metadata files from previous versions (one `.metadata` file per downloaded file, see below) are imported in the
+index when it is created, then deleted.
+
+Legacy metadata file structure:
 ```
 # file.txt.metadata
 11c5a3d5811f50298f278a704980280950aedb10
@@ -51,11 +54,13 @@ a16a55fda99d2f2e7b69cce5cf93ff4ad3049930
 
 import logging
 import os
+import sqlite3
 import time
+from contextlib import contextmanager
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from .utils import WeakFileLock
 
@@ -74,9 +79,10 @@ class LocalDownloadFilePaths:
         file_path (`Path`):
             Path where the file will be saved.
         lock_path (`Path`):
-            Path to the lock file used to ensure atomicity when reading/writing metadata.
+            Path to the lock file used to ensure only one process downloads the file at a time.
         metadata_path (`Path`):
-            Path to the metadata file.
+            Path to the legacy metadata file. Metadata are now stored in a single index per local directory (see
+            [`read_download_metadata`]).
     """
 
     file_path: Path
@@ -156,57 +162,171 @@ def read_download_metadata(local_dir: Path, filename: str) -> Optional[LocalDown
     Return:
         `[LocalDownloadFileMetadata]` or `None`: the metadata if it exists, `None` otherwise.
     """
-    paths = get_local_download_paths(local_dir, filename)
-    # file_path = local_file_path(local_dir, filename)
-    # lock_path, metadata_path = _download_metadata_file_path(local_dir, filename)
-    with WeakFileLock(paths.lock_path):
-        if paths.metadata_path.exists():
+    return read_download_metadata_batch(local_dir, [filename])[filename]
+
+
+def read_download_metadata_batch(
+    local_dir: Path, filenames: Iterable[str]
+) -> Dict[str, Optional[LocalDownloadFileMetadata]]:
+    """Read metadata about several files in the local directory, in a single transaction.
+
+    Args:
+        local_dir (`Path`):
+            Path to the local directory in which files are downloaded.
+        filenames (`Iterable[str]`):
+            Paths of the files in the repo.
+
+    Return:
+        `Dict[str, Optional[LocalDownloadFileMetadata]]`: the metadata of each file, `None` if it doesn't exist or is
+        outdated (see [`read_download_metadata`]).
+    """
+    filenames = list(filenames)
+    rows: Dict[str, Tuple[str, str, float]] = {}
+    try:
+        with _open_index(local_dir) as index:
+            for start in range(0, len(filenames), _INDEX_MAX_VARIABLES):
+                chunk = filenames[start : start + _INDEX_MAX_VARIABLES]
+                query = f"SELECT filename, commit_hash, etag, timestamp FROM metadata WHERE filename IN ({', '.join('?' * len(chunk))})"
+                for filename, commit_hash, etag, timestamp in index.execute(query, chunk):
+                    rows[filename] = (commit_hash, etag, timestamp)
+    except sqlite3.DatabaseError as e:
+        if isinstance(e, sqlite3.OperationalError):  # e.g. database is locked => not a corruption
+            raise
+        _remove_corrupted_index(local_dir, e)
+
+    metadata: Dict[str, Optional[LocalDownloadFileMetadata]] = {}
+    for filename in filenames:
+        metadata[filename] = None
+        if filename not in rows:
+            continue
+        commit_hash, etag, timestamp = rows[filename]
+        try:
+            # check if the file exists and hasn't been modified since the metadata was saved
+            stat = (local_dir / os.path.join(*filename.split("/"))).stat()
+        except FileNotFoundError:
+            # file does not exist => metadata is outdated
+            continue
+        if stat.st_mtime - 1 <= timestamp:  # allow 1s difference as stat.st_mtime might not be precise
+            metadata[filename] = LocalDownloadFileMetadata(
+                filename=filename, commit_hash=commit_hash, etag=etag, timestamp=timestamp
+            )
+        else:
+            logger.info(f"Ignored metadata for '{filename}' (outdated). Will re-compute hash.")
+    return metadata
+
+
+def write_download_metadata(local_dir: Path, filename: str, commit_hash: str, etag: str) -> None:
+    """Write metadata about a file in the local directory related to a download process.
+
+    Args:
+        local_dir (`Path`):
+            Path to the local directory in which files are downloaded.
+    """
+    write_download_metadata_batch(local_dir, [(filename, commit_hash, etag)])
+
+
+def write_download_metadata_batch(local_dir: Path, entries: Iterable[Tuple[str, str, str]]) -> None:
+    """Write metadata about several files in the local directory, in a single transaction.
+
+    Args:
+        local_dir (`Path`):
+            Path to the local directory in which files are downloaded.
+        entries (`Iterable[Tuple[str, str, str]]`):
+            Path in the repo, commit hash and etag of each file.
+    """
+    timestamp = time.time()
+    rows = [(filename, commit_hash, etag, timestamp) for filename, commit_hash, etag in entries]
+    try:
+        with _open_index(local_dir) as index:
+            index.executemany("INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?)", rows)
+    except sqlite3.DatabaseError as e:
+        if isinstance(e, sqlite3.OperationalError):
+            raise
+        _remove_corrupted_index(local_dir, e)
+        with _open_index(local_dir) as index:  # write to a new index
+            index.executemany("INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?)", rows)
+
+
+# Maximum number of variables in a SQLite query (999 for SQLite < 3.32)
+_INDEX_MAX_VARIABLES = 999
+# Seconds to wait for a concurrent transaction (e.g. from another process) before failing
+_INDEX_TIMEOUT = 60.0
+
+
+@contextmanager
+def _open_index(local_dir: Path) -> Iterator[sqlite3.Connection]:
+    """Open the metadata index of a local directory (created if missing) and run a transaction on it."""
+    index_path = _index_path(local_dir)
+    if not index_path.exists():
+        _create_index(local_dir)
+    connection = sqlite3.connect(str(index_path), timeout=_INDEX_TIMEOUT)
+    try:
+        with connection:  # commit on success, rollback on error
+            yield connection
+    finally:
+        connection.close()
+
+
+def _create_index(local_dir: Path) -> None:
+    """Create the metadata index of a local directory, importing and deleting legacy `.metadata` files if any."""
+    index_path = _index_path(local_dir)
+    legacy_dir = index_path.parent / "download"
+    with WeakFileLock(index_path.with_name(index_path.name + ".lock")):
+        if index_path.exists():  # created by another process in the meantime
+            return
+        legacy_paths = list(legacy_dir.glob("**/*.metadata"))
+        rows: List[Tuple[str, str, str, float]] = []
+        for metadata_path in legacy_paths:
             try:
-                with paths.metadata_path.open() as f:
+                with metadata_path.open() as f:
                     commit_hash = f.readline().strip()
                     etag = f.readline().strip()
                     timestamp = float(f.readline().strip())
-                    metadata = LocalDownloadFileMetadata(
-                        filename=filename,
-                        commit_hash=commit_hash,
-                        etag=etag,
-                        timestamp=timestamp,
+                rows.append(
+                    (
+                        metadata_path.relative_to(legacy_dir).as_posix()[: -len(".metadata")],
+                        commit_hash,
+                        etag,
+                        timestamp,
                     )
+                )
             except Exception as e:
-                # remove the metadata file if it is corrupted / not the right format
-                logger.warning(
-                    f"Invalid metadata file {paths.metadata_path}: {e}. Removing it from disk and continue."
+                # corrupted / not the right format => file will be re-hashed or re-downloaded
+                logger.warning(f"Invalid metadata file {metadata_path}: {e}. Removing it from disk and continue.")
+
+        # Index is created aside then moved => never seen half-initialized by another process
+        tmp_path = index_path.with_name(index_path.name + ".tmp")
+        tmp_path.unlink(missing_ok=True)
+        connection = sqlite3.connect(str(tmp_path))
+        try:
+            with connection:
+                connection.execute(
+                    "CREATE TABLE metadata (filename TEXT PRIMARY KEY, commit_hash TEXT NOT NULL, etag TEXT NOT NULL,"
+                    " timestamp REAL NOT NULL)"
                 )
-                try:
-                    paths.metadata_path.unlink()
-                except Exception as e:
-                    logger.warning(f"Could not remove corrupted metadata file {paths.metadata_path}: {e}")
+                connection.executemany("INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?)", rows)
+        finally:
+            connection.close()
+        os.replace(tmp_path, index_path)
 
-            try:
-                # check if the file exists and hasn't been modified since the metadata was saved
-                stat = paths.file_path.stat()
-                if (
-                    stat.st_mtime - 1 <= metadata.timestamp
-                ):  # allow 1s difference as stat.st_mtime might not be precise
-                    return metadata
-                logger.info(f"Ignored metadata for '{filename}' (outdated). Will re-compute hash.")
-            except FileNotFoundError:
-                # file does not exist => metadata is outdated
-                return None
-    return None
+    for metadata_path in legacy_paths:
+        try:
+            metadata_path.unlink()
+        except OSError as e:
+            logger.warning(f"Could not remove legacy metadata file {metadata_path}: {e}")
 
 
-def write_download_metadata(local_dir: Path, filename: str, commit_hash: str, etag: str) -> None:
-    """Write metadata about a file in the local directory related to a download process.
+def _remove_corrupted_index(local_dir: Path, error: Exception) -> None:
+    index_path = _index_path(local_dir)
+    logger.warning(f"Invalid metadata index {index_path}: {error}. Removing it from disk and continue.")
+    try:
+        index_path.unlink()
+    except OSError as e:
+        logger.warning(f"Could not remove corrupted metadata index {index_path}: {e}")
 
-    Args:
-        local_dir (`Path`):
-            Path to the local directory in which files are downloaded.
-    """
-    paths = get_local_download_paths(local_dir, filename)
-    with WeakFileLock(paths.lock_path):
-        with paths.metadata_path.open("w") as f:
-            f.write(f"{commit_hash}\n{etag}\n{time.time()}\n")
+
+def _index_path(local_dir: Path) -> Path:
+    return _huggingface_dir(local_dir) / "download.sqlite"
 
 
 @lru_cache()
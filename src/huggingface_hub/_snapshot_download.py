@@ -1,29 +1,46 @@
+import math
 import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, List, Literal, Optional, Union
 
 import requests
 from tqdm.auto import tqdm as base_tqdm
-from tqdm.contrib.concurrent import thread_map
 
+from ._local_folder import read_download_metadata_batch, write_download_metadata_batch
 from .constants import (
     DEFAULT_ETAG_TIMEOUT,
     DEFAULT_REVISION,
     HF_HUB_CACHE,
+    HF_HUB_DOWNLOAD_CONNECTIONS,
     HF_HUB_ENABLE_HF_TRANSFER,
     REPO_TYPES,
 )
-from .file_download import REGEX_COMMIT_HASH, hf_hub_download, repo_folder_name
-from .hf_api import DatasetInfo, HfApi, ModelInfo, SpaceInfo
+from .file_download import (
+    REGEX_COMMIT_HASH,
+    _cache_commit_hash_for_specific_revision,
+    _check_snapshot_disk_space,
+    _hf_hub_download_blob_to_cache_dir,
+    _hf_hub_download_blob_to_local_dir,
+    _local_file_matches_sha256,
+    hf_hub_download,
+    hf_hub_url,
+    repo_folder_name,
+)
+from .hf_api import DatasetInfo, HfApi, ModelInfo, RepoSibling, SpaceInfo
 from .utils import (
     GatedRepoError,
     LocalEntryNotFoundError,
     OfflineModeIsEnabled,
     RepositoryNotFoundError,
     RevisionNotFoundError,
+    build_hf_headers,
+    default_transfer_job,
     filter_repo_objects,
     logging,
     validate_hf_hub_args,
+    with_current_context,
 )
 from .utils import tqdm as hf_tqdm
 
@@ -115,7 +132,9 @@ def snapshot_download(
             If provided, files matching any of the patterns are not downloaded.
         max_workers (`int`, *optional*):
             Number of concurrent threads to download files (1 thread = 1 file download).
-            Defaults to 8.
+            Files are downloaded largest first. A file larger than `1 / max_workers` of the total download size is
+            split into byte ranges downloaded by several connections, so that it does not become the long tail of
+            the download. Defaults to 8.
         tqdm_class (`tqdm`, *optional*):
             If provided, overwrites the default behavior for the progress bar. Passed
             argument must inherit from `tqdm.auto.tqdm` or at least mimic its behavior.
@@ -145,6 +164,13 @@ def snapshot_download(
         revision = DEFAULT_REVISION
     if isinstance(cache_dir, Path):
         cache_dir = str(cache_dir)
+    if resume_download is not None:
+        warnings.warn(
+            "`resume_download` is deprecated and will be removed in version 1.0.0. "
+            "Downloads always resume when possible. "
+            "If you want to force a new download, use `force_download=True`.",
+            FutureWarning,
+        )
 
     if repo_type is None:
         repo_type = "model"
@@ -166,7 +192,10 @@ def snapshot_download(
                 endpoint=endpoint,
                 headers=headers,
             )
-            repo_info = api.repo_info(repo_id=repo_id, repo_type=repo_type, revision=revision, token=token)
+            # `files_metadata=True` to get blob ids and sizes => no need for a HEAD call per file
+            repo_info = api.repo_info(
+                repo_id=repo_id, repo_type=repo_type, revision=revision, token=token, files_metadata=True
+            )
         except (requests.exceptions.SSLError, requests.exceptions.ProxyError):
             # Actually raise for those subclasses of ConnectionError
             raise
@@ -260,16 +289,96 @@ def snapshot_download(
     # if passed revision is not identical to commit_hash
     # then revision has to be a branch name or tag name.
     # In that case store a ref.
-    if revision != commit_hash:
-        ref_path = os.path.join(storage_folder, "refs", revision)
-        os.makedirs(os.path.dirname(ref_path), exist_ok=True)
-        with open(ref_path, "w") as f:
-            f.write(commit_hash)
+    _cache_commit_hash_for_specific_revision(storage_folder, revision, commit_hash)
+
+    # Files metadata (etag, size) are known from the repo listing
+    # => download missing blobs directly, without a HEAD call per file.
+    siblings: Dict[str, RepoSibling] = {sibling.rfilename: sibling for sibling in repo_info.siblings}
+    hf_headers = build_hf_headers(
+        token=token,
+        library_name=library_name,
+        library_version=library_version,
+        user_agent=user_agent,
+        headers=headers,
+    )
+
+    def _file_size(repo_file: str) -> int:
+        sibling = siblings[repo_file]
+        return (sibling.lfs.size if sibling.lfs is not None else sibling.size) or 0
+
+    def _etag(repo_file: str) -> Optional[str]:
+        sibling = siblings[repo_file]
+        return sibling.lfs.sha256 if sibling.lfs is not None else sibling.blob_id
+
+    # Metadata of all files of a local dir are read at once (single transaction on its metadata index)
+    local_metadata = (
+        read_download_metadata_batch(Path(local_dir), filtered_repo_files)
+        if local_dir is not None and not force_download
+        else {}
+    )
+
+    def _is_unchanged(repo_file: str) -> bool:
+        # Same content already on disk, typically because the file didn't change since the last downloaded revision
+        etag = _etag(repo_file)
+        if force_download or etag is None or siblings[repo_file].size is None:
+            return False
+        if local_dir is None:
+            return os.path.exists(os.path.join(storage_folder, "blobs", etag))
+        metadata = local_metadata.get(repo_file)  # `None` if the local file is missing or has been modified
+        return metadata is not None and metadata.etag == etag
+
+    def _nb_connections(repo_file: str) -> int:
+        # A file bigger than a fair share of the work (`total_size / max_workers`) is split into ranges downloaded
+        # concurrently: 1 connection per share, up to `max_workers` => its download does not outlast the others.
+        if total_size == 0:
+            return HF_HUB_DOWNLOAD_CONNECTIONS
+        shares = math.ceil(_file_size(repo_file) * max_workers / total_size)
+        return max(HF_HUB_DOWNLOAD_CONNECTIONS, min(shares, max_workers))
 
     # we pass the commit_hash to hf_hub_download
     # so no network call happens if we already
     # have the file locally.
     def _inner_hf_hub_download(repo_file: str):
+        sibling = siblings[repo_file]
+        etag = _etag(repo_file)
+        if etag is not None and sibling.size is not None:
+            url_to_download = hf_hub_url(
+                repo_id, repo_file, repo_type=repo_type, revision=commit_hash, endpoint=endpoint
+            )
+            max_connections = _nb_connections(repo_file) if not HF_HUB_ENABLE_HF_TRANSFER else None
+            if local_dir is not None:
+                return _hf_hub_download_blob_to_local_dir(
+                    local_dir=local_dir,
+                    repo_id=repo_id,
+                    repo_type=repo_type,
+                    filename=repo_file,
+                    commit_hash=commit_hash,
+                    etag=etag,
+                    url_to_download=url_to_download,
+                    expected_size=_file_size(repo_file),
+                    headers=hf_headers,
+                    proxies=proxies,
+                    cache_dir=cache_dir,
+                    force_download=force_download,
+                    max_connections=max_connections,
+                )
+            return _hf_hub_download_blob_to_cache_dir(
+                cache_dir=cache_dir,
+                repo_id=repo_id,
+                repo_type=repo_type,
+                filename=repo_file,
+                revision=commit_hash,
+                commit_hash=commit_hash,
+                etag=etag,
+                url_to_download=url_to_download,
+                expected_size=_file_size(repo_file),
+                headers=hf_headers,
+                proxies=proxies,
+                force_download=force_download,
+                max_connections=max_connections,
+            )
+
+        # Metadata not available => let `hf_hub_download` fetch them
         return hf_hub_download(
             repo_id,
             filename=repo_file,
@@ -284,26 +393,76 @@ def snapshot_download(
             user_agent=user_agent,
             proxies=proxies,
             etag_timeout=etag_timeout,
-            resume_download=resume_download,
             force_download=force_download,
             token=token,
             headers=headers,
         )
 
-    if HF_HUB_ENABLE_HF_TRANSFER:
-        # when using hf_transfer we don't want extra parallelism
-        # from the one hf_transfer provides
-        for file in filtered_repo_files:
-            _inner_hf_hub_download(file)
-    else:
-        thread_map(
-            _inner_hf_hub_download,
-            filtered_repo_files,
-            desc=f"Fetching {len(filtered_repo_files)} files",
-            max_workers=max_workers,
+    # Unchanged files are linked (or their local metadata updated) in bulk, without any network call
+    # => only changed files are scheduled for download, and connections are shared between them only
+    unchanged_files = set(filter(_is_unchanged, filtered_repo_files))
+
+    if local_dir is not None and not force_download:
+        # Local metadata missing or outdated (e.g. local dir copied from another machine) => LFS files are compared by
+        # sha256. Hashing releases the GIL => candidates are hashed concurrently (sizes are compared before reading).
+        def _matches_local_file(repo_file: str) -> bool:
+            etag = _etag(repo_file)
+            return etag is not None and _local_file_matches_sha256(
+                Path(local_dir) / repo_file, etag, _file_size(repo_file)
+            )
+
+        candidates = [
+            repo_file
+            for repo_file in filtered_repo_files
+            if repo_file not in unchanged_files
+            and local_metadata.get(repo_file) is None
+            and siblings[repo_file].lfs is not None
+        ]
+        if len(candidates) > 0:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                matches = executor.map(_matches_local_file, candidates)
+                unchanged_files.update(repo_file for repo_file, match in zip(candidates, matches) if match)
+    files_to_download = [repo_file for repo_file in filtered_repo_files if repo_file not in unchanged_files]
+
+    # Largest files first => the biggest file does not start last and become the long tail of the download
+    files_to_download = sorted(files_to_download, key=_file_size, reverse=True)
+    total_size = sum(_file_size(repo_file) for repo_file in files_to_download)
+
+    # Fail fast if the snapshot doesn't fit on disk, instead of running out of space in the middle of the download
+    _check_snapshot_disk_space(total_size, local_dir if local_dir is not None else storage_folder)
+
+    if len(unchanged_files) > 0:
+        logger.info(f"{len(unchanged_files)} file(s) already up-to-date, {len(files_to_download)} to download.")
+        if local_dir is not None:
+            # Only the commit hash changes => single transaction for all files
+            write_download_metadata_batch(
+                Path(local_dir),
+                [(repo_file, commit_hash, _etag(repo_file)) for repo_file in unchanged_files],  # type: ignore[misc]
+            )
+        else:
+            for repo_file in unchanged_files:
+                _inner_hf_hub_download(repo_file)
+
+    # All files are downloaded as a single transfer job => fair share of connections with concurrent calls
+    with default_transfer_job(name=repo_id):
+        if HF_HUB_ENABLE_HF_TRANSFER:
+            # when using hf_transfer we don't want extra parallelism
+            # from the one hf_transfer provides
+            for file in files_to_download:
+                _inner_hf_hub_download(file)
+        else:
+            # Progress is reported in bytes: a file count would stall on the largest files (which start first)
             # User can use its own tqdm class or the default one from `huggingface_hub.utils`
-            tqdm_class=tqdm_class or hf_tqdm,
-        )
+            with (tqdm_class or hf_tqdm)(
+                total=total_size, unit="B", unit_scale=True, desc=f"Fetching {len(files_to_download)} files"
+            ) as progress, ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(with_current_context(_inner_hf_hub_download), repo_file): repo_file
+                    for repo_file in files_to_download
+                }
+                for future in as_completed(futures):
+                    future.result()  # re-raise first error if any
+                    progress.update(_file_size(futures[future]))
 
     if local_dir is not None:
         return str(os.path.realpath(local_dir))
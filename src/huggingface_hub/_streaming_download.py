@@ -0,0 +1,292 @@
+# coding=utf-8
+# Copyright 2024-present, the HuggingFace Inc. team.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Contains utilities to read a file from the Hub while it is being downloaded to the cache (see `hf_hub_open`)."""
+
+import io
+import json
+import os
+import threading
+from concurrent.futures import Future, wait
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional, Union
+
+from .constants import DEFAULT_ETAG_TIMEOUT, DEFAULT_REVISION, HF_HUB_CACHE, HF_HUB_ENABLE_HF_TRANSFER, REPO_TYPES
+from .file_download import _hf_hub_download_to_cache_dir, _pread, _ranges_state_path
+from .utils import build_hf_headers, logging, validate_hf_hub_args, with_current_context
+
+
+logger = logging.get_logger(__name__)
+
+
+@validate_hf_hub_args
+def hf_hub_open(
+    repo_id: str,
+    filename: str,
+    *,
+    subfolder: Optional[str] = None,
+    repo_type: Optional[str] = None,
+    revision: Optional[str] = None,
+    cache_dir: Union[str, Path, None] = None,
+    proxies: Optional[Dict] = None,
+    etag_timeout: float = DEFAULT_ETAG_TIMEOUT,
+    token: Union[bool, str, None] = None,
+    local_files_only: bool = False,
+    headers: Optional[Dict[str, str]] = None,
+    endpoint: Optional[str] = None,
+    poll_interval: float = 0.1,
+) -> BinaryIO:
+    """Open a file from the Hub for reading, without waiting for its download to complete.
+
+    The file is downloaded to the cache in a background thread, exactly as with [`hf_hub_download`]. If the file is
+    already cached, it is opened directly. Otherwise, the returned file object reads the file while it is being
+    downloaded, either by this process or by another process downloading the same file concurrently. Reads block until
+    the requested bytes have been downloaded. Once the download is complete, reads are made on the cached file.
+
+    This is useful to start parsing a large file (e.g. a checkpoint shard) as soon as possible, in particular when
+    several processes ask for the same file: only one of them downloads it and all of them can read it meanwhile.
+
+    <Tip warning={true}>
+
+    Data read before the end of the download has not been checked yet. If the download fails (e.g. because of a
+    checksum mismatch), the next read raises the download error.
+
+    </Tip>
+
+    Args:
+        repo_id (`str`):
+            A user or an organization name and a repo name separated by a `/`.
+        filename (`str`):
+            The name of the file in the repo.
+        subfolder (`str`, *optional*):
+            An optional value corresponding to a folder inside the repo.
+        repo_type (`str`, *optional*):
+            Set to `"dataset"` or `"space"` if downloading from a dataset or space, `None` or `"model"` if downloading
+            from a model. Default is `None`.
+        revision (`str`, *optional*):
+            An optional Git revision id which can be a branch name, a tag, or a commit hash.
+        cache_dir (`str`, `Path`, *optional*):
+            Path to the folder where cached files are stored.
+        proxies (`dict`, *optional*):
+            Dictionary mapping protocol to the URL of the proxy passed to `requests.request`.
+        etag_timeout (`float`, *optional*, defaults to `10`):
+            When fetching ETag, how many seconds to wait for the server to send data before giving up.
+        token (`str`, `bool`, *optional*):
+            A token to be used for the download (see [`hf_hub_download`]).
+        local_files_only (`bool`, *optional*, defaults to `False`):
+            If `True`, avoid downloading the file and open the local cached file if it exists.
+        headers (`dict`, *optional*):
+            Additional headers to be sent with the request.
+        endpoint (`str`, *optional*):
+            Hugging Face Hub base url. Defaults to https://huggingface.co.
+        poll_interval (`float`, *optional*, defaults to `0.1`):
+            How many seconds to wait between two checks of the download progress when the requested bytes are not
+            available yet.
+
+    Returns:
+        `BinaryIO`: a binary file object opened for reading. It should be closed after use.
+
+    Raises:
+        Same errors as [`hf_hub_download`]. Errors happening before the download starts (e.g. repo not found) are
+        raised by this method. Errors happening during the download are raised by the next read.
+
+    Example:
+    ```py
+    >>> from huggingface_hub import hf_hub_open
+
+    >>> with hf_hub_open("bigscience/bloom", "model_00001-of-00072.safetensors") as f:
+    ...     header_size = int.from_bytes(f.read(8), "little")  # returns as soon as the first bytes are downloaded
+    ```
+    """
+    if cache_dir is None:
+        cache_dir = HF_HUB_CACHE
+    if revision is None:
+        revision = DEFAULT_REVISION
+    if subfolder == "":
+        subfolder = None
+    if subfolder is not None:
+        filename = f"{subfolder}/{filename}"
+    if repo_type is None:
+        repo_type = "model"
+    if repo_type not in REPO_TYPES:
+        raise ValueError(f"Invalid repo type: {repo_type}. Accepted repo types are: {str(REPO_TYPES)}")
+
+    download: "Future[str]" = Future()
+    started = threading.Event()
+    blob: Dict[str, Union[str, int]] = {}
+
+    def _on_blob_path(blob_path: str, expected_size: int) -> None:
+        blob.update(path=blob_path, size=expected_size)
+        started.set()
+
+    def _download() -> None:
+        try:
+            download.set_result(
+                _hf_hub_download_to_cache_dir(
+                    cache_dir=str(cache_dir),
+                    repo_id=repo_id,
+                    filename=filename,
+                    repo_type=repo_type,
+                    revision=revision,
+                    headers=build_hf_headers(token=token, headers=headers),
+                    proxies=proxies,
+                    etag_timeout=etag_timeout,
+                    endpoint=endpoint,
+                    local_files_only=local_files_only,
+                    force_download=False,
+                    blob_path_callback=_on_blob_path,
+                )
+            )
+        except BaseException as e:
+            download.set_exception(e)
+        finally:
+            started.set()
+
+    threading.Thread(target=with_current_context(_download), name=f"hf_hub_open({filename})", daemon=True).start()
+
+    # Wait until the file is available or its download has started (i.e. the blob path is known)
+    started.wait()
+    if download.done() or "path" not in blob:
+        return open(download.result(), "rb")  # raise if download failed
+
+    return io.BufferedReader(
+        _FollowDownloadReader(
+            blob_path=str(blob["path"]),
+            expected_size=int(blob["size"]),
+            download=download,
+            poll_interval=poll_interval,
+        )
+    )
+
+
+class _FollowDownloadReader(io.RawIOBase):
+    """Read a blob while it is being downloaded to `<blob_path>.incomplete`.
+
+    Bytes already downloaded are found from the download progress:
+    - sequential downloads (see `http_get`) append to the incomplete file => its size is the number of bytes available.
+    - parallel downloads (see `_http_get_ranges`) write ranges out of order in a preallocated file and store the
+      completed ranges in a `.ranges` sidecar file => only contiguous completed ranges can be read.
+
+    Once `download` is done, reads are made on the downloaded file (or raise the download error).
+    """
+
+    def __init__(self, blob_path: str, expected_size: int, download: "Future[str]", poll_interval: float) -> None:
+        super().__init__()
+        self._incomplete_path = Path(blob_path + ".incomplete")
+        self._state_path = _ranges_state_path(self._incomplete_path)
+        self._expected_size = expected_size
+        self._download = download
+        self._poll_interval = poll_interval
+        self._position = 0
+        self._fd: Optional[int] = None
+        self._file: Optional[BinaryIO] = None
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._expected_size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self._position = position
+        return position
+
+    def readinto(self, buffer) -> int:  # type: ignore[override]
+        while True:
+            if self._file is None and self._download.done():
+                # Download complete => switch to the final file (raise if download failed)
+                self._file = open(self._download.result(), "rb")
+                self._close_fd()
+            if self._file is not None:
+                self._file.seek(self._position)
+                nb_bytes = self._file.readinto(buffer)  # type: ignore[attr-defined]
+                self._position += nb_bytes
+                return nb_bytes
+
+            if self._position >= self._expected_size:
+                return 0
+            available = self._available_bytes() if not HF_HUB_ENABLE_HF_TRANSFER else 0
+            if available > 0:
+                try:
+                    data = _pread(self._incomplete_fd(), min(len(buffer), available), self._position)
+                except FileNotFoundError:
+                    data = b""  # download restarted or complete in the meantime
+                if len(data) > 0:
+                    buffer[: len(data)] = data
+                    self._position += len(data)
+                    return len(data)
+
+            # Wait for more data (returns early if the download completes)
+            wait([self._download], timeout=self._poll_interval)
+
+    def close(self) -> None:
+        self._close_fd()
+        if self._file is not None:
+            self._file.close()
+        super().close()
+
+    def _available_bytes(self) -> int:
+        """Number of bytes that can be read from the incomplete file at the current position."""
+        while True:
+            try:
+                state = json.loads(self._state_path.read_text())
+                range_size, done = state["range_size"], set(state["done"])
+            except FileNotFoundError:
+                state = None
+            except (OSError, ValueError, KeyError, TypeError):
+                # State file exists but cannot be read (e.g. no permission, being written) => retry after polling
+                return 0
+
+            if state is not None:
+                # Parallel download => only contiguous completed ranges are valid
+                idx = self._position // range_size
+                while idx in done:
+                    idx += 1
+                return max(0, min(idx * range_size, self._expected_size) - self._position)
+
+            try:
+                size = self._incomplete_path.stat().st_size
+            except FileNotFoundError:
+                size = 0
+            if self._state_path.exists():
+                # A parallel download started meanwhile => file size does not reflect the progress anymore
+                continue
+            return max(0, min(size, self._expected_size) - self._position)
+
+    def _incomplete_fd(self) -> int:
+        """File descriptor on the incomplete file. Reopened if the download restarted with a new file."""
+        if self._fd is not None:
+            try:
+                if os.stat(self._incomplete_path).st_ino == os.fstat(self._fd).st_ino:
+                    return self._fd
+            except FileNotFoundError:
+                return self._fd  # moved to its final location => same content
+            self._close_fd()
+        self._fd = os.open(self._incomplete_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        return self._fd
+
+    def _close_fd(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,140 @@
+# coding=utf-8
+# Copyright 2024-present, the HuggingFace Inc. team.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Contains utilities to cache the hash of files uploaded to the Hub.
+
+Before being uploaded, each file is hashed to compute its sha256 (see `UploadInfo`). When the same local files are
+uploaded again and again (e.g. a training output folder pushed after each epoch), most of them have not changed since
+the previous upload. If `HF_HUB_ENABLE_UPLOAD_HASH_CACHE` is set, the sha256 and first 512 bytes of each hashed file are
+stored in a SQLite database (`HF_HUB_UPLOAD_HASH_CACHE_PATH`, defaults to `~/.cache/huggingface/upload_hashes.sqlite`).
+An entry is keyed by the absolute path of the file and is only valid as long as the size, modification time and inode of
+the file are unchanged.
+"""
+
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from . import constants
+from .lfs import UploadInfo
+from .utils import logging
+
+
+logger = logging.get_logger(__name__)
+
+# Maximum number of variables in a SQLite query (999 for SQLite < 3.32)
+_CACHE_MAX_VARIABLES = 999
+# Seconds to wait for a concurrent transaction (e.g. from another process) before failing
+_CACHE_TIMEOUT = 60.0
+# Files modified less than 2s before being hashed are not cached: on filesystems with a coarse mtime resolution, a
+# second write within the same tick would not change the cache key.
+_CACHE_MIN_AGE_NS = 2 * 10**9
+
+
+def get_cached_upload_infos(paths: Iterable[str]) -> Dict[str, Optional[UploadInfo]]:
+    """Return the cached `UploadInfo` of each file, `None` if not cached or modified since it was hashed.
+
+    Returns an empty dict if `HF_HUB_ENABLE_UPLOAD_HASH_CACHE` is not set.
+    """
+    if not constants.HF_HUB_ENABLE_UPLOAD_HASH_CACHE:
+        return {}
+
+    abspaths = {path: os.path.abspath(path) for path in paths}
+    unique_abspaths = list(set(abspaths.values()))
+    rows: Dict[str, Tuple[int, int, int, bytes, bytes]] = {}
+    try:
+        with _open_cache() as cache:
+            for start in range(0, len(unique_abspaths), _CACHE_MAX_VARIABLES):
+                chunk = unique_abspaths[start : start + _CACHE_MAX_VARIABLES]
+                query = f"SELECT path, size, mtime_ns, inode, sha256, sample FROM hashes WHERE path IN ({', '.join('?' * len(chunk))})"
+                for abspath, *row in cache.execute(query, chunk):
+                    rows[abspath] = tuple(row)  # type: ignore
+    except (sqlite3.Error, OSError) as e:
+        _on_cache_error(e)
+
+    upload_infos: Dict[str, Optional[UploadInfo]] = {}
+    for path, abspath in abspaths.items():
+        upload_infos[path] = None
+        if abspath not in rows:
+            continue
+        size, mtime_ns, inode, sha256, sample = rows[abspath]
+        try:
+            stat = os.stat(abspath)
+        except FileNotFoundError:
+            continue
+        if (stat.st_size, stat.st_mtime_ns, stat.st_ino) == (size, mtime_ns, inode):
+            upload_infos[path] = UploadInfo(sha256=sha256, size=size, sample=sample)
+    return upload_infos
+
+
+def cache_upload_infos(entries: Iterable[Tuple[str, os.stat_result, UploadInfo]]) -> None:
+    """Cache the `UploadInfo` of files hashed when their stat was `os.stat_result`.
+
+    The stat must be taken *before* hashing: if the file is modified while being hashed, the entry is outdated right away.
+    Does nothing if `HF_HUB_ENABLE_UPLOAD_HASH_CACHE` is not set.
+    """
+    if not constants.HF_HUB_ENABLE_UPLOAD_HASH_CACHE:
+        return
+
+    now_ns = time.time_ns()
+    rows = [
+        (os.path.abspath(path), info.size, stat.st_mtime_ns, stat.st_ino, info.sha256, info.sample)
+        for path, stat, info in entries
+        if info.size == stat.st_size and now_ns - stat.st_mtime_ns >= _CACHE_MIN_AGE_NS
+    ]
+    if len(rows) == 0:
+        return
+    try:
+        with _open_cache() as cache:
+            cache.executemany("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)", rows)
+    except (sqlite3.Error, OSError) as e:
+        _on_cache_error(e)
+
+
+@contextmanager
+def _open_cache() -> Iterator[sqlite3.Connection]:
+    """Open the upload hash cache (created if missing) and run a transaction on it."""
+    cache_path = Path(constants.HF_HUB_UPLOAD_HASH_CACHE_PATH)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(str(cache_path), timeout=_CACHE_TIMEOUT)
+    try:
+        with connection:  # commit on success, rollback on error
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS hashes (path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT"
+                " NULL, inode INTEGER NOT NULL, sha256 BLOB NOT NULL, sample BLOB NOT NULL)"
+            )
+            yield connection
+    finally:
+        connection.close()
+
+
+def _on_cache_error(error: Exception) -> None:
+    """The cache only saves time: never fail an upload because of it.
+
+    A corrupted database is removed from disk. Other errors (unwritable path, database locked by another process,
+    etc.) are only logged and the cache is ignored for this call.
+    """
+    cache_path = Path(constants.HF_HUB_UPLOAD_HASH_CACHE_PATH)
+    if isinstance(error, sqlite3.DatabaseError) and not isinstance(error, sqlite3.OperationalError):
+        logger.warning(f"Invalid upload hash cache {cache_path}: {error}. Removing it from disk and continue.")
+    else:
+        logger.warning(f"Cannot use upload hash cache {cache_path}: {error}. Continuing without cache.")
+        return
+    try:
+        cache_path.unlink()
+    except OSError as e:
+        logger.warning(f"Could not remove corrupted upload hash cache {cache_path}: {e}")
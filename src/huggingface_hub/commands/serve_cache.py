@@ -0,0 +1,70 @@
+# coding=utf-8
+# Copyright 2024-present, the HuggingFace Inc. team.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Contains command to serve the HF cache directory to other machines.
+
+Usage:
+    huggingface-cli serve-cache
+    huggingface-cli serve-cache --host 0.0.0.0 --port 8080
+    huggingface-cli serve-cache --dir ~/.cache/huggingface/hub
+"""
+
+from argparse import Namespace, _SubParsersAction
+from typing import Optional
+
+from .._cache_server import serve_cache
+from . import BaseHuggingfaceCLICommand
+from ._cli_utils import ANSI
+
+
+class ServeCacheCommand(BaseHuggingfaceCLICommand):
+    @staticmethod
+    def register_subcommand(parser: _SubParsersAction):
+        serve_cache_parser = parser.add_parser(
+            "serve-cache", help="Serve cache directory to other machines, with the same routes as the Hub."
+        )
+        serve_cache_parser.add_argument(
+            "--dir",
+            type=str,
+            default=None,
+            help="cache directory to serve (optional). Default to the default HuggingFace cache.",
+        )
+        serve_cache_parser.add_argument(
+            "--host",
+            type=str,
+            default="127.0.0.1",
+            help="address to listen on. Use 0.0.0.0 to accept connections from other machines. Default to 127.0.0.1.",
+        )
+        serve_cache_parser.add_argument("--port", type=int, default=8080, help="port to listen on. Default to 8080.")
+        serve_cache_parser.add_argument(
+            "--endpoint",
+            type=str,
+            default=None,
+            help="endpoint to download missing files from (optional). Default to HF_ENDPOINT.",
+        )
+        serve_cache_parser.set_defaults(func=ServeCacheCommand)
+
+    def __init__(self, args: Namespace) -> None:
+        self.cache_dir: Optional[str] = args.dir
+        self.host: str = args.host
+        self.port: int = args.port
+        self.endpoint: Optional[str] = args.endpoint
+
+    def run(self):
+        print(f"Serving cache on {ANSI.bold(f'http://{self.host}:{self.port}')}. Press CTRL+C to quit.")
+        print(f"Set HF_ENDPOINT=http://<this-machine>:{self.port} on other machines to download from this cache.")
+        try:
+            serve_cache(cache_dir=self.cache_dir, host=self.host, port=self.port, endpoint=self.endpoint)
+        except KeyboardInterrupt:
+            print("Stopped.")
@@ -1,7 +1,7 @@
 import os
 import re
 import typing
-from typing import Literal, Optional, Tuple
+from typing import List, Literal, Optional, Tuple
 
 
 # Possible values for env variables
@@ -23,6 +23,34 @@ def _as_int(value: Optional[str]) -> Optional[int]:
     return int(value)
 
 
+_SIZE_UNITS = {"": 1, "K": 10**3, "M": 10**6, "G": 10**9, "T": 10**12, "P": 10**15}
+
+
+def _as_size(value: Optional[str]) -> Optional[int]:
+    """Parse a size in bytes, optionally with a unit (e.g. "200G", "1.5TB", "512MiB")."""
+    if value is None:
+        return None
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGTP]?)(I?)B?\s*", value.upper())
+    if match is None:
+        raise ValueError(f"Invalid size: '{value}'. Expected a number of bytes with an optional unit (e.g. '200G').")
+    number, unit, binary = match.groups()
+    multiplier = 1024 ** list(_SIZE_UNITS).index(unit) if binary else _SIZE_UNITS[unit]
+    return int(float(number) * multiplier)
+
+
+def _as_cache_tiers(value: Optional[str]) -> List[Tuple[str, Optional[int]]]:
+    """Parse a list of cache folders separated by `os.pathsep`, each with an optional maximum size.
+
+    Example: "/nvme/hf=200G:/nfs/hf" => [("/nvme/hf", 200_000_000_000), ("/nfs/hf", None)]
+    """
+    tiers: List[Tuple[str, Optional[int]]] = []
+    for tier in (value or "").split(os.pathsep):
+        path, _, max_size = tier.partition("=")
+        if path.strip():
+            tiers.append((os.path.expanduser(path.strip()), _as_size(max_size) if max_size else None))
+    return tiers
+
+
 # Constants for file downloads
 
 PYTORCH_WEIGHTS_NAME = "pytorch_model.bin"
@@ -35,7 +63,11 @@ DEFAULT_ETAG_TIMEOUT = 10
 DEFAULT_DOWNLOAD_TIMEOUT = 10
 DEFAULT_REQUEST_TIMEOUT = 10
 DOWNLOAD_CHUNK_SIZE = 10 * 1024 * 1024
+DOWNLOAD_RANGE_SIZE = 64 * 1024 * 1024
 HF_TRANSFER_CONCURRENCY = 100
+# Commit payloads are streamed (chunked request body) when their regular files weigh more than this size in total.
+# Smaller payloads are built in memory and sent with a `Content-Length`.
+COMMIT_PAYLOAD_STREAMING_THRESHOLD = 32 * 1024 * 1024
 
 # Constants for serialization
 
@@ -121,6 +153,18 @@ HUGGINGFACE_ASSETS_CACHE = os.getenv("HUGGINGFACE_ASSETS_CACHE", default_assets_
 
 # New env variables
 HF_HUB_CACHE = os.getenv("HF_HUB_CACHE", HUGGINGFACE_HUB_CACHE)
+
+# Ordered list of cache folders, fastest first (e.g. "/nvme/hf:/nfs/hf" for a local disk in front of a shared network
+# cache). Each folder can have its own maximum size (e.g. "/nvme/hf=200G:/nfs/hf"). If set, the first tier is the cache.
+# Files missing from it are copied from the other tiers and new downloads are written to the last tier first.
+HF_HUB_CACHE_TIERS: List[Tuple[str, Optional[int]]] = _as_cache_tiers(os.environ.get("HF_HUB_CACHE_TIERS"))
+if len(HF_HUB_CACHE_TIERS) > 0:
+    HF_HUB_CACHE = HF_HUB_CACHE_TIERS[0][0]
+
+# Maximum size of the cache (e.g. "200G"). Once exceeded, least recently used revisions are evicted after each download
+# (see `huggingface_hub.evict_cache`). Disabled by default.
+HF_HUB_CACHE_MAX_SIZE: Optional[int] = _as_size(os.environ.get("HF_HUB_CACHE_MAX_SIZE")) or None
+
 HF_ASSETS_CACHE = os.getenv("HF_ASSETS_CACHE", HUGGINGFACE_ASSETS_CACHE)
 
 HF_HUB_OFFLINE = _is_true(os.environ.get("HF_HUB_OFFLINE") or os.environ.get("TRANSFORMERS_OFFLINE"))
@@ -171,6 +215,33 @@ HF_HUB_DISABLE_IMPLICIT_TOKEN: bool = _is_true(os.environ.get("HF_HUB_DISABLE_IM
 # - https://github.com/huggingface/hf_transfer (private)
 HF_HUB_ENABLE_HF_TRANSFER: bool = _is_true(os.environ.get("HF_HUB_ENABLE_HF_TRANSFER"))
 
+# Number of concurrent connections used to download a single large file in pure Python.
+# Files are split into byte ranges of `DOWNLOAD_RANGE_SIZE` bytes. Defaults to 1 (no parallelism).
+HF_HUB_DOWNLOAD_CONNECTIONS: int = _as_int(os.environ.get("HF_HUB_DOWNLOAD_CONNECTIONS")) or 1
+
+# Number of seconds during which a branch or tag resolved to a commit hash is trusted without asking the server again.
+# Files already cached for this commit are then returned without any HTTP call. Disabled by default (0).
+HF_HUB_REVISION_CACHE_TTL: int = _as_int(os.environ.get("HF_HUB_REVISION_CACHE_TTL")) or 0
+
+# Number of concurrent connections used to upload the parts of a single large LFS file in pure Python.
+HF_HUB_UPLOAD_CONNECTIONS: int = _as_int(os.environ.get("HF_HUB_UPLOAD_CONNECTIONS")) or 8
+
+# Cache the sha256 of files hashed before being uploaded, keyed by path, size, mtime and inode. Files uploaded again
+# without being modified are not re-hashed. Disabled by default.
+HF_HUB_ENABLE_UPLOAD_HASH_CACHE: bool = _is_true(os.environ.get("HF_HUB_ENABLE_UPLOAD_HASH_CACHE"))
+HF_HUB_UPLOAD_HASH_CACHE_PATH: str = os.environ.get(
+    "HF_HUB_UPLOAD_HASH_CACHE_PATH", os.path.join(HF_HOME, "upload_hashes.sqlite")
+)
+
+# Store blobs in a content-addressed store shared by all repos of the cache (`{cache_dir}/blobs/<etag>`).
+# Repo blobs are hardlinks to the shared ones => identical files in different repos are downloaded and stored once.
+HF_HUB_ENABLE_SHARED_BLOBS: bool = _is_true(os.environ.get("HF_HUB_ENABLE_SHARED_BLOBS"))
+
+# Process-wide limits shared by all downloads and uploads (see `huggingface_hub.utils.TransferScheduler`).
+# Maximum number of concurrent data connections and maximum bandwidth in bytes per second. 0 means unlimited.
+HF_HUB_MAX_CONNECTIONS: int = _as_int(os.environ.get("HF_HUB_MAX_CONNECTIONS")) or 0
+HF_HUB_MAX_BANDWIDTH: int = _as_int(os.environ.get("HF_HUB_MAX_BANDWIDTH")) or 0
+
 
 # UNUSED
 # We don't use symlinks in local dir anymore.
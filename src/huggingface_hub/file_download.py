@@ -1,19 +1,40 @@
 import contextlib
 import copy
+import ctypes
 import errno
 import fnmatch
 import inspect
 import json
+import mmap
 import os
 import re
 import shutil
 import stat
+import sys
+import threading
 import time
 import uuid
 import warnings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, BinaryIO, Dict, Literal, NoReturn, Optional, Tuple, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Literal,
+    NoReturn,
+    Optional,
+    Tuple,
+    Union,
+)
 from urllib.parse import quote, urlparse
 
 import requests
@@ -29,12 +50,17 @@ from .constants import (
     DEFAULT_REQUEST_TIMEOUT,
     DEFAULT_REVISION,
     DOWNLOAD_CHUNK_SIZE,
+    DOWNLOAD_RANGE_SIZE,
     ENDPOINT,
     HF_HUB_CACHE,
+    HF_HUB_CACHE_TIERS,
     HF_HUB_DISABLE_SYMLINKS_WARNING,
+    HF_HUB_DOWNLOAD_CONNECTIONS,
     HF_HUB_DOWNLOAD_TIMEOUT,
     HF_HUB_ENABLE_HF_TRANSFER,
+    HF_HUB_ENABLE_SHARED_BLOBS,
     HF_HUB_ETAG_TIMEOUT,
+    HF_HUB_REVISION_CACHE_TTL,
     HF_TRANSFER_CONCURRENCY,
     HUGGINGFACE_CO_URL_TEMPLATE,
     HUGGINGFACE_HEADER_X_LINKED_ETAG,
@@ -54,8 +80,11 @@ from .utils import (
     RepositoryNotFoundError,
     RevisionNotFoundError,
     SoftTemporaryDirectory,
+    TransferTracker,
     WeakFileLock,
     build_hf_headers,
+    default_transfer_job,
+    emit_transfer_event,
     get_fastai_version,  # noqa: F401 # for backward compatibility
     get_fastcore_version,  # noqa: F401 # for backward compatibility
     get_graphviz_version,  # noqa: F401 # for backward compatibility
@@ -64,6 +93,7 @@ from .utils import (
     get_session,
     get_tf_version,  # noqa: F401 # for backward compatibility
     get_torch_version,  # noqa: F401 # for backward compatibility
+    get_transfer_scheduler,
     hf_raise_for_status,
     is_fastai_available,  # noqa: F401 # for backward compatibility
     is_fastcore_available,  # noqa: F401 # for backward compatibility
@@ -75,13 +105,20 @@ from .utils import (
     logging,
     reset_sessions,
     tqdm,
+    track_transfer,
     validate_hf_hub_args,
+    with_current_context,
 )
+from .utils._cache_eviction import _on_blob_added
 from .utils._deprecation import _deprecate_arguments, _deprecate_method
 from .utils._runtime import _PY_VERSION  # noqa: F401 # for backward compatibility
 from .utils._typing import HTTP_METHOD_T
 from .utils.insecure_hashlib import sha256
-from .utils.sha import sha_fileobj
+from .utils.sha import sha_file
+
+
+if TYPE_CHECKING:
+    import hashlib
 
 
 logger = logging.get_logger(__name__)
@@ -412,6 +449,8 @@ def http_get(
     displayed_filename: Optional[str] = None,
     _nb_retries: int = 5,
     _tqdm_bar: Optional[tqdm] = None,
+    _sha256: Optional["hashlib._Hash"] = None,
+    _tracker: Optional[TransferTracker] = None,
 ) -> None:
     """
     Download a remote file. Do not gobble up errors, and will return errors tailored to the Hugging Face Hub.
@@ -439,6 +478,23 @@ def http_get(
             The filename of the file that is being downloaded. Value is used only to display a nice progress bar. If
             not set, the filename is guessed from the URL or the `Content-Disposition` header.
     """
+    if _tracker is None:
+        # Emit transfer events (see `add_transfer_callback`) unless the caller already does
+        with track_transfer("download", name=displayed_filename, url=url, total=expected_size) as tracker:
+            return http_get(
+                url=url,
+                temp_file=temp_file,
+                proxies=proxies,
+                resume_size=resume_size,
+                headers=headers,
+                expected_size=expected_size,
+                displayed_filename=displayed_filename,
+                _nb_retries=_nb_retries,
+                _tqdm_bar=_tqdm_bar,
+                _sha256=_sha256,
+                _tracker=tracker,
+            )
+
     hf_transfer = None
     if HF_HUB_ENABLE_HF_TRANSFER:
         if resume_size != 0:
@@ -460,126 +516,459 @@ def http_get(
     if resume_size > 0:
         headers["Range"] = "bytes=%d-" % (resume_size,)
 
-    r = _request_wrapper(
-        method="GET", url=url, stream=True, proxies=proxies, headers=headers, timeout=HF_HUB_DOWNLOAD_TIMEOUT
-    )
-    hf_raise_for_status(r)
-    content_length = r.headers.get("Content-Length")
+    # Hold a connection slot while streaming (process-wide limit, see `TransferScheduler`)
+    scheduler = get_transfer_scheduler()
+    with scheduler.connection():
+        r = _request_wrapper(
+            method="GET", url=url, stream=True, proxies=proxies, headers=headers, timeout=HF_HUB_DOWNLOAD_TIMEOUT
+        )
+        hf_raise_for_status(r)
+        content_length = r.headers.get("Content-Length")
+
+        # NOTE: 'total' is the total number of bytes to download, not the number of bytes in the file.
+        #       If the file is compressed, the number of bytes in the saved file will be higher than 'total'.
+        total = resume_size + int(content_length) if content_length is not None else None
+
+        if displayed_filename is None:
+            displayed_filename = url
+            content_disposition = r.headers.get("Content-Disposition")
+            if content_disposition is not None:
+                match = HEADER_FILENAME_PATTERN.search(content_disposition)
+                if match is not None:
+                    # Means file is on CDN
+                    displayed_filename = match.groupdict()["filename"]
+
+        # Truncate filename if too long to display
+        if len(displayed_filename) > 40:
+            displayed_filename = f"(…){displayed_filename[-40:]}"
+
+        consistency_error_message = (
+            f"Consistency check failed: file should be of size {expected_size} but has size"
+            f" {{actual_size}} ({displayed_filename}).\nWe are sorry for the inconvenience. Please retry"
+            " with `force_download=True`.\nIf the issue persists, please let us know by opening an issue "
+            "on https://github.com/huggingface/huggingface_hub."
+        )
 
-    # NOTE: 'total' is the total number of bytes to download, not the number of bytes in the file.
-    #       If the file is compressed, the number of bytes in the saved file will be higher than 'total'.
-    total = resume_size + int(content_length) if content_length is not None else None
+        # Stream file to buffer
+        progress_cm: tqdm = (
+            tqdm(  # type: ignore[assignment]
+                unit="B",
+                unit_scale=True,
+                total=total,
+                initial=resume_size,
+                desc=displayed_filename,
+                disable=True if (logger.getEffectiveLevel() == logging.NOTSET) else None,
+                # ^ set `disable=None` rather than `disable=False` by default to disable progress bar when no TTY attached
+                # see https://github.com/huggingface/huggingface_hub/pull/2000
+                name="huggingface_hub.http_get",
+            )
+            if _tqdm_bar is None
+            else contextlib.nullcontext(_tqdm_bar)
+            # ^ `contextlib.nullcontext` mimics a context manager that does nothing
+            #   Makes it easier to use the same code path for both cases but in the later
+            #   case, the progress bar is not closed when exiting the context manager.
+        )
+
+        with progress_cm as progress:
+            if hf_transfer and total is not None and total > 5 * DOWNLOAD_CHUNK_SIZE:
+                supports_callback = "callback" in inspect.signature(hf_transfer.download).parameters
+                if not supports_callback:
+                    warnings.warn(
+                        "You are using an outdated version of `hf_transfer`. "
+                        "Consider upgrading to latest version to enable progress bars "
+                        "using `pip install -U hf_transfer`."
+                    )
+                try:
+                    hf_transfer.download(
+                        url=url,
+                        filename=temp_file.name,
+                        max_files=HF_TRANSFER_CONCURRENCY,
+                        chunk_size=DOWNLOAD_CHUNK_SIZE,
+                        headers=headers,
+                        parallel_failures=3,
+                        max_retries=5,
+                        **({"callback": _progress_callback(progress, _tracker)} if supports_callback else {}),
+                    )
+                except Exception as e:
+                    raise RuntimeError(
+                        "An error occurred while downloading using `hf_transfer`. Consider"
+                        " disabling HF_HUB_ENABLE_HF_TRANSFER for better error handling."
+                    ) from e
+                if not supports_callback:
+                    progress.update(total)
+                    _tracker.update(total)
+                if expected_size is not None and expected_size != os.path.getsize(temp_file.name):
+                    raise EnvironmentError(
+                        consistency_error_message.format(
+                            actual_size=os.path.getsize(temp_file.name),
+                        )
+                    )
+                return
+            new_resume_size = resume_size
+            try:
+                for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    if chunk:  # filter out keep-alive new chunks
+                        scheduler.throttle(len(chunk))
+                        progress.update(len(chunk))
+                        _tracker.update(len(chunk))
+                        temp_file.write(chunk)
+                        if _sha256 is not None:
+                            _sha256.update(chunk)
+                        new_resume_size += len(chunk)
+                        # Some data has been downloaded from the server so we reset the number of retries.
+                        _nb_retries = 5
+            except (requests.ConnectionError, requests.ReadTimeout) as e:
+                # If ConnectionError (SSLError) or ReadTimeout happen while streaming data from the server, it is most likely
+                # a transient error (network outage?). We log a warning message and try to resume the download a few times
+                # before giving up. Tre retry mechanism is basic but should be enough in most cases.
+                if _nb_retries <= 0:
+                    logger.warning("Error while downloading from %s: %s\nMax retries exceeded.", url, str(e))
+                    raise
+                logger.warning("Error while downloading from %s: %s\nTrying to resume download...", url, str(e))
+                _tracker.retry(f"{e} (resuming at byte {new_resume_size})")
+                time.sleep(1)
+                reset_sessions()  # In case of SSLError it's best to reset the shared requests.Session objects
+                return http_get(
+                    url=url,
+                    temp_file=temp_file,
+                    proxies=proxies,
+                    resume_size=new_resume_size,
+                    headers=initial_headers,
+                    expected_size=expected_size,
+                    _nb_retries=_nb_retries - 1,
+                    _tqdm_bar=_tqdm_bar,
+                    _sha256=_sha256,
+                    _tracker=_tracker,
+                )
+
+        if expected_size is not None and expected_size != temp_file.tell():
+            raise EnvironmentError(
+                consistency_error_message.format(
+                    actual_size=temp_file.tell(),
+                )
+            )
+
+
+def _progress_callback(progress: tqdm, tracker: TransferTracker) -> Callable[[int], None]:
+    """Callback reporting progress both to a progress bar and to a transfer tracker (e.g. for `hf_transfer`)."""
+
+    def _callback(nbytes: int) -> None:
+        progress.update(nbytes)
+        tracker.update(nbytes)
+
+    return _callback
+
+
+class _RangeRequestsNotSupported(Exception):
+    """Raised when the server does not honor a `Range` header (i.e. returns 200 instead of 206)."""
+
+
+def _http_get_ranges(
+    url: str,
+    incomplete_path: Path,
+    *,
+    expected_size: int,
+    proxies: Optional[Dict] = None,
+    headers: Optional[Dict[str, str]] = None,
+    displayed_filename: Optional[str] = None,
+    max_connections: Optional[int] = None,
+    _sha256: Optional["hashlib._Hash"] = None,
+    _tracker: Optional[TransferTracker] = None,
+) -> None:
+    """
+    Download a remote file using several concurrent HTTP range requests.
+
+    The file is split into ranges of `DOWNLOAD_RANGE_SIZE` bytes that are fetched on a thread pool and written at their
+    offset in `incomplete_path` (preallocated to `expected_size`). The list of completed ranges is saved in a sidecar
+    file (`<incomplete_path>.ranges`) so that an interrupted download can be resumed range by range. If
+    `incomplete_path` already exists without a sidecar file, it is considered to be the beginning of a sequential
+    download and the full ranges it contains are not downloaded again.
+
+    Each range is retried up to 5 times if a `ConnectionError` or a `ReadTimeout` happens while streaming data.
+
+    If `_sha256` is provided, it is updated with the whole content of the file (including resumed ranges). Since
+    ranges complete out of order, contiguous ranges are hashed as soon as they are available on disk, while the
+    download of the next ones is still in progress.
+
+    Args:
+        url (`str`):
+            The URL of the file to download.
+        incomplete_path (`Path`):
+            Path of the file in which the content is written.
+        expected_size (`int`):
+            The expected size of the file to download.
+        proxies (`dict`, *optional*):
+            Dictionary mapping protocol to the URL of the proxy passed to `requests.request`.
+        headers (`dict`, *optional*):
+            Dictionary of HTTP Headers to send with the request.
+        displayed_filename (`str`, *optional*):
+            The filename of the file that is being downloaded. Value is used only to display a nice progress bar.
+        max_connections (`int`, *optional*):
+            Maximum number of concurrent connections. Defaults to `HF_HUB_DOWNLOAD_CONNECTIONS`.
+
+    Raises:
+        `_RangeRequestsNotSupported`: if the server does not support range requests. The content of
+            `incomplete_path` must be discarded in that case.
+    """
+    if _tracker is None:
+        # Emit transfer events (see `add_transfer_callback`) unless the caller already does
+        with track_transfer("download", name=displayed_filename, url=url, total=expected_size) as tracker:
+            return _http_get_ranges(
+                url,
+                incomplete_path,
+                expected_size=expected_size,
+                proxies=proxies,
+                headers=headers,
+                displayed_filename=displayed_filename,
+                max_connections=max_connections,
+                _sha256=_sha256,
+                _tracker=tracker,
+            )
+
+    if max_connections is None:
+        max_connections = HF_HUB_DOWNLOAD_CONNECTIONS
+    scheduler = get_transfer_scheduler()  # ranges share the process-wide connection and bandwidth limits
+    headers = {**(headers or {}), "Accept-Encoding": "identity"}  # ranges are computed on the raw content
+    state_path = _ranges_state_path(incomplete_path)
+    nb_ranges = max(1, -(-expected_size // DOWNLOAD_RANGE_SIZE))  # ceil division
+
+    # Resume from previous state if any
+    done = _read_ranges_state(state_path, expected_size=expected_size)
+    if done is None:
+        if state_path.exists():
+            # Invalid or outdated state => content of the incomplete file cannot be trusted
+            incomplete_path.unlink(missing_ok=True)
+        # No state => content of the incomplete file (if any) has been written sequentially
+        resume_size = incomplete_path.stat().st_size if incomplete_path.exists() else 0
+        done = set(range(min(resume_size, expected_size) // DOWNLOAD_RANGE_SIZE))
+    todo = [idx for idx in range(nb_ranges) if idx not in done]
 
     if displayed_filename is None:
         displayed_filename = url
-        content_disposition = r.headers.get("Content-Disposition")
-        if content_disposition is not None:
-            match = HEADER_FILENAME_PATTERN.search(content_disposition)
-            if match is not None:
-                # Means file is on CDN
-                displayed_filename = match.groupdict()["filename"]
-
-    # Truncate filename if too long to display
     if len(displayed_filename) > 40:
         displayed_filename = f"(…){displayed_filename[-40:]}"
 
-    consistency_error_message = (
-        f"Consistency check failed: file should be of size {expected_size} but has size"
-        f" {{actual_size}} ({displayed_filename}).\nWe are sorry for the inconvenience. Please retry"
-        " with `force_download=True`.\nIf the issue persists, please let us know by opening an issue "
-        "on https://github.com/huggingface/huggingface_hub."
-    )
+    lock = threading.Lock()
+    failed = threading.Event()
+    hash_lock = threading.Lock()
+    next_idx_to_hash = 0
+
+    def _save_state() -> None:
+        tmp_path = state_path.with_name(state_path.name + ".tmp")
+        tmp_path.write_text(
+            json.dumps({"size": expected_size, "range_size": DOWNLOAD_RANGE_SIZE, "done": sorted(done)})
+        )
+        os.replace(tmp_path, state_path)
+
+    def _download_range(idx: int) -> None:
+        offset = idx * DOWNLOAD_RANGE_SIZE
+        end = min(offset + DOWNLOAD_RANGE_SIZE, expected_size)  # exclusive
+        nb_retries = 5
+        while offset < end:
+            if failed.is_set():  # another range failed => stop early
+                return
+            try:
+                with scheduler.connection():
+                    r = _request_wrapper(
+                        method="GET",
+                        url=url,
+                        stream=True,
+                        proxies=proxies,
+                        headers={**headers, "Range": f"bytes={offset}-{end - 1}"},
+                        timeout=HF_HUB_DOWNLOAD_TIMEOUT,
+                    )
+                    if r.status_code != 206:
+                        r.close()
+                        raise _RangeRequestsNotSupported(
+                            f"Server returned status {r.status_code} for a range request."
+                        )
+                    for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        if chunk:  # filter out keep-alive new chunks
+                            chunk = chunk[: end - offset]
+                            scheduler.throttle(len(chunk))
+                            _pwrite(fd, chunk, offset)
+                            offset += len(chunk)
+                            with lock:
+                                progress.update(len(chunk))
+                            _tracker.update(len(chunk))
+                            # Some data has been downloaded from the server so we reset the number of retries.
+                            nb_retries = 5
+                            if failed.is_set() or offset >= end:
+                                break
+                    r.close()
+                    if offset < end and not failed.is_set():
+                        raise requests.ConnectionError(f"Connection closed at byte {offset} (expected {end}).")
+            except (requests.ConnectionError, requests.ReadTimeout) as e:
+                if nb_retries <= 0:
+                    logger.warning("Error while downloading from %s: %s\nMax retries exceeded.", url, str(e))
+                    raise
+                logger.warning("Error while downloading from %s: %s\nTrying to resume download...", url, str(e))
+                _tracker.retry(f"{e} (resuming range at byte {offset})")
+                time.sleep(1)
+                reset_sessions()  # In case of SSLError it's best to reset the shared requests.Session objects
+                nb_retries -= 1
+
+        with lock:
+            done.add(idx)
+            _save_state()
+        _hash_completed_ranges(blocking=False)
+
+    def _hash_completed_ranges(blocking: bool) -> None:
+        # Hash contiguous completed ranges. If another thread is already hashing, it will pick up the new ranges.
+        nonlocal next_idx_to_hash
+        if _sha256 is None or not hash_lock.acquire(blocking=blocking):
+            return
+        try:
+            while next_idx_to_hash < nb_ranges and not failed.is_set():
+                with lock:
+                    if next_idx_to_hash not in done:
+                        return
+                offset = next_idx_to_hash * DOWNLOAD_RANGE_SIZE
+                end = min(offset + DOWNLOAD_RANGE_SIZE, expected_size)
+                while offset < end:
+                    data = _pread(fd, min(DOWNLOAD_CHUNK_SIZE, end - offset), offset)
+                    if not data:
+                        raise EnvironmentError(f"Unexpected end of file while hashing {incomplete_path}.")
+                    _sha256.update(data)
+                    offset += len(data)
+                next_idx_to_hash += 1
+        finally:
+            hash_lock.release()
+
+    def _wrapped_download_range(idx: int) -> None:
+        try:
+            _download_range(idx)
+        except BaseException:
+            failed.set()
+            raise
 
-    # Stream file to buffer
-    progress_cm: tqdm = (
-        tqdm(  # type: ignore[assignment]
+    # Preallocate file so that ranges can be written at their offset
+    # (do not open in append mode: `pwrite` ignores the offset on files opened with `O_APPEND`)
+    fd = os.open(incomplete_path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        # State is saved before preallocating: readers following the download (see `hf_hub_open`) rely on it to know
+        # which bytes of the file are valid.
+        _save_state()
+        if os.fstat(fd).st_size < expected_size and not _preallocate(fd, expected_size):
+            os.ftruncate(fd, expected_size)  # sparse file if preallocation is not supported
+
+        remaining = sum(min(DOWNLOAD_RANGE_SIZE, expected_size - idx * DOWNLOAD_RANGE_SIZE) for idx in todo)
+        with tqdm(
             unit="B",
             unit_scale=True,
-            total=total,
-            initial=resume_size,
+            total=expected_size,
+            initial=expected_size - remaining,
             desc=displayed_filename,
             disable=True if (logger.getEffectiveLevel() == logging.NOTSET) else None,
             # ^ set `disable=None` rather than `disable=False` by default to disable progress bar when no TTY attached
             # see https://github.com/huggingface/huggingface_hub/pull/2000
             name="huggingface_hub.http_get",
-        )
-        if _tqdm_bar is None
-        else contextlib.nullcontext(_tqdm_bar)
-        # ^ `contextlib.nullcontext` mimics a context manager that does nothing
-        #   Makes it easier to use the same code path for both cases but in the later
-        #   case, the progress bar is not closed when exiting the context manager.
-    )
+        ) as progress:
+            if len(todo) > 0:
+                with ThreadPoolExecutor(max_workers=max(1, min(max_connections, len(todo)))) as executor:
+                    # Run workers in the caller's context => ranges belong to the caller's transfer job
+                    futures = [executor.submit(with_current_context(_wrapped_download_range), idx) for idx in todo]
+                    for future in futures:
+                        future.result()  # re-raise first error if any
+            _hash_completed_ranges(blocking=True)  # hash remaining ranges (or all of them if nothing to download)
+    finally:
+        os.close(fd)
 
-    with progress_cm as progress:
-        if hf_transfer and total is not None and total > 5 * DOWNLOAD_CHUNK_SIZE:
-            supports_callback = "callback" in inspect.signature(hf_transfer.download).parameters
-            if not supports_callback:
-                warnings.warn(
-                    "You are using an outdated version of `hf_transfer`. "
-                    "Consider upgrading to latest version to enable progress bars "
-                    "using `pip install -U hf_transfer`."
-                )
-            try:
-                hf_transfer.download(
-                    url=url,
-                    filename=temp_file.name,
-                    max_files=HF_TRANSFER_CONCURRENCY,
-                    chunk_size=DOWNLOAD_CHUNK_SIZE,
-                    headers=headers,
-                    parallel_failures=3,
-                    max_retries=5,
-                    **({"callback": progress.update} if supports_callback else {}),
-                )
-            except Exception as e:
-                raise RuntimeError(
-                    "An error occurred while downloading using `hf_transfer`. Consider"
-                    " disabling HF_HUB_ENABLE_HF_TRANSFER for better error handling."
-                ) from e
-            if not supports_callback:
-                progress.update(total)
-            if expected_size is not None and expected_size != os.path.getsize(temp_file.name):
-                raise EnvironmentError(
-                    consistency_error_message.format(
-                        actual_size=os.path.getsize(temp_file.name),
-                    )
-                )
-            return
-        new_resume_size = resume_size
-        try:
-            for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
-                if chunk:  # filter out keep-alive new chunks
-                    progress.update(len(chunk))
-                    temp_file.write(chunk)
-                    new_resume_size += len(chunk)
-                    # Some data has been downloaded from the server so we reset the number of retries.
-                    _nb_retries = 5
-        except (requests.ConnectionError, requests.ReadTimeout) as e:
-            # If ConnectionError (SSLError) or ReadTimeout happen while streaming data from the server, it is most likely
-            # a transient error (network outage?). We log a warning message and try to resume the download a few times
-            # before giving up. Tre retry mechanism is basic but should be enough in most cases.
-            if _nb_retries <= 0:
-                logger.warning("Error while downloading from %s: %s\nMax retries exceeded.", url, str(e))
-                raise
-            logger.warning("Error while downloading from %s: %s\nTrying to resume download...", url, str(e))
-            time.sleep(1)
-            reset_sessions()  # In case of SSLError it's best to reset the shared requests.Session objects
-            return http_get(
-                url=url,
-                temp_file=temp_file,
-                proxies=proxies,
-                resume_size=new_resume_size,
-                headers=initial_headers,
-                expected_size=expected_size,
-                _nb_retries=_nb_retries - 1,
-                _tqdm_bar=_tqdm_bar,
-            )
+    # Download complete => remove state file
+    state_path.unlink(missing_ok=True)
 
-    if expected_size is not None and expected_size != temp_file.tell():
-        raise EnvironmentError(
-            consistency_error_message.format(
-                actual_size=temp_file.tell(),
-            )
-        )
+
+def _ranges_state_path(incomplete_path: Path) -> Path:
+    """Return the path of the sidecar file storing the completed ranges of a parallel download."""
+    return incomplete_path.with_name(incomplete_path.name + ".ranges")
+
+
+def _read_ranges_state(state_path: Path, expected_size: int) -> Optional[set]:
+    """Read the set of completed ranges from a sidecar file. Return `None` if no valid state exists."""
+    if not state_path.exists():
+        return None
+    try:
+        state = json.loads(state_path.read_text())
+        if state["size"] == expected_size and state["range_size"] == DOWNLOAD_RANGE_SIZE:
+            return set(int(idx) for idx in state["done"])
+        logger.info(f"Ignoring outdated ranges state file {state_path}.")
+    except Exception as e:
+        logger.warning(f"Invalid ranges state file {state_path}: {e}. Ignoring it.")
+    return None
+
+
+# Lock used when `os.pwrite`/`os.pread` are not available (e.g. Windows) and the shared file position must be moved
+_fd_position_lock = threading.Lock()
+
+
+def _pwrite(fd: int, data: bytes, offset: int) -> None:
+    """Write `data` at `offset` in the file described by `fd`, without moving the shared file position."""
+    if hasattr(os, "pwrite"):
+        view = memoryview(data)
+        while len(view) > 0:
+            written = os.pwrite(fd, view, offset)
+            view = view[written:]
+            offset += written
+    else:
+        # `os.pwrite` is not available on Windows => lock + seek + write
+        with _fd_position_lock:
+            os.lseek(fd, offset, os.SEEK_SET)
+            view = memoryview(data)
+            while len(view) > 0:
+                written = os.write(fd, view)
+                view = view[written:]
+
+
+def _pread(fd: int, size: int, offset: int) -> bytes:
+    """Read up to `size` bytes at `offset` in the file described by `fd`, without moving the shared file position."""
+    if hasattr(os, "pread"):
+        return os.pread(fd, size, offset)
+    # `os.pread` is not available on Windows => lock + seek + read
+    with _fd_position_lock:
+        os.lseek(fd, offset, os.SEEK_SET)
+        return os.read(fd, size)
+
+
+# `fallocate` flag to reserve disk space without changing the file size (see `man 2 fallocate`)
+_FALLOC_FL_KEEP_SIZE = 0x01
+
+
+@lru_cache(maxsize=1)
+def _load_fallocate() -> Optional[Callable[[int, int, int, int], int]]:
+    """Load `fallocate(2)` from the C library. Only available on Linux.
+
+    `os.posix_fallocate` is not used: glibc emulates it by writing zeros on filesystems that do not support
+    preallocation (which is slow for large files) and it doesn't allow to keep the file size unchanged.
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        fallocate = getattr(libc, "fallocate64", None) or libc.fallocate
+    except (OSError, AttributeError):
+        return None
+    fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+    fallocate.restype = ctypes.c_int
+    return fallocate
+
+
+def _preallocate(fd: int, size: int, keep_size: bool = False) -> bool:
+    """Reserve `size` bytes of disk space for the file described by `fd`. Return whether it succeeded.
+
+    Preallocated blocks are allocated at once, hence as contiguous as possible, instead of growing the file chunk by
+    chunk. This avoids fragmenting large files downloaded concurrently (which slows down reading them later, e.g. with
+    mmap). If `keep_size=True`, the file size is not changed: content can still be appended to the file and its size
+    still reflects the download progress.
+
+    Best effort: returns `False` if preallocation is not supported by the platform or the filesystem.
+    """
+    fallocate = _load_fallocate()
+    if fallocate is None or size <= 0:
+        return False
+    if fallocate(fd, _FALLOC_FL_KEEP_SIZE if keep_size else 0, 0, size) != 0:
+        logger.debug(f"Could not preallocate {size} bytes: {os.strerror(ctypes.get_errno())}")
+        return False
+    return True
 
 
 @validate_hf_hub_args
@@ -950,6 +1339,9 @@ def _cache_commit_hash_for_specific_revision(storage_folder: str, revision: str,
     """Cache reference between a revision (tag, branch or truncated commit hash) and the corresponding commit hash.
 
     Does nothing if `revision` is already a proper `commit_hash` or reference is already cached.
+
+    If `HF_HUB_REVISION_CACHE_TTL` is set, the resolution time is also recorded (in memory and as the modification time
+    of the ref file) so that `_get_fresh_commit_hash` can skip the next resolutions for a while.
     """
     if revision != commit_hash:
         ref_path = Path(storage_folder) / "refs" / revision
@@ -959,6 +1351,40 @@ def _cache_commit_hash_for_specific_revision(storage_folder: str, revision: str,
             # repo is already cached and user doesn't have write access to cache folder.
             # See https://github.com/huggingface/huggingface_hub/issues/1216.
             ref_path.write_text(commit_hash)
+        elif HF_HUB_REVISION_CACHE_TTL > 0:
+            try:
+                os.utime(ref_path)  # ref confirmed by the server => share resolution time with other processes
+            except OSError:
+                pass  # read-only cache => in-memory cache only
+        if HF_HUB_REVISION_CACHE_TTL > 0:
+            _RESOLVED_REVISIONS[(storage_folder, revision)] = (commit_hash, time.time())
+
+
+# In-memory cache of revisions resolved by the server: (storage_folder, revision) -> (commit_hash, resolution time)
+_RESOLVED_REVISIONS: Dict[Tuple[str, str], Tuple[str, float]] = {}
+
+
+def _get_fresh_commit_hash(storage_folder: str, revision: str) -> Optional[str]:
+    """Return the commit hash of `revision` if it has been resolved less than `HF_HUB_REVISION_CACHE_TTL` seconds ago.
+
+    Resolutions made by this process are kept in memory. Resolutions made by other processes sharing the same cache are
+    read from the ref file (its modification time is the resolution time). Returns `None` if the TTL is not set (default)
+    or if the revision must be resolved again.
+    """
+    if HF_HUB_REVISION_CACHE_TTL <= 0 or REGEX_COMMIT_HASH.match(revision):
+        return None
+    now = time.time()
+    cached = _RESOLVED_REVISIONS.get((storage_folder, revision))
+    if cached is not None and now - cached[1] <= HF_HUB_REVISION_CACHE_TTL:
+        return cached[0]
+    ref_path = os.path.join(storage_folder, "refs", revision)
+    try:
+        if now - os.path.getmtime(ref_path) > HF_HUB_REVISION_CACHE_TTL:
+            return None
+        with open(ref_path) as f:
+            return f.read()
+    except OSError:
+        return None
 
 
 @validate_hf_hub_args
@@ -982,20 +1408,49 @@ def _check_disk_space(expected_size: int, target_dir: Union[str, Path]) -> None:
         target_dir (`str`):
             The directory where the file will be stored after downloading.
     """
+    target_dir_free = _get_free_disk_space(target_dir)
+    if target_dir_free is not None and target_dir_free < expected_size:
+        warnings.warn(
+            "Not enough free disk space to download the file. "
+            f"The expected file size is: {expected_size / 1e6:.2f} MB. "
+            f"The target location {target_dir} only has {target_dir_free / 1e6:.2f} MB free disk space."
+        )
+
+
+def _check_snapshot_disk_space(expected_size: int, target_dir: Union[str, Path]) -> None:
+    """Raise an error if there is not enough disk space to download a whole snapshot.
+
+    Called before downloading any file of a snapshot, to fail fast instead of running out of disk space in the middle
+    of the download. Does nothing if the disk space cannot be checked.
+
+    Args:
+        expected_size (`int`):
+            The total size in bytes of the files to download.
+        target_dir (`str`):
+            The directory where the files will be stored after downloading.
+
+    Raises:
+        `OSError` (`errno.ENOSPC`): if there is not enough free disk space.
+    """
+    target_dir_free = _get_free_disk_space(target_dir)
+    if target_dir_free is not None and target_dir_free < expected_size:
+        raise OSError(
+            errno.ENOSPC,
+            "Not enough free disk space to download the snapshot. "
+            f"The files to download take {expected_size / 1e6:.2f} MB. "
+            f"The target location {target_dir} only has {target_dir_free / 1e6:.2f} MB free disk space.",
+        )
+
 
+def _get_free_disk_space(target_dir: Union[str, Path]) -> Optional[int]:
+    """Return the free disk space in bytes for `target_dir` (or its closest existing parent), `None` if unknown."""
     target_dir = Path(target_dir)  # format as `Path`
     for path in [target_dir] + list(target_dir.parents):  # first check target_dir, then each parents one by one
         try:
-            target_dir_free = shutil.disk_usage(path).free
-            if target_dir_free < expected_size:
-                warnings.warn(
-                    "Not enough free disk space to download the file. "
-                    f"The expected file size is: {expected_size / 1e6:.2f} MB. "
-                    f"The target location {target_dir} only has {target_dir_free / 1e6:.2f} MB free disk space."
-                )
-            return
+            return shutil.disk_usage(path).free
         except OSError:  # raise on anything: file does not exist or space disk cannot be checked
             pass
+    return None
 
 
 @_deprecate_arguments(
@@ -1255,6 +1710,18 @@ def hf_hub_download(
         )
 
 
+def _get_relative_filename(filename: str) -> str:
+    """Cross platform transcription of a filename in a repo, to be used as a local file path."""
+    relative_filename = os.path.join(*filename.split("/"))
+    if os.name == "nt":
+        if relative_filename.startswith("..\\") or "\\..\\" in relative_filename:
+            raise ValueError(
+                f"Invalid filename: cannot handle filename '{relative_filename}' on Windows. Please ask the repository"
+                " owner to rename this file."
+            )
+    return relative_filename
+
+
 def _hf_hub_download_to_cache_dir(
     *,
     # Destination
@@ -1272,29 +1739,29 @@ def _hf_hub_download_to_cache_dir(
     # Additional options
     local_files_only: bool,
     force_download: bool,
+    blob_path_callback: Optional[Callable[[str, int], None]] = None,
 ) -> str:
     """Download a given file to a cache folder, if not already present.
 
     Method should not be called directly. Please use `hf_hub_download` instead.
     """
-    locks_dir = os.path.join(cache_dir, ".locks")
     storage_folder = os.path.join(cache_dir, repo_folder_name(repo_id=repo_id, repo_type=repo_type))
-
-    # cross platform transcription of filename, to be used as a local file path.
-    relative_filename = os.path.join(*filename.split("/"))
-    if os.name == "nt":
-        if relative_filename.startswith("..\\") or "\\..\\" in relative_filename:
-            raise ValueError(
-                f"Invalid filename: cannot handle filename '{relative_filename}' on Windows. Please ask the repository"
-                " owner to rename this file."
-            )
+    relative_filename = _get_relative_filename(filename)
 
     # if user provides a commit_hash and they already have the file on disk, shortcut everything.
     if REGEX_COMMIT_HASH.match(revision):
         pointer_path = _get_pointer_path(storage_folder, revision, relative_filename)
         if os.path.exists(pointer_path) and not force_download:
+            emit_transfer_event("cache_hit", name=filename, repo_id=repo_id)
             return pointer_path
 
+    # if the revision has been resolved recently (see `HF_HUB_REVISION_CACHE_TTL`), same shortcut.
+    if not force_download:
+        cached_path = _get_pointer_path_from_fresh_revision(storage_folder, revision, relative_filename)
+        if cached_path is not None:
+            emit_transfer_event("cache_hit", name=filename, repo_id=repo_id)
+            return cached_path
+
     # Try to get metadata (etag, commit_hash, url, size) from the server.
     # If we can't, a HEAD request error is returned.
     (url_to_download, etag, commit_hash, expected_size, head_call_error) = _get_metadata_or_catch_error(
@@ -1337,8 +1804,38 @@ def _hf_hub_download_to_cache_dir(
             if commit_hash is not None:
                 pointer_path = _get_pointer_path(storage_folder, commit_hash, relative_filename)
                 if os.path.exists(pointer_path) and not force_download:
+                    emit_transfer_event("cache_hit", name=filename, repo_id=repo_id, reason=str(head_call_error))
                     return pointer_path
 
+            # Multi-tier cache (see `HF_HUB_CACHE_TIERS`) => file might be cached in a lower tier
+            for tier in _get_lower_cache_tiers(cache_dir):
+                cached_path = _try_to_load_from_cache_dir(repo_id, filename, tier, revision, repo_type)
+                if not isinstance(cached_path, str):
+                    continue
+                emit_transfer_event("cache_hit", name=filename, repo_id=repo_id, reason=str(head_call_error))
+                tier_metadata = _get_cache_tier_file_metadata(tier, storage_folder, cached_path)
+                if tier_metadata is None:
+                    return cached_path
+                # Promote the file to the first tier so that next loads are fast, even offline
+                tier_commit_hash, tier_etag, tier_size = tier_metadata
+                return _hf_hub_download_blob_to_cache_dir(
+                    cache_dir=cache_dir,
+                    repo_id=repo_id,
+                    repo_type=repo_type,
+                    filename=filename,
+                    revision=revision,
+                    commit_hash=tier_commit_hash,
+                    etag=tier_etag,
+                    url_to_download=hf_hub_url(
+                        repo_id, filename, repo_type=repo_type, revision=tier_commit_hash, endpoint=endpoint
+                    ),
+                    expected_size=tier_size,
+                    headers=headers,
+                    proxies=proxies,
+                    force_download=False,
+                    blob_path_callback=blob_path_callback,
+                )
+
         # Otherwise, raise appropriate error
         _raise_on_head_call_error(head_call_error, force_download, local_files_only)
 
@@ -1347,6 +1844,59 @@ def _hf_hub_download_to_cache_dir(
     assert commit_hash is not None, "commit_hash must have been retrieved from server"
     assert url_to_download is not None, "file location must have been retrieved from server"
     assert expected_size is not None, "expected_size must have been retrieved from server"
+    return _hf_hub_download_blob_to_cache_dir(
+        cache_dir=cache_dir,
+        repo_id=repo_id,
+        repo_type=repo_type,
+        filename=filename,
+        revision=revision,
+        commit_hash=commit_hash,
+        etag=etag,
+        url_to_download=url_to_download,
+        expected_size=expected_size,
+        headers=headers,
+        proxies=proxies,
+        force_download=force_download,
+        blob_path_callback=blob_path_callback,
+    )
+
+
+def _hf_hub_download_blob_to_cache_dir(
+    *,
+    # Destination
+    cache_dir: str,
+    # File info
+    repo_id: str,
+    repo_type: str,
+    filename: str,
+    revision: str,
+    # File metadata
+    commit_hash: str,
+    etag: str,
+    url_to_download: str,
+    expected_size: int,
+    # HTTP info
+    headers: Dict[str, str],
+    proxies: Optional[Dict],
+    # Additional options
+    force_download: bool,
+    max_connections: Optional[int] = None,
+    blob_path_callback: Optional[Callable[[str, int], None]] = None,
+) -> str:
+    """Download a file to the cache folder given its metadata, if not already present.
+
+    Metadata (etag, commit hash, url and size) are expected to come either from a HEAD call (see
+    `_hf_hub_download_to_cache_dir`) or from a repo listing (see `snapshot_download`). No network call is made if the
+    blob already exists in the cache. `max_connections` is the number of concurrent range requests allowed for the file
+    (defaults to `HF_HUB_DOWNLOAD_CONNECTIONS`). If the blob must be downloaded, `blob_path_callback` is called with the
+    blob path and its expected size before waiting for the lock, i.e. while another process might be downloading it.
+
+    Method should not be called directly. Please use `hf_hub_download` or `snapshot_download` instead.
+    """
+    locks_dir = os.path.join(cache_dir, ".locks")
+    storage_folder = os.path.join(cache_dir, repo_folder_name(repo_id=repo_id, repo_type=repo_type))
+    relative_filename = _get_relative_filename(filename)
+
     blob_path = os.path.join(storage_folder, "blobs", etag)
     pointer_path = _get_pointer_path(storage_folder, commit_hash, relative_filename)
 
@@ -1361,17 +1911,26 @@ def _hf_hub_download_to_cache_dir(
     # If file already exists, return it (except if force_download=True)
     if not force_download:
         if os.path.exists(pointer_path):
+            emit_transfer_event("cache_hit", name=filename, url=url_to_download, repo_id=repo_id, total=expected_size)
             return pointer_path
 
         if os.path.exists(blob_path):
             # we have the blob already, but not the pointer
             _create_symlink(blob_path, pointer_path, new_blob=False)
+            emit_transfer_event("cache_hit", name=filename, url=url_to_download, repo_id=repo_id, total=expected_size)
             return pointer_path
+    emit_transfer_event("cache_miss", name=filename, url=url_to_download, repo_id=repo_id, total=expected_size)
 
     # Prevent parallel downloads of the same file with a lock.
     # etag could be duplicated across repos,
     lock_path = os.path.join(locks_dir, repo_folder_name(repo_id=repo_id, repo_type=repo_type), f"{etag}.lock")
 
+    # If shared blobs are enabled, blob is stored once for all repos
+    # => lock is shared as well so that a blob is not downloaded twice concurrently.
+    shared_blob_path = _get_shared_blob_path(cache_dir, etag) if HF_HUB_ENABLE_SHARED_BLOBS else None
+    if shared_blob_path is not None:
+        lock_path = os.path.join(locks_dir, "blobs", f"{etag}.lock")
+
     # Some Windows versions do not allow for paths longer than 255 characters.
     # In this case, we must specify it is an extended path by using the "\\?\" prefix.
     if os.name == "nt" and len(os.path.abspath(lock_path)) > 255:
@@ -1380,23 +1939,174 @@ def _hf_hub_download_to_cache_dir(
     if os.name == "nt" and len(os.path.abspath(blob_path)) > 255:
         blob_path = "\\\\?\\" + os.path.abspath(blob_path)
 
+    if blob_path_callback is not None:
+        blob_path_callback(blob_path, expected_size)
+
+    added_size = 0  # bytes added to the cache, tracked for eviction (hardlinks add nothing)
+    lower_tiers = _get_lower_cache_tiers(cache_dir)
     Path(lock_path).parent.mkdir(parents=True, exist_ok=True)
     with WeakFileLock(lock_path):
-        _download_to_tmp_and_move(
-            incomplete_path=Path(blob_path + ".incomplete"),
-            destination_path=Path(blob_path),
-            url_to_download=url_to_download,
-            proxies=proxies,
-            headers=headers,
-            expected_size=expected_size,
-            filename=filename,
-            force_download=force_download,
-        )
+        if os.path.exists(blob_path) and not force_download:
+            # Blob added by another process while waiting for the lock => nothing to do
+            pass
+        elif (
+            shared_blob_path is not None
+            and not force_download
+            and _link_from_shared_blob_store(shared_blob_path, blob_path)
+        ):
+            # Blob already downloaded for another repo => no need to download it again
+            logger.info(f"Reusing blob '{etag}' from shared blob store for '{filename}'.")
+        elif len(lower_tiers) > 0 and not force_download:
+            # Multi-tier cache (see `HF_HUB_CACHE_TIERS`) => copy the blob from the first lower tier that has it. If
+            # none has it, it is downloaded to the last tier first so that other machines sharing this tier reuse it.
+            tier_blob_paths = [
+                os.path.join(tier, os.path.basename(storage_folder), "blobs", etag) for tier in lower_tiers
+            ]
+            tier_blob_path = next((path for path in tier_blob_paths if os.path.exists(path)), None)
+            if tier_blob_path is None:
+                tier_pointer_path = _hf_hub_download_blob_to_cache_dir(
+                    cache_dir=lower_tiers[-1],
+                    repo_id=repo_id,
+                    repo_type=repo_type,
+                    filename=filename,
+                    revision=revision,
+                    commit_hash=commit_hash,
+                    etag=etag,
+                    url_to_download=url_to_download,
+                    expected_size=expected_size,
+                    headers=headers,
+                    proxies=proxies,
+                    force_download=False,
+                    max_connections=max_connections,
+                )
+                tier_blob_path = os.path.realpath(tier_pointer_path)
+            _copy_from_cache_tier(tier_blob_path, blob_path)
+            added_size = expected_size
+        else:
+            # Blob can only exist here if `force_download=True` => replaced, no bytes added
+            added_size = 0 if os.path.exists(blob_path) else expected_size
+            _download_to_tmp_and_move(
+                incomplete_path=Path(blob_path + ".incomplete"),
+                destination_path=Path(blob_path),
+                url_to_download=url_to_download,
+                proxies=proxies,
+                headers=headers,
+                expected_size=expected_size,
+                filename=filename,
+                force_download=force_download,
+                etag=etag,
+                max_connections=max_connections,
+            )
+            if shared_blob_path is not None:
+                _link_to_shared_blob_store(blob_path, shared_blob_path)
         _create_symlink(blob_path, pointer_path, new_blob=True)
 
+    if added_size > 0:
+        # Outside of the blob lock: eviction might wait for another process
+        _on_blob_added(cache_dir, added_size)
+
     return pointer_path
 
 
+def _get_shared_blob_path(cache_dir: str, etag: str) -> Optional[str]:
+    """Return the path of a blob in the shared blob store of a cache folder.
+
+    Only content-addressed etags (git blob id or sha256 of LFS files) can be shared across repos. Returns `None` for
+    any other etag.
+    """
+    if REGEX_COMMIT_HASH.match(etag) is None and REGEX_SHA256.match(etag) is None:
+        return None
+    shared_blob_path = os.path.join(cache_dir, "blobs", etag)
+    if os.name == "nt" and len(os.path.abspath(shared_blob_path)) > 255:
+        shared_blob_path = "\\\\?\\" + os.path.abspath(shared_blob_path)
+    return shared_blob_path
+
+
+def _link_from_shared_blob_store(shared_blob_path: str, blob_path: str) -> bool:
+    """Hardlink a blob from the shared blob store into a repo. Return `False` if the blob is not in the store."""
+    if not os.path.exists(shared_blob_path):
+        return False
+    try:
+        os.link(shared_blob_path, blob_path)
+    except FileExistsError:
+        pass  # blob already in the repo
+    except OSError as e:
+        # Hardlinks not supported (or cache spread across several volumes) => download the blob as usual
+        logger.info(f"Cannot hardlink '{shared_blob_path}' to '{blob_path}': {e}")
+        return False
+    return True
+
+
+def _link_to_shared_blob_store(blob_path: str, shared_blob_path: str) -> None:
+    """Hardlink a freshly downloaded blob into the shared blob store so that other repos can reuse it."""
+    try:
+        os.makedirs(os.path.dirname(shared_blob_path), exist_ok=True)
+        os.link(blob_path, shared_blob_path)
+    except FileExistsError:
+        pass  # blob already in the store
+    except OSError as e:
+        logger.info(f"Cannot add '{blob_path}' to the shared blob store: {e}")
+
+
+def _get_lower_cache_tiers(cache_dir: Union[str, Path]) -> List[str]:
+    """Return the cache tiers to look into after `cache_dir`, if it is the first tier of `HF_HUB_CACHE_TIERS`."""
+    if len(HF_HUB_CACHE_TIERS) > 1 and os.path.abspath(HF_HUB_CACHE_TIERS[0][0]) == os.path.abspath(cache_dir):
+        return [path for path, _ in HF_HUB_CACHE_TIERS[1:]]
+    return []
+
+
+def _get_cache_tier_file_metadata(
+    tier: str, storage_folder: str, tier_pointer_path: str
+) -> Optional[Tuple[str, str, int]]:
+    """Return the commit hash, etag and size of a file cached in a lower cache tier.
+
+    Returns `None` if the blob of the file cannot be located (e.g. cache populated without symlinks on Windows).
+    """
+    tier_blob_path = os.path.realpath(tier_pointer_path)
+    if os.path.basename(os.path.dirname(tier_blob_path)) != "blobs":
+        return None
+    snapshots_dir = os.path.join(tier, os.path.basename(storage_folder), "snapshots")
+    commit_hash = Path(os.path.relpath(tier_pointer_path, snapshots_dir)).parts[0]
+    return commit_hash, os.path.basename(tier_blob_path), os.path.getsize(tier_blob_path)
+
+
+# ioctl request to clone a file on Linux, i.e. to make a copy-on-write copy (see `man 2 ioctl_ficlone`)
+_FICLONE = 0x40049409
+
+
+def _copy_from_cache_tier(src: str, blob_path: str) -> None:
+    """Copy a blob from another cache tier. The copy is a reflink if supported by the filesystem (e.g. XFS, Btrfs).
+
+    The blob is copied to a `.incomplete` file first so that a partial copy is never mistaken for the blob.
+    """
+    logger.info(f"Copying blob '{src}' to '{blob_path}' from a lower cache tier.")
+    incomplete_path = Path(blob_path + ".incomplete")
+    with open(src, "rb") as fsrc, incomplete_path.open("wb") as fdst:
+        try:
+            import fcntl  # not available on Windows
+
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        except (ImportError, OSError):
+            # No reflink (other platform, other filesystem or tiers on different volumes) => regular copy
+            shutil.copyfileobj(fsrc, fdst, length=DOWNLOAD_CHUNK_SIZE)
+    _chmod_and_move(incomplete_path, Path(blob_path))
+
+
+def _local_file_matches_sha256(file_path: Path, etag: str, expected_size: int) -> bool:
+    """Check whether a local file has the content of an LFS file, identified by its sha256 `etag`.
+
+    The size is checked first so that a mismatch is detected without reading the file.
+    """
+    if REGEX_SHA256.match(etag) is None:
+        return False
+    try:
+        if file_path.stat().st_size != expected_size:
+            return False
+        return sha_file(file_path).hex() == etag
+    except OSError:
+        return False
+
+
 def _hf_hub_download_to_local_dir(
     *,
     # Destination
@@ -1462,6 +2172,54 @@ def _hf_hub_download_to_local_dir(
     assert commit_hash is not None, "commit_hash must have been retrieved from server"
     assert url_to_download is not None, "file location must have been retrieved from server"
     assert expected_size is not None, "expected_size must have been retrieved from server"
+    return _hf_hub_download_blob_to_local_dir(
+        local_dir=local_dir,
+        repo_id=repo_id,
+        repo_type=repo_type,
+        filename=filename,
+        commit_hash=commit_hash,
+        etag=etag,
+        url_to_download=url_to_download,
+        expected_size=expected_size,
+        headers=headers,
+        proxies=proxies,
+        cache_dir=cache_dir,
+        force_download=force_download,
+    )
+
+
+def _hf_hub_download_blob_to_local_dir(
+    *,
+    # Destination
+    local_dir: Union[str, Path],
+    # File info
+    repo_id: str,
+    repo_type: str,
+    filename: str,
+    # File metadata
+    commit_hash: str,
+    etag: str,
+    url_to_download: str,
+    expected_size: int,
+    # HTTP info
+    headers: Dict[str, str],
+    proxies: Optional[Dict],
+    # Additional options
+    cache_dir: str,
+    force_download: bool,
+    max_connections: Optional[int] = None,
+) -> str:
+    """Download a file to a local folder given its metadata, if not already up-to-date.
+
+    Same as `_hf_hub_download_blob_to_cache_dir` for a local folder: no network call is made if the local file has the
+    expected etag. Metadata are expected to come either from a HEAD call (see `_hf_hub_download_to_local_dir`) or from
+    a repo listing (see `snapshot_download`).
+
+    Method should not be called directly. Please use `hf_hub_download` or `snapshot_download` instead.
+    """
+    local_dir = Path(local_dir)
+    paths = get_local_download_paths(local_dir=local_dir, filename=filename)
+    local_metadata = read_download_metadata(local_dir=local_dir, filename=filename)
 
     # Local file exists => check if it's up-to-date
     if not force_download and paths.file_path.is_file():
@@ -1472,14 +2230,11 @@ def _hf_hub_download_to_local_dir(
 
         # metadata is outdated + etag is a sha256
         # => means it's an LFS file (large)
-        # => let's compute local hash and compare
+        # => let's compute local hash and compare (unless sizes already differ)
         # => if match, update metadata and return file
-        if local_metadata is None and REGEX_SHA256.match(etag) is not None:
-            with open(paths.file_path, "rb") as f:
-                file_hash = sha_fileobj(f).hex()
-            if file_hash == etag:
-                write_download_metadata(local_dir=local_dir, filename=filename, commit_hash=commit_hash, etag=etag)
-                return str(paths.file_path)
+        if local_metadata is None and _local_file_matches_sha256(paths.file_path, etag, expected_size):
+            write_download_metadata(local_dir=local_dir, filename=filename, commit_hash=commit_hash, etag=etag)
+            return str(paths.file_path)
 
     # Local file doesn't exist or etag isn't a match => retrieve file from remote (or cache)
 
@@ -1511,6 +2266,8 @@ def _hf_hub_download_to_local_dir(
             expected_size=expected_size,
             filename=filename,
             force_download=force_download,
+            etag=etag,
+            max_connections=max_connections,
         )
 
     write_download_metadata(local_dir=local_dir, filename=filename, commit_hash=commit_hash, etag=etag)
@@ -1576,6 +2333,17 @@ def try_to_load_from_cache(
     if cache_dir is None:
         cache_dir = HF_HUB_CACHE
 
+    # Multi-tier cache (see `HF_HUB_CACHE_TIERS`) => look into each tier in order
+    for tier in [cache_dir, *_get_lower_cache_tiers(cache_dir)]:
+        cached_file = _try_to_load_from_cache_dir(repo_id, filename, tier, revision, repo_type)
+        if cached_file is not None:
+            return cached_file
+    return None
+
+
+def _try_to_load_from_cache_dir(
+    repo_id: str, filename: str, cache_dir: Union[str, Path], revision: str, repo_type: str
+) -> Union[str, _CACHED_NO_EXIST_T, None]:
     object_id = repo_id.replace("/", "--")
     repo_cache = os.path.join(cache_dir, f"{repo_type}s--{object_id}")
     if not os.path.isdir(repo_cache):
@@ -1610,6 +2378,232 @@ def try_to_load_from_cache(
     return cached_file if os.path.isfile(cached_file) else None
 
 
+def try_to_load_many_from_cache(
+    repo_id: str,
+    filenames: Iterable[str],
+    cache_dir: Union[str, Path, None] = None,
+    revision: Optional[str] = None,
+    repo_type: Optional[str] = None,
+) -> Dict[str, Union[str, _CACHED_NO_EXIST_T, None]]:
+    """
+    Same as [`try_to_load_from_cache`] for several files of the same revision at once.
+
+    The ref is resolved once and the snapshot folder (and its `.no_exist` counterpart) is listed once for all files,
+    instead of several filesystem calls per file. Listings are kept in memory for the lifetime of the process and
+    reused as long as the modification times of the listed folders do not change. This makes probing many optional
+    files (e.g. tokenizer variants) cheap, in particular on network filesystems.
+
+    This function will not raise any exception if a file is not cached.
+
+    Args:
+        repo_id (`str`):
+            The ID of the repo on huggingface.co.
+        filenames (`Iterable[str]`):
+            The filenames to look for inside `repo_id`.
+        cache_dir (`str` or `os.PathLike`, *optional*):
+            The folder where the cached files lie.
+        revision (`str`, *optional*):
+            The specific model version to use. Will default to `"main"` if it's not provided.
+        repo_type (`str`, *optional*):
+            The type of the repository. Will default to `"model"`.
+
+    Returns:
+        `Dict[str, Union[str, _CACHED_NO_EXIST, None]]`: a mapping from each filename to the result
+        [`try_to_load_from_cache`] would return for it (cached path, `_CACHED_NO_EXIST` or `None`).
+
+    Example:
+
+    ```python
+    from huggingface_hub import try_to_load_many_from_cache, _CACHED_NO_EXIST
+
+    results = try_to_load_many_from_cache("gpt2", ["tokenizer.json", "vocab.json", "added_tokens.json"])
+    cached_files = {filename: path for filename, path in results.items() if isinstance(path, str)}
+    ```
+    """
+    if revision is None:
+        revision = "main"
+    if repo_type is None:
+        repo_type = "model"
+    if repo_type not in REPO_TYPES:
+        raise ValueError(f"Invalid repo type: {repo_type}. Accepted repo types are: {str(REPO_TYPES)}")
+    if cache_dir is None:
+        cache_dir = HF_HUB_CACHE
+
+    results: Dict[str, Union[str, _CACHED_NO_EXIST_T, None]] = {filename: None for filename in filenames}
+
+    # Multi-tier cache (see `HF_HUB_CACHE_TIERS`) => look into each tier in order
+    for tier in [cache_dir, *_get_lower_cache_tiers(cache_dir)]:
+        object_id = repo_id.replace("/", "--")
+        repo_cache = os.path.join(tier, f"{repo_type}s--{object_id}")
+
+        # Resolve refs (for instance to convert main to the associated commit sha)
+        commit_hash = revision
+        try:
+            with open(os.path.join(repo_cache, "refs", revision)) as f:
+                commit_hash = f.read()
+        except OSError:
+            pass  # not a ref (or no cache for this repo)
+
+        no_exist = _list_cached_folder(os.path.join(repo_cache, ".no_exist", commit_hash))
+        snapshot_dir = os.path.join(repo_cache, "snapshots", commit_hash)
+        snapshot = _list_cached_folder(snapshot_dir)
+
+        for filename, result in results.items():
+            if result is not None:
+                continue  # found in a previous tier
+            if filename in no_exist:
+                results[filename] = _CACHED_NO_EXIST
+            elif filename in snapshot:
+                results[filename] = os.path.join(snapshot_dir, filename)
+    return results
+
+
+@dataclass(frozen=True)
+class _CachedFolderListing:
+    files: FrozenSet[str]  # relative paths of the files in the folder (with "/" separators)
+    mtimes: Tuple[Tuple[str, int], ...]  # (path, st_mtime_ns) of the folder and all its subfolders
+
+
+# In-memory listings of snapshot and `.no_exist` folders: folder path -> listing. Least recently used listings are
+# dropped once `_CACHED_FOLDER_LISTINGS_MAX_SIZE` folders are kept (long-running processes touching many repos).
+_CACHED_FOLDER_LISTINGS: "OrderedDict[str, _CachedFolderListing]" = OrderedDict()
+_CACHED_FOLDER_LISTINGS_MAX_SIZE = 256
+_CACHED_FOLDER_LISTINGS_LOCK = threading.Lock()
+
+# Folders modified less than this number of nanoseconds ago are not kept in memory, as a modification made right after
+# the listing could happen within the same mtime tick (coarse timestamps on some filesystems).
+_CACHED_FOLDER_LISTING_MIN_AGE_NS = 2 * 10**9
+
+
+def _list_cached_folder(folder: str) -> FrozenSet[str]:
+    """Return the relative paths of all files in `folder` (following symlinks), or an empty set if it doesn't exist.
+
+    The listing is reused while the modification times of `folder` and its subfolders are unchanged: creating, removing
+    or renaming a file updates the modification time of its parent folder.
+    """
+    with _CACHED_FOLDER_LISTINGS_LOCK:
+        listing = _CACHED_FOLDER_LISTINGS.get(folder)
+        if listing is not None:
+            _CACHED_FOLDER_LISTINGS.move_to_end(folder)
+    if listing is not None:
+        try:
+            if all(os.stat(path).st_mtime_ns == mtime for path, mtime in listing.mtimes):
+                return listing.files
+        except OSError:
+            pass
+        with _CACHED_FOLDER_LISTINGS_LOCK:
+            _CACHED_FOLDER_LISTINGS.pop(folder, None)
+
+    files: List[str] = []
+    mtimes: List[Tuple[str, int]] = []
+
+    def _scan(path: str, prefix: str) -> None:
+        mtimes.append((path, os.stat(path).st_mtime_ns))  # before listing => a concurrent change invalidates it
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    _scan(entry.path, prefix + entry.name + "/")
+                elif entry.is_file():  # follows symlinks => dangling symlinks are ignored
+                    files.append(prefix + entry.name)
+
+    try:
+        _scan(folder, "")
+    except OSError:
+        return frozenset()  # folder doesn't exist (or has been deleted while listing)
+
+    listing = _CachedFolderListing(files=frozenset(files), mtimes=tuple(mtimes))
+    if time.time_ns() - max(mtime for _, mtime in listing.mtimes) > _CACHED_FOLDER_LISTING_MIN_AGE_NS:
+        with _CACHED_FOLDER_LISTINGS_LOCK:
+            _CACHED_FOLDER_LISTINGS[folder] = listing
+            _CACHED_FOLDER_LISTINGS.move_to_end(folder)
+            while len(_CACHED_FOLDER_LISTINGS) > _CACHED_FOLDER_LISTINGS_MAX_SIZE:
+                _CACHED_FOLDER_LISTINGS.popitem(last=False)
+    return listing.files
+
+
+@validate_hf_hub_args
+def open_cached(
+    repo_id: str,
+    filename: str,
+    cache_dir: Union[str, Path, None] = None,
+    revision: Optional[str] = None,
+    repo_type: Optional[str] = None,
+    advice: Optional[Literal["normal", "random", "sequential", "willneed"]] = None,
+) -> mmap.mmap:
+    """
+    Memory-map a file from the cache, without making any HTTP call.
+
+    The file is resolved the same way as in [`try_to_load_from_cache`] and mapped read-only. Reading from the returned
+    object does not copy the file in the process memory: processes mapping the same file share the same pages of the
+    OS page cache. This is useful to read the header of a large file or to load the same file from many workers.
+
+    The returned object must be closed once done, for instance by using it as a context manager. Slices of the mapping
+    can be accessed without copy using `memoryview(mapping)[start:end]`.
+
+    Args:
+        repo_id (`str`):
+            The ID of the repo on huggingface.co.
+        filename (`str`):
+            The filename to look for inside `repo_id`.
+        cache_dir (`str` or `os.PathLike`, *optional*):
+            The folder where the cached files lie.
+        revision (`str`, *optional*):
+            The specific model version to use. Defaults to `"main"`.
+        repo_type (`str`, *optional*):
+            The type of the repository. Defaults to `"model"`.
+        advice (`str`, *optional*):
+            Hint given to the kernel on how the file will be accessed. One of `"normal"`, `"random"`, `"sequential"`
+            or `"willneed"` (see `madvise(2)`). Ignored on platforms that do not support it.
+
+    Returns:
+        `mmap.mmap`: a read-only memory map of the cached file.
+
+    Raises:
+        [`~utils.LocalEntryNotFoundError`]
+            If the file is not cached.
+        [`~utils.EntryNotFoundError`]
+            If the non-existence of the file on the Hub is cached.
+        [`ValueError`](https://docs.python.org/3/library/exceptions.html#ValueError)
+            If the file is empty (empty files cannot be memory-mapped) or if `advice` is invalid.
+
+    Example:
+    ```python
+    >>> import json
+    >>> from huggingface_hub import hf_hub_download, open_cached
+
+    >>> hf_hub_download("gpt2", "model.safetensors")
+    >>> with open_cached("gpt2", "model.safetensors") as mapping:
+    ...     header_size = int.from_bytes(mapping[:8], "little")
+    ...     header = json.loads(mapping[8 : 8 + header_size])
+    ```
+    """
+    if advice is not None and advice not in ("normal", "random", "sequential", "willneed"):
+        raise ValueError(
+            f"Invalid advice: {advice}. Accepted values are 'normal', 'random', 'sequential', 'willneed'."
+        )
+
+    cached_file = try_to_load_from_cache(
+        repo_id=repo_id, filename=filename, cache_dir=cache_dir, revision=revision, repo_type=repo_type
+    )
+    if cached_file is _CACHED_NO_EXIST:
+        raise EntryNotFoundError(f"File '{filename}' does not exist in repo '{repo_id}' (cached information).")
+    if cached_file is None:
+        raise LocalEntryNotFoundError(f"File '{filename}' from repo '{repo_id}' is not cached.")
+
+    with open(cached_file, "rb") as f:
+        # The mapping stays valid after the file is closed
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # `madvise` is not available on Windows and some flags are Linux-only
+    flag = getattr(mmap, f"MADV_{advice.upper()}", None) if advice is not None else None
+    if flag is not None and hasattr(mapping, "madvise"):
+        try:
+            mapping.madvise(flag)
+        except OSError as e:
+            logger.debug(f"Could not madvise '{cached_file}': {e}")
+    return mapping
+
+
 @validate_hf_hub_args
 def get_hf_file_metadata(
     url: str,
@@ -1857,6 +2851,8 @@ def _download_to_tmp_and_move(
     expected_size: Optional[int],
     filename: str,
     force_download: bool,
+    etag: Optional[str] = None,
+    max_connections: Optional[int] = None,
 ) -> None:
     """Download content from a URL to a destination path.
 
@@ -1865,7 +2861,9 @@ def _download_to_tmp_and_move(
     - resume download if possible (from incomplete file)
     - do not resume download if `force_download=True` or `HF_HUB_ENABLE_HF_TRANSFER=True`
     - check disk space before downloading
-    - download content to a temporary file
+    - download content to a temporary file (using concurrent range requests if `max_connections > 1`, defaults to
+      `HF_HUB_DOWNLOAD_CONNECTIONS`)
+    - if `etag` is a sha256 (i.e. LFS file), check the sha256 of the content computed while downloading
     - set correct permissions on temporary file
     - move the temporary file to the destination path
 
@@ -1875,41 +2873,132 @@ def _download_to_tmp_and_move(
         # Do nothing if already exists (except if force_download=True)
         return
 
-    if incomplete_path.exists() and (force_download or (HF_HUB_ENABLE_HF_TRANSFER and not proxies)):
-        # By default, we will try to resume the download if possible.
-        # However, if the user has set `force_download=True` or if `hf_transfer` is enabled, then we should
-        # not resume the download => delete the incomplete file.
-        message = f"Removing incomplete file '{incomplete_path}'"
-        if force_download:
-            message += " (force_download=True)"
-        elif HF_HUB_ENABLE_HF_TRANSFER and not proxies:
-            message += " (hf_transfer=True)"
-        logger.info(message)
-        incomplete_path.unlink(missing_ok=True)
-
-    with incomplete_path.open("ab") as f:
-        resume_size = f.tell()
-        message = f"Downloading '{filename}' to '{incomplete_path}'"
-        if resume_size > 0 and expected_size is not None:
-            message += f" (resume from {resume_size}/{expected_size})"
-        logger.info(message)
-
-        if expected_size is not None:  # might be None if HTTP header not set correctly
+    # Emit transfer events (see `add_transfer_callback`). Connections belong to the caller's transfer job if any.
+    with default_transfer_job(name=filename), track_transfer(
+        "download", name=filename, url=url_to_download, total=expected_size
+    ) as tracker:
+        if incomplete_path.exists() and (force_download or (HF_HUB_ENABLE_HF_TRANSFER and not proxies)):
+            # By default, we will try to resume the download if possible.
+            # However, if the user has set `force_download=True` or if `hf_transfer` is enabled, then we should
+            # not resume the download => delete the incomplete file.
+            message = f"Removing incomplete file '{incomplete_path}'"
+            if force_download:
+                message += " (force_download=True)"
+            elif HF_HUB_ENABLE_HF_TRANSFER and not proxies:
+                message += " (hf_transfer=True)"
+            logger.info(message)
+            incomplete_path.unlink(missing_ok=True)
+            _ranges_state_path(incomplete_path).unlink(missing_ok=True)
+
+        # LFS files are identified by the sha256 of their content => check it on the fly
+        expected_sha256 = etag if etag is not None and REGEX_SHA256.match(etag) is not None else None
+
+        if expected_size is not None and _should_use_range_requests(incomplete_path, expected_size, max_connections):
+            logger.info(f"Downloading '{filename}' to '{incomplete_path}' using range requests")
             # Check disk space in both tmp and destination path
             _check_disk_space(expected_size, incomplete_path.parent)
             _check_disk_space(expected_size, destination_path.parent)
+            try:
+                sha = sha256() if expected_sha256 is not None else None
+                _http_get_ranges(
+                    url_to_download,
+                    incomplete_path,
+                    expected_size=expected_size,
+                    proxies=proxies,
+                    headers=headers,
+                    displayed_filename=filename,
+                    max_connections=max_connections,
+                    _sha256=sha,
+                    _tracker=tracker,
+                )
+                if sha is not None and expected_sha256 is not None:
+                    _check_sha256(incomplete_path, sha.hexdigest(), expected_sha256, filename=filename)
+                logger.info(f"Download complete. Moving file to {destination_path}")
+                _chmod_and_move(incomplete_path, destination_path)
+                return
+            except _RangeRequestsNotSupported:
+                # Server does not support range requests => restart download from scratch in a single stream
+                logger.info("Server does not support range requests. Falling back to a single connection download.")
+                tracker.retry("Server does not support range requests: restarting download in a single connection.")
+                incomplete_path.unlink(missing_ok=True)
+                _ranges_state_path(incomplete_path).unlink(missing_ok=True)
+
+        with incomplete_path.open("ab") as f:
+            resume_size = f.tell()
+            message = f"Downloading '{filename}' to '{incomplete_path}'"
+            if resume_size > 0 and expected_size is not None:
+                message += f" (resume from {resume_size}/{expected_size})"
+            logger.info(message)
+
+            if expected_size is not None:  # might be None if HTTP header not set correctly
+                # Check disk space in both tmp and destination path
+                _check_disk_space(expected_size, incomplete_path.parent)
+                _check_disk_space(expected_size, destination_path.parent)
+                if resume_size < expected_size:
+                    # Reserve disk space upfront, without changing the file size (content is appended)
+                    _preallocate(f.fileno(), expected_size, keep_size=True)
+
+            # Content is hashed while streaming, except if `hf_transfer` is used (content is written by a Rust process)
+            sha = None
+            uses_hf_transfer = (
+                HF_HUB_ENABLE_HF_TRANSFER
+                and resume_size == 0
+                and proxies is None
+                and (expected_size is None or expected_size > 5 * DOWNLOAD_CHUNK_SIZE)
+            )
+            if expected_sha256 is not None and not uses_hf_transfer:
+                sha = sha256()
+                if resume_size > 0:
+                    # Resumed download => hash the content already on disk first
+                    with incomplete_path.open("rb") as previous_content:
+                        for chunk in iter(lambda: previous_content.read(DOWNLOAD_CHUNK_SIZE), b""):
+                            sha.update(chunk)
+
+            http_get(
+                url_to_download,
+                f,
+                proxies=proxies,
+                resume_size=resume_size,
+                headers=headers,
+                expected_size=expected_size,
+                _sha256=sha,
+                _tracker=tracker,
+            )
+
+        if sha is not None and expected_sha256 is not None:
+            _check_sha256(incomplete_path, sha.hexdigest(), expected_sha256, filename=filename)
+
+        logger.info(f"Download complete. Moving file to {destination_path}")
+        _chmod_and_move(incomplete_path, destination_path)
 
-        http_get(
-            url_to_download,
-            f,
-            proxies=proxies,
-            resume_size=resume_size,
-            headers=headers,
-            expected_size=expected_size,
-        )
 
-    logger.info(f"Download complete. Moving file to {destination_path}")
-    _chmod_and_move(incomplete_path, destination_path)
+def _check_sha256(incomplete_path: Path, actual_sha256: str, expected_sha256: str, filename: str) -> None:
+    """Raise an error (and delete the corrupted file) if the sha256 of a downloaded file is not the expected one."""
+    if actual_sha256 == expected_sha256:
+        return
+    incomplete_path.unlink(missing_ok=True)  # corrupted content must not be resumed
+    raise EnvironmentError(
+        f"Consistency check failed: file should have sha256 {expected_sha256} but has sha256 {actual_sha256}"
+        f" ({filename}).\nWe are sorry for the inconvenience. Please retry the download.\nIf the issue persists,"
+        " please let us know by opening an issue on https://github.com/huggingface/huggingface_hub."
+    )
+
+
+def _should_use_range_requests(
+    incomplete_path: Path, expected_size: int, max_connections: Optional[int] = None
+) -> bool:
+    """Return whether a file should be downloaded with concurrent range requests.
+
+    Range requests are used for files spanning multiple ranges if more than 1 connection is allowed (`max_connections`,
+    defaults to `HF_HUB_DOWNLOAD_CONNECTIONS`) and `hf_transfer` is not enabled. Since regular files are limited to 10MB
+    on the Hub, only LFS files can be downloaded this way. A download started with range requests is always resumed
+    with range requests since the incomplete file has been preallocated.
+    """
+    if _ranges_state_path(incomplete_path).exists():
+        return True
+    if max_connections is None:
+        max_connections = HF_HUB_DOWNLOAD_CONNECTIONS
+    return max_connections > 1 and not HF_HUB_ENABLE_HF_TRANSFER and expected_size > DOWNLOAD_RANGE_SIZE
 
 
 def _int_or_none(value: Optional[str]) -> Optional[int]:
@@ -1944,6 +3033,25 @@ def _chmod_and_move(src: Path, dst: Path) -> None:
     shutil.move(str(src), str(dst))
 
 
+def _get_pointer_path_from_fresh_revision(storage_folder: str, revision: str, relative_filename: str) -> Optional[str]:
+    """Return the cached file of a recently resolved revision (see `HF_HUB_REVISION_CACHE_TTL`), without any HTTP call.
+
+    Returns `None` if the revision must be resolved again or if the file is not cached yet. Raises `EntryNotFoundError`
+    if the file is known not to exist in the resolved revision.
+    """
+    commit_hash = _get_fresh_commit_hash(storage_folder, revision)
+    if commit_hash is None:
+        return None
+    pointer_path = _get_pointer_path(storage_folder, commit_hash, relative_filename)
+    if os.path.exists(pointer_path):
+        return pointer_path
+    if os.path.isfile(os.path.join(storage_folder, ".no_exist", commit_hash, relative_filename)):
+        raise EntryNotFoundError(
+            f"File '{relative_filename}' does not exist at revision '{revision}' ({commit_hash}) (cached result)."
+        )
+    return None
+
+
 def _get_pointer_path(storage_folder: str, revision: str, relative_filename: str) -> str:
     # Using `os.path.abspath` instead of `Path.resolve()` to avoid resolving symlinks
     snapshot_path = os.path.join(storage_folder, "snapshots")
@@ -53,9 +53,9 @@ from ._commit_api import (
     CommitOperationCopy,
     CommitOperationDelete,
     _fetch_files_to_copy,
-    _fetch_upload_modes,
+    _payload_as_ndjson,
     _prepare_commit_payload,
-    _upload_lfs_files,
+    _preupload_additions,
     _warn_on_overwriting_operations,
 )
 from ._inference_endpoints import InferenceEndpoint, InferenceEndpointType
@@ -82,6 +82,7 @@ from .community import (
     deserialize_event,
 )
 from .constants import (
+    COMMIT_PAYLOAD_STREAMING_THRESHOLD,
     DEFAULT_ETAG_TIMEOUT,
     DEFAULT_REQUEST_TIMEOUT,
     DEFAULT_REVISION,
@@ -3632,26 +3633,30 @@ class HfApi:
             revision=revision,
             endpoint=self.endpoint,
         )
+        # Large payloads are streamed => regular files are read and encoded while being sent instead of all in memory
+        regular_files_size = sum(
+            addition.upload_info.size
+            for addition in additions
+            if addition._upload_mode == "regular" and not addition._should_ignore
+        )
+        stream_payload = regular_files_size > COMMIT_PAYLOAD_STREAMING_THRESHOLD
         commit_payload = _prepare_commit_payload(
             operations=operations,
             files_to_copy=files_to_copy,
             commit_message=commit_message,
             commit_description=commit_description,
             parent_commit=parent_commit,
+            lazy_content=stream_payload,
         )
         commit_url = f"{self.endpoint}/api/{repo_type}s/{repo_id}/commit/{revision}"
 
-        def _payload_as_ndjson() -> Iterable[bytes]:
-            for item in commit_payload:
-                yield json.dumps(item).encode()
-                yield b"\n"
-
         headers = {
             # See https://github.com/huggingface/huggingface_hub/issues/1085#issuecomment-1265208073
             "Content-Type": "application/x-ndjson",
             **headers,
         }
-        data = b"".join(_payload_as_ndjson())
+        ndjson = _payload_as_ndjson(commit_payload)
+        data: Union[bytes, Iterator[bytes]] = ndjson if stream_payload else b"".join(ndjson)
         params = {"create_pr": "1"} if create_pr else None
 
         try:
@@ -4088,9 +4093,10 @@ class HfApi:
         # Filter out already uploaded files
         new_additions = [addition for addition in additions if not addition._is_uploaded]
 
-        # Check which new files are LFS
+        # Hash files, check which ones are LFS and upload them in a pipeline => uploads start as soon as the first files
+        # are hashed, not once all files have been hashed and checked
         try:
-            _fetch_upload_modes(
+            new_lfs_additions_to_upload = _preupload_additions(
                 additions=new_additions,
                 repo_type=repo_type,
                 repo_id=repo_id,
@@ -4099,40 +4105,12 @@ class HfApi:
                 endpoint=self.endpoint,
                 create_pr=create_pr or False,
                 gitignore_content=gitignore_content,
+                num_threads=num_threads,
             )
         except RepositoryNotFoundError as e:
             e.append_to_message(_CREATE_COMMIT_NO_REPO_ERROR_MESSAGE)
             raise
 
-        # Filter out regular files
-        new_lfs_additions = [addition for addition in new_additions if addition._upload_mode == "lfs"]
-
-        # Filter out files listed in .gitignore
-        new_lfs_additions_to_upload = []
-        for addition in new_lfs_additions:
-            if addition._should_ignore:
-                logger.debug(f"Skipping upload for LFS file '{addition.path_in_repo}' (ignored by gitignore file).")
-            else:
-                new_lfs_additions_to_upload.append(addition)
-        if len(new_lfs_additions) != len(new_lfs_additions_to_upload):
-            logger.info(
-                f"Skipped upload for {len(new_lfs_additions) - len(new_lfs_additions_to_upload)} LFS file(s) "
-                "(ignored by gitignore file)."
-            )
-
-        # Upload new LFS files
-        _upload_lfs_files(
-            additions=new_lfs_additions_to_upload,
-            repo_type=repo_type,
-            repo_id=repo_id,
-            headers=headers,
-            endpoint=self.endpoint,
-            num_threads=num_threads,
-            # If `create_pr`, we don't want to check user permission on the revision as users with read permission
-            # should still be able to create PRs even if they don't have write permission on the target branch of the
-            # PR (i.e. `revision`).
-            revision=revision if not create_pr else None,
-        )
         for addition in new_lfs_additions_to_upload:
             addition._is_uploaded = True
             if free_memory:
@@ -18,28 +18,40 @@ import inspect
 import io
 import os
 import re
+import threading
 import warnings
-from contextlib import AbstractContextManager
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager, contextmanager
 from dataclasses import dataclass
 from math import ceil
 from os.path import getsize
 from pathlib import Path
-from typing import TYPE_CHECKING, BinaryIO, Dict, Iterable, List, Optional, Tuple, TypedDict
+from typing import TYPE_CHECKING, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypedDict, Union
 from urllib.parse import unquote
 
-from huggingface_hub.constants import ENDPOINT, HF_HUB_ENABLE_HF_TRANSFER, REPO_TYPES_URL_PREFIXES
+from huggingface_hub.constants import (
+    ENDPOINT,
+    HF_HUB_ENABLE_HF_TRANSFER,
+    HF_HUB_UPLOAD_CONNECTIONS,
+    REPO_TYPES_URL_PREFIXES,
+)
 
+from .file_download import _pread
 from .utils import (
     build_hf_headers,
     fix_hf_endpoint_in_url,
     get_session,
+    get_transfer_scheduler,
     hf_raise_for_status,
     http_backoff,
     logging,
+    report_transfer_progress,
     tqdm,
+    track_transfer,
     validate_hf_hub_args,
+    with_current_context,
 )
-from .utils.sha import sha256, sha_fileobj
+from .utils.sha import sha256, sha_file, sha_fileobj
 
 
 if TYPE_CHECKING:
@@ -80,8 +92,8 @@ class UploadInfo:
     def from_path(cls, path: str):
         size = getsize(path)
         with io.open(path, "rb") as file:
-            sample = file.peek(512)[:512]
-            sha = sha_fileobj(file)
+            sample = file.read(512)
+        sha = sha_file(path)
         return cls(size=size, sha256=sha, sample=sample)
 
     @classmethod
@@ -243,20 +255,24 @@ def lfs_upload(
             raise ValueError(
                 f"Malformed response from LFS batch endpoint: `chunk_size` should be an integer. Got '{chunk_size}'."
             )
-        _upload_multi_part(operation=operation, header=header, chunk_size=chunk_size, upload_url=upload_url)
-    else:
-        _upload_single_part(operation=operation, upload_url=upload_url)
 
-    # 3. Verify upload went well
-    if verify_action is not None:
-        _validate_lfs_action(verify_action)
-        verify_url = fix_hf_endpoint_in_url(verify_action["href"], endpoint)
-        verify_resp = get_session().post(
-            verify_url,
-            headers=build_hf_headers(token=token, headers=headers),
-            json={"oid": operation.upload_info.sha256.hex(), "size": operation.upload_info.size},
-        )
-        hf_raise_for_status(verify_resp)
+    # Emit transfer events (see `add_transfer_callback`) until the upload is verified
+    with track_transfer("upload", name=operation.path_in_repo, url=upload_url, total=operation.upload_info.size):
+        if chunk_size is not None:
+            _upload_multi_part(operation=operation, header=header, chunk_size=chunk_size, upload_url=upload_url)
+        else:
+            _upload_single_part(operation=operation, upload_url=upload_url)
+
+        # 3. Verify upload went well
+        if verify_action is not None:
+            _validate_lfs_action(verify_action)
+            verify_url = fix_hf_endpoint_in_url(verify_action["href"], endpoint)
+            verify_resp = get_session().post(
+                verify_url,
+                headers=build_hf_headers(token=token, headers=headers),
+                json={"oid": operation.upload_info.sha256.hex(), "size": operation.upload_info.size},
+            )
+            hf_raise_for_status(verify_resp)
     logger.debug(f"{operation.path_in_repo}: Upload successful")
 
 
@@ -314,10 +330,12 @@ def _upload_single_part(operation: "CommitOperationAdd", upload_url: str) -> Non
      [`HTTPError`](https://requests.readthedocs.io/en/latest/api/#requests.HTTPError)
         If the upload resulted in an error.
     """
-    with operation.as_file(with_tqdm=True) as fileobj:
+    scheduler = get_transfer_scheduler()
+    with operation.as_file(with_tqdm=True) as fileobj, scheduler.connection(), scheduler.throttled_reads(fileobj):
         # S3 might raise a transient 500 error -> let's retry if that happens
         response = http_backoff("PUT", upload_url, data=fileobj, retry_on_status_codes=(500, 502, 503, 504))
         hf_raise_for_status(response)
+    report_transfer_progress(operation.upload_info.size)
 
 
 def _upload_multi_part(operation: "CommitOperationAdd", header: Dict, chunk_size: int, upload_url: str) -> None:
@@ -343,7 +361,9 @@ def _upload_multi_part(operation: "CommitOperationAdd", header: Dict, chunk_size
     response_headers = (
         _upload_parts_hf_transfer(operation=operation, sorted_parts_urls=sorted_parts_urls, chunk_size=chunk_size)
         if use_hf_transfer
-        else _upload_parts_iteratively(operation=operation, sorted_parts_urls=sorted_parts_urls, chunk_size=chunk_size)
+        else _upload_parts_concurrently(
+            operation=operation, sorted_parts_urls=sorted_parts_urls, chunk_size=chunk_size
+        )
     )
 
     # 3. Send completion request
@@ -388,24 +408,98 @@ def _get_completion_payload(response_headers: List[Dict], oid: str) -> Completio
     return {"oid": oid, "parts": parts}
 
 
-def _upload_parts_iteratively(
+def _upload_parts_concurrently(
     operation: "CommitOperationAdd", sorted_parts_urls: List[str], chunk_size: int
 ) -> List[Dict]:
-    headers = []
-    with operation.as_file(with_tqdm=True) as fileobj:
-        for part_idx, part_upload_url in enumerate(sorted_parts_urls):
-            with SliceFileObj(
-                fileobj,
-                seek_from=chunk_size * part_idx,
-                read_limit=chunk_size,
-            ) as fileobj_slice:
-                # S3 might raise a transient 500 error -> let's retry if that happens
+    # Parts are uploaded by up to `HF_HUB_UPLOAD_CONNECTIONS` threads. Each part reads its own byte range of the source
+    # (see `_PartFileObj`) => threads don't share a file position. Response headers are returned in part order.
+    total = operation.upload_info.size
+    scheduler = get_transfer_scheduler()
+
+    with _open_read_at(operation.path_or_fileobj) as read_at, _upload_progress_bar(operation) as progress:
+
+        def _on_read(nbytes: int) -> None:
+            progress.update(nbytes)
+            scheduler.throttle(nbytes)
+
+        def _upload_part(part_idx: int, part_upload_url: str) -> Dict:
+            offset = chunk_size * part_idx
+            length = min(chunk_size, total - offset)
+            part = _PartFileObj(read_at, offset=offset, length=length, on_read=_on_read)
+            # S3 might raise a transient 500 error -> let's retry if that happens
+            with scheduler.connection():
                 part_upload_res = http_backoff(
-                    "PUT", part_upload_url, data=fileobj_slice, retry_on_status_codes=(500, 502, 503, 504)
+                    "PUT", part_upload_url, data=part, retry_on_status_codes=(500, 502, 503, 504)
                 )
-                hf_raise_for_status(part_upload_res)
-                headers.append(part_upload_res.headers)
-    return headers  # type: ignore
+            hf_raise_for_status(part_upload_res)
+            report_transfer_progress(length)
+            return part_upload_res.headers  # type: ignore
+
+        max_workers = min(HF_HUB_UPLOAD_CONNECTIONS, len(sorted_parts_urls))
+        if max_workers <= 1:
+            return [_upload_part(part_idx, url) for part_idx, url in enumerate(sorted_parts_urls)]
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hf-lfs-upload") as executor:
+            futures = [
+                executor.submit(with_current_context(_upload_part), part_idx, url)
+                for part_idx, url in enumerate(sorted_parts_urls)
+            ]
+            try:
+                return [future.result() for future in futures]
+            except BaseException:
+                # Don't start the remaining parts if one of them failed
+                for future in futures:
+                    future.cancel()
+                raise
+
+
+@contextmanager
+def _open_read_at(path_or_fileobj: Union[str, Path, bytes, BinaryIO]) -> Iterator[Callable[[int, int], bytes]]:
+    """Yield a `read_at(offset, size)` function to read the upload source at any offset from several threads."""
+    if isinstance(path_or_fileobj, (str, Path)):
+        fd = os.open(path_or_fileobj, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            yield lambda offset, size: _pread(fd, size, offset)
+        finally:
+            os.close(fd)
+    elif isinstance(path_or_fileobj, bytes):
+        view = memoryview(path_or_fileobj)
+        yield lambda offset, size: bytes(view[offset : offset + size])
+    else:
+        # Generic file object => moving its position and reading must be atomic
+        fileobj = path_or_fileobj
+        lock = threading.Lock()
+        previous_position = fileobj.tell()
+
+        def _read_at(offset: int, size: int) -> bytes:
+            with lock:
+                fileobj.seek(offset, io.SEEK_SET)
+                return fileobj.read(size)
+
+        try:
+            yield _read_at
+        finally:
+            fileobj.seek(previous_position, io.SEEK_SET)
+
+
+def _upload_progress_bar(operation: "CommitOperationAdd") -> tqdm:
+    desc = operation.path_in_repo
+    if len(desc) > 40:
+        desc = f"(…){desc[-40:]}"
+
+    # set `disable=None` rather than `disable=False` by default to disable progress bar when no TTY attached
+    # see https://github.com/huggingface/huggingface_hub/pull/2000
+    disable = True if (logger.getEffectiveLevel() == logging.NOTSET) else None
+
+    return tqdm(
+        unit="B",
+        unit_scale=True,
+        total=operation.upload_info.size,
+        initial=0,
+        desc=desc,
+        disable=disable,
+        name="huggingface_hub.lfs_upload",
+    )
 
 
 def _upload_parts_hf_transfer(
@@ -427,23 +521,7 @@ def _upload_parts_hf_transfer(
         )
 
     total = operation.upload_info.size
-    desc = operation.path_in_repo
-    if len(desc) > 40:
-        desc = f"(…){desc[-40:]}"
-
-    # set `disable=None` rather than `disable=False` by default to disable progress bar when no TTY attached
-    # see https://github.com/huggingface/huggingface_hub/pull/2000
-    disable = True if (logger.getEffectiveLevel() == logging.NOTSET) else None
-
-    with tqdm(
-        unit="B",
-        unit_scale=True,
-        total=total,
-        initial=0,
-        desc=desc,
-        disable=disable,
-        name="huggingface_hub.lfs_upload",
-    ) as progress:
+    with _upload_progress_bar(operation) as progress:
         try:
             output = multipart_upload(
                 file_path=operation.path_or_fileobj,
@@ -461,6 +539,7 @@ def _upload_parts_hf_transfer(
             ) from e
         if not supports_callback:
             progress.update(total)
+        report_transfer_progress(total)
         return output
 
 
@@ -552,3 +631,72 @@ class SliceFileObj(AbstractContextManager):
 
     def __iter__(self):
         yield self.read(n=4 * 1024 * 1024)
+
+
+class _PartFileObj(io.RawIOBase):
+    """
+    Read-only file object over `length` bytes of an upload source, starting at `offset`.
+
+    Unlike [`SliceFileObj`], the position is tracked by the object itself and data is read with `read_at` => several
+    parts of the same source can be read concurrently. Being an `io.IOBase`, it is rewound by [`http_backoff`] before
+    a request is retried. `on_read` is called with the number of bytes read for the first time (i.e. bytes re-sent on
+    retry are not reported twice).
+    """
+
+    def __init__(
+        self,
+        read_at: Callable[[int, int], bytes],
+        offset: int,
+        length: int,
+        on_read: Optional[Callable[[int], None]] = None,
+    ):
+        super().__init__()
+        self._read_at = read_at
+        self._offset = offset
+        self._length = length
+        self._on_read = on_read
+        self._position = 0
+        self._reported = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._length + offset
+        else:
+            raise ValueError(f"whence value {whence} is not supported")
+        self._position = max(0, min(position, self._length))
+        return self._position
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        remaining = self._length - self._position
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        if size == 0:
+            return b""
+        data = self._read_at(self._offset + self._position, size)
+        self._position += len(data)
+        if self._position > self._reported:
+            if self._on_read is not None:
+                self._on_read(self._position - self._reported)
+            self._reported = self._position
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
@@ -26,6 +26,7 @@ from huggingface_hub.errors import (
 
 from . import tqdm as _tqdm  # _tqdm is the module
 from ._cache_assets import cached_assets_path
+from ._cache_eviction import evict_cache, pin_cached_revision, unpin_cached_revision
 from ._cache_manager import (
     CachedFileInfo,
     CachedRepoInfo,
@@ -113,6 +114,27 @@ from ._safetensors import (
 from ._subprocess import capture_output, run_interactive_subprocess, run_subprocess
 from ._telemetry import send_telemetry
 from ._token import get_token
+from ._transfer_events import (
+    TransferEvent,
+    TransferTracker,
+    add_transfer_callback,
+    emit_transfer_event,
+    remove_transfer_callback,
+    report_transfer_progress,
+    report_transfer_retry,
+    track_transfer,
+    transfer_callback,
+)
+from ._transfer_scheduler import (
+    TransferJob,
+    TransferScheduler,
+    configure_transfer_scheduler,
+    default_transfer_job,
+    get_current_transfer_job,
+    get_transfer_scheduler,
+    transfer_job,
+    with_current_context,
+)
 from ._typing import is_jsonable, is_simple_optional_type, unwrap_simple_optional_type
 from ._validators import (
     smoothly_deprecate_use_auth_token,
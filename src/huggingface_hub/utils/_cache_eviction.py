@@ -0,0 +1,333 @@
+# coding=utf-8
+# Copyright 2024-present, the HuggingFace Inc. team.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Contains utilities to keep the HF cache directory under a maximum size (see `HF_HUB_CACHE_MAX_SIZE`).
+
+The size of the cache is tracked incrementally in a small state file (`{cache_dir}/.locks/cache_size.json`): each
+download adds the size of the new blob to it. The cache is fully scanned only when the tracked size exceeds the maximum
+size (to evict least recently used revisions) or when the state is older than `_FULL_SCAN_INTERVAL` (to account for
+files added or deleted by other means). All updates are made under a lock shared by all processes using the cache.
+"""
+
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from .. import constants
+from . import logging
+from ._cache_manager import DeleteCacheStrategy, HFCacheInfo, _format_size, scan_cache_dir
+from ._fixes import WeakFileLock
+
+
+logger = logging.get_logger(__name__)
+
+# Evict down to 90% of the maximum size => eviction does not run again after each download
+_EVICTION_TARGET_RATIO = 0.9
+# Revisions used or downloaded recently are never evicted (e.g. files being loaded after a download)
+_EVICTION_GRACE_PERIOD = 10 * 60
+# Tracked size is recomputed from a full scan at least every hour
+_FULL_SCAN_INTERVAL = 60 * 60
+
+_PINNED_FOLDER_NAME = ".pinned"
+_REGEX_COMMIT_HASH = re.compile(r"^[0-9a-f]{40}$")
+
+
+def evict_cache(max_size: Optional[int] = None, cache_dir: Union[str, Path, None] = None) -> DeleteCacheStrategy:
+    """Evict the least recently used revisions from the cache until it fits in `max_size`.
+
+    The cache is evicted down to 90% of `max_size`. Revisions are ordered by the last access time of their files (see
+    [`~CachedFileInfo.blob_last_accessed`]). The following revisions are never evicted:
+    - revisions pinned with [`pin_cached_revision`].
+    - revisions with a file currently open by a process (only detected on Linux, where `/proc` is available).
+    - revisions accessed or downloaded in the last 10 minutes, and repos with a download in progress.
+
+    This is done automatically after each download if `HF_HUB_CACHE_MAX_SIZE` is set (e.g. `HF_HUB_CACHE_MAX_SIZE=200G`).
+
+    Args:
+        max_size (`int`, *optional*):
+            Maximum size of the cache, in bytes. Defaults to the size set for this cache in `HF_HUB_CACHE_TIERS`, if
+            any, or to `HF_HUB_CACHE_MAX_SIZE`.
+        cache_dir (`str` or `Path`, *optional*):
+            Cache directory. Defaults to the default HF cache directory.
+
+    Returns:
+        [`~utils.DeleteCacheStrategy`]: the executed strategy, with the deleted paths and the freed size.
+
+    Raises:
+        [`ValueError`](https://docs.python.org/3/library/exceptions.html#ValueError)
+            If `max_size` is not provided and `HF_HUB_CACHE_MAX_SIZE` is not set.
+        [`~utils.CacheNotFound`]
+            If the cache directory does not exist.
+
+    Example:
+    ```py
+    >>> from huggingface_hub import evict_cache
+    >>> strategy = evict_cache(max_size=50 * 1000**3)
+    >>> print(f"Freed {strategy.expected_freed_size_str}.")
+    Freed 12.4G.
+    ```
+    """
+    cache_dir = Path(cache_dir if cache_dir is not None else constants.HF_HUB_CACHE).expanduser()
+    if max_size is None:
+        max_size = _get_max_cache_size(cache_dir)
+    if max_size is None:
+        raise ValueError("No maximum size provided. Please pass `max_size` or set `HF_HUB_CACHE_MAX_SIZE`.")
+
+    with _cache_size_lock(cache_dir):
+        strategy, size = _evict(cache_dir, max_size)
+        _write_cache_size(cache_dir, size, scanned_at=time.time())
+    return strategy
+
+
+def pin_cached_revision(
+    repo_id: str,
+    revision: Optional[str] = None,
+    *,
+    repo_type: Optional[str] = None,
+    cache_dir: Union[str, Path, None] = None,
+) -> str:
+    """Protect a cached revision from being evicted by [`evict_cache`] (and `HF_HUB_CACHE_MAX_SIZE`).
+
+    A branch or tag is resolved to the commit currently cached for it: the pin does not follow later updates of the
+    branch. The revision can still be deleted manually (e.g. with `huggingface-cli delete-cache`).
+
+    Args:
+        repo_id (`str`):
+            A user or an organization name and a repo name separated by a `/`.
+        revision (`str`, *optional*):
+            Commit hash, branch or tag of the revision to pin. Defaults to `"main"`.
+        repo_type (`str`, *optional*):
+            The type of the repo (`"model"`, `"dataset"` or `"space"`). Defaults to `"model"`.
+        cache_dir (`str` or `Path`, *optional*):
+            Cache directory. Defaults to the default HF cache directory.
+
+    Returns:
+        `str`: the commit hash of the pinned revision.
+
+    Raises:
+        [`ValueError`](https://docs.python.org/3/library/exceptions.html#ValueError)
+            If the revision is not cached.
+    """
+    pin_path = _get_pin_path(repo_id, revision=revision, repo_type=repo_type, cache_dir=cache_dir)
+    pin_path.parent.mkdir(parents=True, exist_ok=True)
+    pin_path.touch()
+    return pin_path.name
+
+
+def unpin_cached_revision(
+    repo_id: str,
+    revision: Optional[str] = None,
+    *,
+    repo_type: Optional[str] = None,
+    cache_dir: Union[str, Path, None] = None,
+) -> str:
+    """Remove a pin set with [`pin_cached_revision`]. Does nothing if the revision is not pinned.
+
+    Args and return value are the same as [`pin_cached_revision`].
+    """
+    pin_path = _get_pin_path(repo_id, revision=revision, repo_type=repo_type, cache_dir=cache_dir)
+    pin_path.unlink(missing_ok=True)
+    return pin_path.name
+
+
+def _on_blob_added(cache_dir: Union[str, Path], size: int) -> None:
+    """Track a blob added to the cache and evict least recently used revisions if `HF_HUB_CACHE_MAX_SIZE` is exceeded.
+
+    Errors are logged but never raised: a download must not fail because of the eviction.
+    """
+    cache_dir = Path(cache_dir)
+    max_size = _get_max_cache_size(cache_dir)
+    if max_size is None:
+        return
+    try:
+        with _cache_size_lock(cache_dir):
+            tracked_size, scanned_at = _read_cache_size(cache_dir)
+            if tracked_size is not None and time.time() - scanned_at < _FULL_SCAN_INTERVAL:
+                tracked_size += size
+                if tracked_size <= max_size:
+                    _write_cache_size(cache_dir, tracked_size, scanned_at=scanned_at)  # fast path: no scan
+                    return
+            _, tracked_size = _evict(cache_dir, max_size)
+            _write_cache_size(cache_dir, tracked_size, scanned_at=time.time())
+    except Exception as e:
+        logger.warning(f"Failed to evict cache '{cache_dir}' (HF_HUB_CACHE_MAX_SIZE={max_size}): {e}")
+
+
+def _get_max_cache_size(cache_dir: Path) -> Optional[int]:
+    """Return the maximum size of a cache folder.
+
+    Cache tiers have their own maximum size if set (e.g. `HF_HUB_CACHE_TIERS=/nvme/hf=200G:/nfs/hf`). Otherwise, the
+    maximum size is `HF_HUB_CACHE_MAX_SIZE`.
+    """
+    for path, max_size in constants.HF_HUB_CACHE_TIERS:
+        if max_size is not None and os.path.abspath(path) == os.path.abspath(cache_dir):
+            return max_size
+    return constants.HF_HUB_CACHE_MAX_SIZE
+
+
+def _evict(cache_dir: Path, max_size: int) -> Tuple[DeleteCacheStrategy, int]:
+    """Scan the cache and evict least recently used revisions. Return the executed strategy and the new cache size."""
+    cache_info = scan_cache_dir(cache_dir)
+    if cache_info.size_on_disk <= max_size:
+        return cache_info.delete_revisions(), cache_info.size_on_disk
+
+    to_free = cache_info.size_on_disk - int(max_size * _EVICTION_TARGET_RATIO)
+    candidates = _get_eviction_candidates(cache_info)
+
+    # Select revisions by last access until enough space would be freed. Blobs shared between revisions are freed only
+    # if all revisions referencing them are deleted => the actual freed size is checked before stopping.
+    selected: List[str] = []
+    estimated_freed_size = 0
+    strategy = cache_info.delete_revisions()
+    for _, commit_hash, size_on_disk in candidates:
+        selected.append(commit_hash)
+        estimated_freed_size += size_on_disk
+        if estimated_freed_size >= to_free:
+            strategy = cache_info.delete_revisions(*selected)
+            if strategy.expected_freed_size >= to_free:
+                break
+    else:
+        strategy = cache_info.delete_revisions(*selected)
+
+    if len(selected) > 0:
+        logger.info(
+            f"Cache size ({cache_info.size_on_disk_str}) exceeds maximum size ({_format_size(max_size)}): evicting"
+            f" {len(selected)} least recently used revision(s)."
+        )
+        strategy.execute()
+    new_size = cache_info.size_on_disk - strategy.expected_freed_size
+    if new_size > max_size:
+        logger.warning(
+            f"Cache size ({_format_size(new_size)}) exceeds maximum size ({_format_size(max_size)}) but no other"
+            " revision can be evicted (pinned, open or recently used)."
+        )
+    return strategy, new_size
+
+
+def _get_eviction_candidates(cache_info: HFCacheInfo) -> List[Tuple[float, str, int]]:
+    """List evictable revisions as (last used time, commit hash, size), least recently used first."""
+    now = time.time()
+    open_paths = _get_open_paths()
+    candidates = []
+    for repo in cache_info.repos:
+        if _has_download_in_progress(repo.repo_path, since=now - _EVICTION_GRACE_PERIOD):
+            continue
+        pinned = _get_pinned_commits(repo.repo_path)
+        for revision in repo.revisions:
+            if revision.commit_hash in pinned:
+                continue
+            if any(str(file.blob_path) in open_paths for file in revision.files):
+                continue
+            last_used = max(
+                (max(file.blob_last_accessed, file.blob_last_modified) for file in revision.files),
+                default=revision.last_modified,
+            )
+            if now - last_used < _EVICTION_GRACE_PERIOD:
+                continue
+            candidates.append((last_used, revision.commit_hash, revision.size_on_disk))
+    return sorted(candidates)
+
+
+def _get_open_paths() -> Set[str]:
+    """Paths of the files open or memory-mapped by any process that we are allowed to inspect.
+
+    Only implemented on Linux (using `/proc`). Returns an empty set on other platforms.
+    """
+    open_paths: Set[str] = set()
+    if not os.path.isdir("/proc/self/fd"):
+        return open_paths
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            for fd in os.listdir(f"/proc/{pid}/fd"):
+                try:
+                    open_paths.add(os.readlink(f"/proc/{pid}/fd/{fd}"))
+                except OSError:
+                    pass
+            # Memory-mapped files might not have an open file descriptor (e.g. safetensors)
+            with open(f"/proc/{pid}/maps") as f:
+                for line in f:
+                    fields = line.split(maxsplit=5)
+                    if len(fields) == 6 and fields[5].startswith("/"):
+                        open_paths.add(fields[5].rstrip("\n"))
+        except OSError:  # process ended or not allowed
+            continue
+    return open_paths
+
+
+def _has_download_in_progress(repo_path: Path, since: float) -> bool:
+    """Whether an `.incomplete` blob of the repo has been written recently."""
+    blobs_path = repo_path / "blobs"
+    if not blobs_path.is_dir():
+        return False
+    for incomplete_path in blobs_path.glob("*.incomplete"):
+        try:
+            if incomplete_path.stat().st_mtime >= since:
+                return True
+        except OSError:
+            pass
+    return False
+
+
+def _get_pinned_commits(repo_path: Path) -> Set[str]:
+    pinned_path = repo_path / _PINNED_FOLDER_NAME
+    return set(os.listdir(pinned_path)) if pinned_path.is_dir() else set()
+
+
+def _get_pin_path(
+    repo_id: str, revision: Optional[str], repo_type: Optional[str], cache_dir: Union[str, Path, None]
+) -> Path:
+    if revision is None:
+        revision = constants.DEFAULT_REVISION
+    if repo_type is None:
+        repo_type = constants.REPO_TYPE_MODEL
+    if cache_dir is None:
+        cache_dir = constants.HF_HUB_CACHE
+    repo_path = Path(cache_dir) / constants.REPO_ID_SEPARATOR.join([f"{repo_type}s", *repo_id.split("/")])
+
+    commit_hash = revision
+    if _REGEX_COMMIT_HASH.match(revision) is None:
+        ref_path = repo_path / "refs" / revision
+        if not ref_path.is_file():
+            raise ValueError(f"Revision '{revision}' of {repo_type} '{repo_id}' is not cached in '{cache_dir}'.")
+        commit_hash = ref_path.read_text().strip()
+    if not (repo_path / "snapshots" / commit_hash).is_dir():
+        raise ValueError(f"Revision '{revision}' of {repo_type} '{repo_id}' is not cached in '{cache_dir}'.")
+    return repo_path / _PINNED_FOLDER_NAME / commit_hash
+
+
+def _cache_size_lock(cache_dir: Path):
+    lock_path = cache_dir / ".locks" / "cache_size.lock"
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    return WeakFileLock(lock_path)
+
+
+def _read_cache_size(cache_dir: Path) -> Tuple[Optional[int], float]:
+    """Return the tracked size of the cache and the time of the last full scan. Size is `None` if unknown."""
+    try:
+        state: Dict = json.loads((cache_dir / ".locks" / "cache_size.json").read_text())
+        return int(state["size"]), float(state["scanned_at"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None, 0.0
+
+
+def _write_cache_size(cache_dir: Path, size: int, scanned_at: float) -> None:
+    state_path = cache_dir / ".locks" / "cache_size.json"
+    tmp_path = state_path.with_name(state_path.name + ".tmp")
+    tmp_path.write_text(json.dumps({"size": size, "scanned_at": scanned_at}))
+    os.replace(tmp_path, state_path)
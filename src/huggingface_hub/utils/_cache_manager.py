@@ -20,7 +20,7 @@ import time
 from collections import defaultdict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, FrozenSet, List, Literal, Optional, Set, Union
+from typing import Dict, FrozenSet, Iterable, List, Literal, Optional, Set, Tuple, Union
 
 from ..constants import HF_HUB_CACHE
 from . import logging
@@ -33,6 +33,9 @@ REPO_TYPE_T = Literal["model", "dataset", "space"]
 # List of OS-created helper files that need to be ignored
 FILES_TO_IGNORE = [".DS_Store"]
 
+# Folder of the shared blob store at the root of the cache (see `HF_HUB_ENABLE_SHARED_BLOBS`)
+SHARED_BLOBS_FOLDER_NAME = "blobs"
+
 
 class CacheNotFound(Exception):
     """Exception thrown when the Huggingface cache is not found."""
@@ -296,6 +299,8 @@ class DeleteCacheStrategy:
             Set of entire repo paths to be deleted.
         snapshots (`FrozenSet[Path]`):
             Set of snapshots to be deleted (directory of symlinks).
+        shared_blobs (`FrozenSet[Path]`):
+            Set of blob file paths to be deleted from the shared blob store, once no repo references them anymore.
     """
 
     expected_freed_size: int
@@ -303,6 +308,7 @@ class DeleteCacheStrategy:
     refs: FrozenSet[Path]
     repos: FrozenSet[Path]
     snapshots: FrozenSet[Path]
+    shared_blobs: FrozenSet[Path] = frozenset()
 
     @property
     def expected_freed_size_str(self) -> str:
@@ -351,6 +357,10 @@ class DeleteCacheStrategy:
         for path in self.blobs:
             _try_delete_path(path, path_type="blob")
 
+        # Delete blob files from the shared blob store (not referenced anymore)
+        for path in self.shared_blobs:
+            _try_delete_path(path, path_type="shared blob")
+
         logger.info(f"Cache deletion done. Saved {self.expected_freed_size_str}.")
 
 
@@ -374,7 +384,8 @@ class HFCacheInfo:
     <Tip warning={true}>
 
     Here `size_on_disk` is equal to the sum of all repo sizes (only blobs). However if
-    some cached repos are corrupted, their sizes are not taken into account.
+    some cached repos are corrupted, their sizes are not taken into account. Blobs
+    hardlinked across repos (see `HF_HUB_ENABLE_SHARED_BLOBS`) are counted only once.
 
     </Tip>
     """
@@ -487,6 +498,19 @@ class HFCacheInfo:
                             delete_strategy_blobs.add(file.blob_path)
                             delete_strategy_expected_freed_size += file.size_on_disk
 
+        # Blobs might be hardlinks to the shared blob store, also referenced by other repos.
+        # -> disk space is freed only once the last link is deleted
+        counted_blobs = set(delete_strategy_blobs)
+        uncounted_blobs = set()
+        for repo in self.repos:
+            if repo.repo_path in delete_strategy_repos:
+                referenced_blobs = {file.blob_path for revision in repo.revisions for file in revision.files}
+                counted_blobs |= referenced_blobs
+                if (repo.repo_path / "blobs").is_dir():
+                    uncounted_blobs |= set((repo.repo_path / "blobs").iterdir()) - referenced_blobs
+        size_correction, delete_strategy_shared_blobs = _get_hardlinked_blobs_to_delete(counted_blobs, uncounted_blobs)
+        delete_strategy_expected_freed_size += size_correction
+
         # Return the strategy instead of executing it.
         return DeleteCacheStrategy(
             blobs=frozenset(delete_strategy_blobs),
@@ -494,6 +518,7 @@ class HFCacheInfo:
             repos=frozenset(delete_strategy_repos),
             snapshots=frozenset(delete_strategy_snapshots),
             expected_freed_size=delete_strategy_expected_freed_size,
+            shared_blobs=frozenset(delete_strategy_shared_blobs),
         )
 
 
@@ -603,14 +628,26 @@ def scan_cache_dir(cache_dir: Optional[Union[str, Path]] = None) -> HFCacheInfo:
     for repo_path in cache_dir.iterdir():
         if repo_path.name == ".locks":  # skip './.locks/' folder
             continue
+        if repo_path.name == SHARED_BLOBS_FOLDER_NAME:  # skip './blobs/' folder (shared blob store)
+            continue
         try:
             repos.add(_scan_cached_repo(repo_path))
         except CorruptedCacheException as e:
             warnings.append(e)
 
+    size_on_disk = sum(repo.size_on_disk for repo in repos)
+    if (cache_dir / SHARED_BLOBS_FOLDER_NAME).is_dir():
+        # Blobs can be hardlinked across repos -> count each file only once
+        blob_sizes: Dict[Tuple[int, int], int] = {}
+        for repo in repos:
+            for blob_path in {file.blob_path for revision in repo.revisions for file in revision.files}:
+                blob_stat = blob_path.stat()
+                blob_sizes[(blob_stat.st_dev, blob_stat.st_ino)] = blob_stat.st_size
+        size_on_disk = sum(blob_sizes.values())
+
     return HFCacheInfo(
         repos=frozenset(repos),
-        size_on_disk=sum(repo.size_on_disk for repo in repos),
+        size_on_disk=size_on_disk,
         warnings=warnings,
     )
 
@@ -750,6 +787,59 @@ def _scan_cached_repo(repo_path: Path) -> CachedRepoInfo:
     )
 
 
+def _get_hardlinked_blobs_to_delete(
+    counted_blobs: Iterable[Path], uncounted_blobs: Iterable[Path]
+) -> Tuple[int, Set[Path]]:
+    """Reference-count blobs hardlinked to the shared blob store before deleting them.
+
+    Args:
+        counted_blobs (`Iterable[Path]`):
+            Blobs to be deleted, whose size is already counted in the expected freed size.
+        uncounted_blobs (`Iterable[Path]`):
+            Blobs to be deleted (e.g. with their repo), whose size is not counted in the expected freed size.
+
+    Returns:
+        `Tuple[int, Set[Path]]`: the correction to apply to the expected freed size and the set of blobs to delete
+        from the shared blob store (i.e. blobs that are not referenced by any repo anymore).
+    """
+    links: Dict[Tuple[int, int], List[Tuple[Path, bool]]] = defaultdict(list)
+    stats: Dict[Tuple[int, int], os.stat_result] = {}
+    for blob_path, is_counted in [(path, True) for path in counted_blobs] + [
+        (path, False) for path in uncounted_blobs
+    ]:
+        try:
+            blob_stat = blob_path.stat()
+        except OSError:
+            continue
+        if blob_stat.st_nlink <= 1:  # not hardlinked => nothing to correct
+            continue
+        key = (blob_stat.st_dev, blob_stat.st_ino)
+        links[key].append((blob_path, is_counted))
+        stats[key] = blob_stat
+
+    size_correction = 0
+    shared_blobs_to_delete: Set[Path] = set()
+    for key, paths in links.items():
+        blob_stat = stats[key]
+        remaining_links = blob_stat.st_nlink - len(paths)
+        if remaining_links == 1:
+            # Only remaining link might be the shared blob store -> delete it as well
+            blob_path = paths[0][0]
+            shared_blob_path = blob_path.parent.parent.parent / SHARED_BLOBS_FOLDER_NAME / blob_path.name
+            try:
+                if shared_blob_path.samefile(blob_path):
+                    shared_blobs_to_delete.add(shared_blob_path)
+                    remaining_links = 0
+            except OSError:
+                pass
+
+        # Replace the counted sizes by the actually freed size
+        size_correction -= blob_stat.st_size * sum(1 for _, is_counted in paths if is_counted)
+        if remaining_links == 0:
+            size_correction += blob_stat.st_size
+    return size_correction, shared_blobs_to_delete
+
+
 def _format_size(num: int) -> str:
     """Format size in bytes into a human-readable string.
 
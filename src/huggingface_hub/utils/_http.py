@@ -32,6 +32,7 @@ from huggingface_hub.errors import OfflineModeIsEnabled
 
 from .. import constants
 from . import logging
+from ._transfer_events import report_transfer_retry
 from ._typing import HTTP_METHOD_T
 
 
@@ -282,7 +283,8 @@ def http_backoff(
                 return response
 
             # Wrong status code returned (HTTP 503 for instance)
-            logger.warning(f"HTTP Error {response.status_code} thrown while requesting {method} {url}")
+            retry_reason = f"HTTP Error {response.status_code}"
+            logger.warning(f"{retry_reason} thrown while requesting {method} {url}")
             if nb_tries > max_retries:
                 response.raise_for_status()  # Will raise uncaught exception
                 # We return response to avoid infinite loop in the corner case where the
@@ -290,7 +292,8 @@ def http_backoff(
                 return response
 
         except retry_on_exceptions as err:
-            logger.warning(f"'{err}' thrown while requesting {method} {url}")
+            retry_reason = f"'{err}'"
+            logger.warning(f"{retry_reason} thrown while requesting {method} {url}")
 
             if isinstance(err, requests.ConnectionError):
                 reset_sessions()  # In case of SSLError it's best to reset the shared requests.Session objects
@@ -300,6 +303,7 @@ def http_backoff(
 
         # Sleep for X seconds
         logger.warning(f"Retrying in {sleep_time}s [Retry {nb_tries}/{max_retries}].")
+        report_transfer_retry(f"{retry_reason} [Retry {nb_tries}/{max_retries}]")  # if part of an upload/download
         time.sleep(sleep_time)
 
         # Update sleep time for next retry
@@ -0,0 +1,286 @@
+# coding=utf-8
+# Copyright 2024-present, the HuggingFace Inc. team.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Contains structured events emitted by downloads and uploads, to instrument them."""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Literal, Optional, Tuple
+
+from . import logging
+from ._transfer_scheduler import get_current_transfer_job
+
+
+logger = logging.get_logger(__name__)
+
+TransferEventType = Literal["start", "first_byte", "progress", "retry", "complete", "error", "cache_hit", "cache_miss"]
+TransferEventCallback = Callable[["TransferEvent"], None]
+
+_GLOBAL_CALLBACKS: List[TransferEventCallback] = []
+_CONTEXT_CALLBACKS: contextvars.ContextVar[Tuple[TransferEventCallback, ...]] = contextvars.ContextVar(
+    "huggingface_hub_transfer_callbacks", default=()
+)
+_CURRENT_TRACKER: contextvars.ContextVar[Optional["TransferTracker"]] = contextvars.ContextVar(
+    "huggingface_hub_transfer_tracker", default=None
+)
+
+
+@dataclass(frozen=True)
+class TransferEvent:
+    """A structured event emitted during a download or an upload.
+
+    Each transfer (file download or LFS upload) emits a `"start"` event, then `"first_byte"` when the first bytes are
+    transferred, `"progress"` events as data is transferred, `"retry"` events if the transfer is retried or resumed and
+    finally a `"complete"` or an `"error"` event. `"cache_hit"` and `"cache_miss"` events are emitted when a file is
+    looked up in the cache before being downloaded.
+
+    Attributes:
+        type (`str`):
+            One of `"start"`, `"first_byte"`, `"progress"`, `"retry"`, `"complete"`, `"error"`, `"cache_hit"` or
+            `"cache_miss"`.
+        direction (`str`):
+            `"download"` or `"upload"`.
+        name (`str`, *optional*):
+            Name of the transferred file (filename in the repo).
+        url (`str`, *optional*):
+            URL of the transfer.
+        repo_id (`str`, *optional*):
+            Repo of the file, if known.
+        job (`str`, *optional*):
+            Name of the [`TransferJob`] the transfer belongs to (e.g. the repo id for `snapshot_download`).
+        nbytes (`int`):
+            Number of bytes transferred since the previous `"progress"` event.
+        transferred (`int`):
+            Number of bytes transferred since the start of the transfer.
+        total (`int`, *optional*):
+            Expected size of the file, if known.
+        elapsed (`float`):
+            Seconds since the start of the transfer (e.g. time to first byte for `"first_byte"` events, total
+            duration for `"complete"` events).
+        reason (`str`, *optional*):
+            Reason of a `"retry"` or an `"error"` event. Set on `"cache_hit"` events when the cached file is returned
+            because the Hub could not be reached.
+        timestamp (`float`):
+            Time at which the event has been emitted (as returned by `time.time()`).
+    """
+
+    type: TransferEventType
+    direction: Literal["download", "upload"]
+    name: Optional[str] = None
+    url: Optional[str] = None
+    repo_id: Optional[str] = None
+    job: Optional[str] = None
+    nbytes: int = 0
+    transferred: int = 0
+    total: Optional[int] = None
+    elapsed: float = 0.0
+    reason: Optional[str] = None
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def throughput(self) -> Optional[float]:
+        """Average throughput of the transfer so far, in bytes per second."""
+        return self.transferred / self.elapsed if self.elapsed > 0 else None
+
+
+def add_transfer_callback(callback: TransferEventCallback) -> None:
+    """
+    Register a callback called with a [`TransferEvent`] for each event of all downloads and uploads of the process.
+
+    Callbacks are called synchronously in the thread doing the transfer: they must be fast and thread-safe. Errors
+    raised by a callback are logged and ignored.
+
+    Args:
+        callback (`Callable[[TransferEvent], None]`):
+            The callback to register.
+
+    Example:
+    ```py
+    >>> from huggingface_hub import add_transfer_callback, snapshot_download
+
+    >>> def log_event(event):
+    ...     if event.type == "complete":
+    ...         print(f"{event.name}: {event.transferred} bytes in {event.elapsed:.1f}s ({event.throughput:.0f} B/s)")
+
+    >>> add_transfer_callback(log_event)
+    >>> snapshot_download("gpt2")
+    ```
+    """
+    _GLOBAL_CALLBACKS.append(callback)
+
+
+def remove_transfer_callback(callback: TransferEventCallback) -> None:
+    """Unregister a callback registered with [`add_transfer_callback`]."""
+    _GLOBAL_CALLBACKS.remove(callback)
+
+
+@contextmanager
+def transfer_callback(callback: TransferEventCallback) -> Iterator[None]:
+    """
+    Call `callback` with a [`TransferEvent`] for each event of the downloads and uploads made in the context.
+
+    The callback is attached to the current context (see `contextvars`) and propagated to the worker threads started by
+    `huggingface_hub`, similarly to [`transfer_job`].
+
+    Args:
+        callback (`Callable[[TransferEvent], None]`):
+            The callback to call.
+
+    Example:
+    ```py
+    >>> from huggingface_hub import hf_hub_download, transfer_callback
+
+    >>> events = []
+    >>> with transfer_callback(events.append):
+    ...     hf_hub_download("gpt2", "config.json")
+    >>> [event.type for event in events]
+    ['cache_miss', 'start', 'first_byte', 'progress', 'complete']
+    ```
+    """
+    token = _CONTEXT_CALLBACKS.set(_CONTEXT_CALLBACKS.get() + (callback,))
+    try:
+        yield
+    finally:
+        _CONTEXT_CALLBACKS.reset(token)
+
+
+def emit_transfer_event(
+    type: TransferEventType, direction: Literal["download", "upload"] = "download", **kwargs
+) -> None:
+    """Emit an event to the registered callbacks. Does nothing (not even building the event) if there are none."""
+    callbacks = _get_callbacks()
+    if len(callbacks) > 0:
+        _dispatch(callbacks, TransferEvent(type=type, direction=direction, job=_current_job_name(), **kwargs))
+
+
+class TransferTracker:
+    """Emit the events of a single transfer. Created by [`track_transfer`].
+
+    Callbacks are resolved once at creation: if none is registered, tracking a transfer costs nothing.
+    """
+
+    def __init__(
+        self,
+        direction: Literal["download", "upload"],
+        name: Optional[str] = None,
+        url: Optional[str] = None,
+        total: Optional[int] = None,
+        repo_id: Optional[str] = None,
+    ) -> None:
+        self.direction = direction
+        self.name = name
+        self.url = url
+        self.total = total
+        self.repo_id = repo_id
+        self.transferred = 0
+
+        self._callbacks = _get_callbacks()
+        self._job = _current_job_name()
+        self._start = time.monotonic()
+        self._lock = threading.Lock()  # a transfer can be split across threads (e.g. range requests)
+
+    def update(self, nbytes: int) -> None:
+        """Report `nbytes` transferred."""
+        if len(self._callbacks) == 0:
+            return
+        with self._lock:
+            is_first_byte = self.transferred == 0
+            self.transferred += nbytes
+        if is_first_byte:
+            self._emit("first_byte")
+        self._emit("progress", nbytes=nbytes)
+
+    def retry(self, reason: str) -> None:
+        """Report that the transfer is retried or resumed."""
+        self._emit("retry", reason=reason)
+
+    def _emit(self, type: TransferEventType, **kwargs) -> None:
+        if len(self._callbacks) == 0:
+            return
+        event = TransferEvent(
+            type=type,
+            direction=self.direction,
+            name=self.name,
+            url=self.url,
+            repo_id=self.repo_id,
+            job=self._job,
+            transferred=self.transferred,
+            total=self.total,
+            elapsed=time.monotonic() - self._start,
+            **kwargs,
+        )
+        _dispatch(self._callbacks, event)
+
+
+@contextmanager
+def track_transfer(
+    direction: Literal["download", "upload"],
+    *,
+    name: Optional[str] = None,
+    url: Optional[str] = None,
+    total: Optional[int] = None,
+    repo_id: Optional[str] = None,
+) -> Iterator[TransferTracker]:
+    """Track a transfer: emit `"start"` on enter and `"complete"` or `"error"` on exit.
+
+    The tracker is attached to the current context so that nested helpers (e.g. `http_backoff` retries) can report to
+    it with [`report_transfer_retry`] and [`report_transfer_progress`].
+    """
+    tracker = TransferTracker(direction=direction, name=name, url=url, total=total, repo_id=repo_id)
+    token = _CURRENT_TRACKER.set(tracker)
+    tracker._emit("start")
+    try:
+        yield tracker
+    except BaseException as e:
+        tracker._emit("error", reason=f"{type(e).__name__}: {e}")
+        raise
+    else:
+        tracker._emit("complete")
+    finally:
+        _CURRENT_TRACKER.reset(token)
+
+
+def report_transfer_progress(nbytes: int) -> None:
+    """Report `nbytes` transferred by the transfer tracked in the current context, if any."""
+    tracker = _CURRENT_TRACKER.get()
+    if tracker is not None:
+        tracker.update(nbytes)
+
+
+def report_transfer_retry(reason: str) -> None:
+    """Report a retry of the transfer tracked in the current context, if any."""
+    tracker = _CURRENT_TRACKER.get()
+    if tracker is not None:
+        tracker.retry(reason)
+
+
+def _get_callbacks() -> Tuple[TransferEventCallback, ...]:
+    return tuple(_GLOBAL_CALLBACKS) + _CONTEXT_CALLBACKS.get()
+
+
+def _current_job_name() -> Optional[str]:
+    job = get_current_transfer_job()
+    return job.name if job is not None else None
+
+
+def _dispatch(callbacks: Tuple[TransferEventCallback, ...], event: TransferEvent) -> None:
+    for callback in callbacks:
+        try:
+            callback(event)
+        except Exception as e:
+            # Instrumentation must never break a transfer
+            logger.warning(f"Error in transfer callback {callback}: {e}")
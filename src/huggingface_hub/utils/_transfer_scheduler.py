@@ -0,0 +1,346 @@
+# coding=utf-8
+# Copyright 2024-present, the HuggingFace Inc. team.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Contains a process-wide scheduler coordinating all downloads and uploads."""
+
+import asyncio
+import contextvars
+import functools
+import itertools
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, BinaryIO, Callable, Iterator, List, Optional, TypeVar
+
+from .. import constants
+
+
+T = TypeVar("T")
+
+_CURRENT_TRANSFER_JOB: contextvars.ContextVar[Optional["TransferJob"]] = contextvars.ContextVar(
+    "huggingface_hub_transfer_job", default=None
+)
+
+
+@dataclass
+class TransferJob:
+    """A group of transfers (e.g. all files of a `snapshot_download` call) sharing the same priority.
+
+    When connection slots are contended, waiting transfers are served by decreasing priority first. Between jobs of the
+    same priority, the job holding the fewest connections is served first so that concurrent jobs get a fair share of
+    the available connections.
+
+    Args:
+        priority (`int`, *optional*):
+            Priority of the job. Higher values are served first. Defaults to 0.
+        name (`str`, *optional*):
+            Name of the job, for debugging purposes.
+    """
+
+    priority: int = 0
+    name: Optional[str] = None
+    active_connections: int = field(default=0, init=False, repr=False)  # guarded by the scheduler lock
+
+
+class _Waiter(ABC):
+    """A transfer waiting for a connection slot."""
+
+    def __init__(self, job: TransferJob, seq: int) -> None:
+        self.job = job
+        self.seq = seq
+
+    @abstractmethod
+    def notify(self) -> None:
+        """Wake up the transfer once it has been granted a connection slot."""
+
+
+class _ThreadWaiter(_Waiter):
+    def __init__(self, job: TransferJob, seq: int) -> None:
+        super().__init__(job, seq)
+        self.event = threading.Event()
+
+    def notify(self) -> None:
+        self.event.set()
+
+
+class _AsyncWaiter(_Waiter):
+    def __init__(self, job: TransferJob, seq: int) -> None:
+        super().__init__(job, seq)
+        self.loop = asyncio.get_running_loop()
+        self.future: asyncio.Future = self.loop.create_future()
+
+    def notify(self) -> None:
+        # Might be called from another thread => schedule the result in the waiter's event loop
+        self.loop.call_soon_threadsafe(self._set_result)
+
+    def _set_result(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class TransferScheduler:
+    """Coordinate concurrent downloads and uploads of a process.
+
+    All data transfers (file downloads, range requests, LFS uploads) request a connection slot from the scheduler
+    before opening a connection and report the bytes they transfer. This makes it possible to limit the total number
+    of connections and the total bandwidth used by the process, whatever the number of concurrent `snapshot_download`
+    or `upload_folder` calls.
+
+    Connection slots are granted by priority and fairly shared between [`TransferJob`]s. Bandwidth is limited using a
+    token bucket shared by all transfers. If no limit is set (default), the scheduler does nothing.
+
+    Uploads and downloads made with `hf_transfer` are not controlled by the scheduler.
+
+    Args:
+        max_connections (`int`, *optional*):
+            Maximum number of concurrent connections. 0 means unlimited. Defaults to 0.
+        max_bandwidth (`int`, *optional*):
+            Maximum bandwidth in bytes per second. 0 means unlimited. Defaults to 0.
+    """
+
+    def __init__(self, max_connections: int = 0, max_bandwidth: int = 0) -> None:
+        self.max_connections = max_connections
+        self.max_bandwidth = max_bandwidth
+
+        self._lock = threading.Lock()
+        self._active_connections = 0
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._thread_local = threading.local()  # connections held by the current thread (reentrancy)
+
+        # Token bucket: at most 1 second of burst
+        self._tokens = float(max_bandwidth)
+        self._last_refill = time.monotonic()
+
+    @contextmanager
+    def connection(self, job: Optional[TransferJob] = None) -> Iterator[None]:
+        """Hold a connection slot during the context, blocking until one is available.
+
+        Reentrant: a thread already holding a slot (e.g. when retrying a failed request) does not wait for another one.
+        """
+        if self.max_connections <= 0 or getattr(self._thread_local, "depth", 0) > 0:
+            yield
+            return
+
+        job = _resolve_job(job)
+        waiter = _ThreadWaiter(job, next(self._seq))
+        if not self._try_acquire(waiter):
+            waiter.event.wait()
+        self._thread_local.depth = 1
+        try:
+            yield
+        finally:
+            self._thread_local.depth = 0
+            self._release(job)
+
+    @asynccontextmanager
+    async def aconnection(self, job: Optional[TransferJob] = None) -> AsyncIterator[None]:
+        """Async version of [`TransferScheduler.connection`]. Waiting for a slot does not block the event loop."""
+        if self.max_connections <= 0:
+            yield
+            return
+
+        job = _resolve_job(job)
+        waiter = _AsyncWaiter(job, next(self._seq))
+        if not self._try_acquire(waiter):
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                with self._lock:
+                    granted = waiter not in self._waiters
+                    if not granted:
+                        self._waiters.remove(waiter)
+                if granted:
+                    self._release(job)
+                raise
+        try:
+            yield
+        finally:
+            self._release(job)
+
+    def throttle(self, nbytes: int) -> None:
+        """Report `nbytes` transferred and sleep if the bandwidth limit is exceeded."""
+        if self.max_bandwidth > 0:
+            delay = self._consume(nbytes)
+            if delay > 0:
+                time.sleep(delay)
+
+    async def athrottle(self, nbytes: int) -> None:
+        """Async version of [`TransferScheduler.throttle`]."""
+        if self.max_bandwidth > 0:
+            delay = self._consume(nbytes)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    @contextmanager
+    def throttled_reads(self, fileobj: BinaryIO) -> Iterator[BinaryIO]:
+        """Throttle all reads made on `fileobj` during the context (e.g. when streaming it as a request body)."""
+        if self.max_bandwidth <= 0:
+            yield fileobj
+            return
+
+        f_read = fileobj.read
+
+        def _inner_read(size: int = -1) -> bytes:
+            data = f_read(size)
+            self.throttle(len(data))
+            return data
+
+        fileobj.read = _inner_read  # type: ignore
+        try:
+            yield fileobj
+        finally:
+            fileobj.read = f_read  # type: ignore
+
+    def _try_acquire(self, waiter: _Waiter) -> bool:
+        with self._lock:
+            if self._active_connections < self.max_connections and len(self._waiters) == 0:
+                self._active_connections += 1
+                waiter.job.active_connections += 1
+                return True
+            self._waiters.append(waiter)
+            return False
+
+    def _release(self, job: TransferJob) -> None:
+        with self._lock:
+            self._active_connections -= 1
+            job.active_connections -= 1
+            while self._active_connections < self.max_connections and len(self._waiters) > 0:
+                # Highest priority first, then job with the fewest connections, then first in first out
+                waiter = max(self._waiters, key=lambda w: (w.job.priority, -w.job.active_connections, -w.seq))
+                self._waiters.remove(waiter)
+                self._active_connections += 1
+                waiter.job.active_connections += 1
+                waiter.notify()
+
+    def _consume(self, nbytes: int) -> float:
+        """Take `nbytes` tokens from the bucket and return how long to wait before the bucket is not in debt."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                float(self.max_bandwidth), self._tokens + (now - self._last_refill) * self.max_bandwidth
+            )
+            self._last_refill = now
+            self._tokens -= nbytes
+            return -self._tokens / self.max_bandwidth if self._tokens < 0 else 0.0
+
+
+_TRANSFER_SCHEDULER: Optional[TransferScheduler] = None
+_TRANSFER_SCHEDULER_LOCK = threading.Lock()
+
+
+def configure_transfer_scheduler(max_connections: int = 0, max_bandwidth: int = 0) -> TransferScheduler:
+    """
+    Configure the limits shared by all downloads and uploads of the process.
+
+    Defaults are read from the `HF_HUB_MAX_CONNECTIONS` and `HF_HUB_MAX_BANDWIDTH` environment variables. Transfers
+    started after this call use the new limits.
+
+    Args:
+        max_connections (`int`, *optional*):
+            Maximum number of concurrent connections. 0 means unlimited. Defaults to 0.
+        max_bandwidth (`int`, *optional*):
+            Maximum bandwidth in bytes per second. 0 means unlimited. Defaults to 0.
+
+    Example:
+    ```py
+    >>> from huggingface_hub import configure_transfer_scheduler, snapshot_download, transfer_job
+
+    # At most 8 connections and 100MB/s for the whole process
+    >>> configure_transfer_scheduler(max_connections=8, max_bandwidth=100 * 1024 * 1024)
+
+    # Downloads from this job are served first
+    >>> with transfer_job(priority=10):
+    ...     snapshot_download("gpt2")
+    ```
+    """
+    global _TRANSFER_SCHEDULER
+    with _TRANSFER_SCHEDULER_LOCK:
+        _TRANSFER_SCHEDULER = TransferScheduler(max_connections=max_connections, max_bandwidth=max_bandwidth)
+        return _TRANSFER_SCHEDULER
+
+
+def get_transfer_scheduler() -> TransferScheduler:
+    """Get the [`TransferScheduler`] shared by all downloads and uploads of the process."""
+    global _TRANSFER_SCHEDULER
+    if _TRANSFER_SCHEDULER is None:
+        with _TRANSFER_SCHEDULER_LOCK:
+            if _TRANSFER_SCHEDULER is None:
+                _TRANSFER_SCHEDULER = TransferScheduler(
+                    max_connections=constants.HF_HUB_MAX_CONNECTIONS, max_bandwidth=constants.HF_HUB_MAX_BANDWIDTH
+                )
+    return _TRANSFER_SCHEDULER
+
+
+@contextmanager
+def transfer_job(priority: int = 0, name: Optional[str] = None) -> Iterator[TransferJob]:
+    """
+    Group all transfers made in the context into a single [`TransferJob`].
+
+    The job is attached to the current context (see `contextvars`) and propagated to the worker threads and asyncio
+    tasks started by `huggingface_hub`.
+
+    Args:
+        priority (`int`, *optional*):
+            Priority of the job. Higher values are served first when connections are limited. Defaults to 0.
+        name (`str`, *optional*):
+            Name of the job, for debugging purposes.
+    """
+    job = TransferJob(priority=priority, name=name)
+    token = _CURRENT_TRANSFER_JOB.set(job)
+    try:
+        yield job
+    finally:
+        _CURRENT_TRANSFER_JOB.reset(token)
+
+
+@contextmanager
+def default_transfer_job(name: Optional[str] = None) -> Iterator[TransferJob]:
+    """Reuse the current [`TransferJob`] if any, otherwise start a new one with default priority."""
+    job = _CURRENT_TRANSFER_JOB.get()
+    if job is not None:
+        yield job
+        return
+    with transfer_job(name=name) as job:
+        yield job
+
+
+def get_current_transfer_job() -> Optional[TransferJob]:
+    """Return the [`TransferJob`] attached to the current context, if any."""
+    return _CURRENT_TRANSFER_JOB.get()
+
+
+def with_current_context(fn: Callable[..., T]) -> Callable[..., T]:
+    """Wrap `fn` so that it runs in a copy of the caller's context (e.g. current transfer job) in worker threads."""
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def _inner(*args, **kwargs) -> T:
+        # A context cannot be entered by several threads at once => run each call in its own copy
+        return context.copy().run(fn, *args, **kwargs)
+
+    return _inner
+
+
+def _resolve_job(job: Optional[TransferJob]) -> TransferJob:
+    if job is not None:
+        return job
+    current = _CURRENT_TRANSFER_JOB.get()
+    return current if current is not None else _ORPHAN_JOB
+
+
+# Job used for transfers made outside of any job (e.g. low-level `http_get` calls)
+_ORPHAN_JOB = TransferJob(name="default")
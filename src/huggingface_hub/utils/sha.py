@@ -1,6 +1,7 @@
 """Utilities to efficiently compute the SHA 256 hash of a bunch of bytes."""
 
-from typing import BinaryIO, Optional
+import os
+from typing import BinaryIO, Optional, Union
 
 from .insecure_hashlib import sha256
 
@@ -27,3 +28,31 @@ def sha_fileobj(fileobj: BinaryIO, chunk_size: Optional[int] = None) -> bytes:
         if not chunk:
             break
     return sha.digest()
+
+
+def sha_file(path: Union[str, "os.PathLike[str]"], chunk_size: Optional[int] = None) -> bytes:
+    """
+    Computes the sha256 hash of the file at `path`.
+
+    The file is read without buffering into a single preallocated buffer of `chunk_size` bytes. `hashlib` releases the
+    GIL while hashing large chunks, hence several files can be hashed concurrently from a thread pool.
+
+    Args:
+        path (`str` or `os.PathLike`):
+            Path of the file to hash.
+        chunk_size (`int`, *optional*):
+            The number of bytes to read at once, defaults to 8MB.
+
+    Returns:
+        `bytes`: the file's sha256 hash as bytes
+    """
+    buffer = memoryview(bytearray(chunk_size if chunk_size is not None else 8 * 1024 * 1024))
+
+    sha = sha256()
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            nb_bytes = f.readinto(buffer)
+            if not nb_bytes:
+                break
+            sha.update(buffer[:nb_bytes])
+    return sha.digest()
@@ -0,0 +1,300 @@
+import asyncio
+import contextlib
+import json
+import os
+from hashlib import sha256
+from pathlib import Path
+from typing import AsyncIterator, Dict, List
+from unittest.mock import patch
+
+import pytest
+from aiohttp import web
+
+from huggingface_hub import ahf_hub_download, asnapshot_download, hf_hub_download
+from huggingface_hub.utils import EntryNotFoundError, LocalEntryNotFoundError, RepositoryNotFoundError, tqdm
+
+
+REPO_ID = "user/repo"
+COMMIT_HASH = "a" * 40
+CONFIG_CONTENT = b'{"hello": "world"}'
+CONFIG_BLOB_ID = "b" * 40
+MODEL_CONTENT = b"model weights" * 100
+MODEL_SHA256 = sha256(MODEL_CONTENT).hexdigest()
+
+
+class FakeHub:
+    """Minimal Hub server: repo info, HEAD and (ranged) GET on files of a single model repo."""
+
+    _supports_ranges = True
+
+    def __init__(self) -> None:
+        self.files: Dict[str, bytes] = {"config.json": CONFIG_CONTENT, "model.bin": MODEL_CONTENT}
+        self.requests: List[str] = []
+        self.corrupt_model = False
+
+    def _etag(self, filename: str) -> str:
+        return MODEL_SHA256 if filename == "model.bin" else CONFIG_BLOB_ID
+
+    async def repo_info(self, request: web.Request) -> web.Response:
+        self.requests.append(f"GET {request.path}")
+        if request.match_info["repo"] != REPO_ID:
+            return web.json_response(
+                {"error": "Repository not found"}, status=404, headers={"X-Error-Code": "RepoNotFound"}
+            )
+        siblings = [
+            {"rfilename": "config.json", "blobId": CONFIG_BLOB_ID, "size": len(CONFIG_CONTENT)},
+            {
+                "rfilename": "model.bin",
+                "blobId": "c" * 40,
+                "size": 134,
+                "lfs": {"sha256": MODEL_SHA256, "size": len(MODEL_CONTENT), "pointerSize": 134},
+            },
+        ]
+        return web.json_response(
+            {
+                "id": REPO_ID,
+                "sha": COMMIT_HASH,
+                "private": False,
+                "downloads": 0,
+                "likes": 0,
+                "tags": [],
+                "siblings": siblings,
+            }
+        )
+
+    async def resolve(self, request: web.Request) -> web.StreamResponse:
+        filename = request.match_info["filename"]
+        self.requests.append(f"{request.method} {request.path}")
+        headers = {"X-Repo-Commit": COMMIT_HASH}
+        if request.match_info["repo"] != REPO_ID:
+            return web.Response(status=404, headers={"X-Error-Code": "RepoNotFound"})
+        if filename not in self.files:
+            return web.Response(status=404, headers={**headers, "X-Error-Code": "EntryNotFound"})
+
+        content = self.files[filename]
+        if filename == "model.bin" and self.corrupt_model and request.method == "GET":
+            content = b"X" * len(content)
+        if request.method == "HEAD":
+            return web.Response(
+                headers={**headers, "ETag": f'"{self._etag(filename)}"', "Content-Length": str(len(content))}
+            )
+        if "Range" in request.headers and self._supports_ranges:
+            start = int(request.headers["Range"][len("bytes=") :].split("-")[0])
+            return web.Response(body=content[start:], status=206, headers=headers)
+        return web.Response(body=content, headers=headers)
+
+
+@contextlib.asynccontextmanager
+async def run_fake_hub(hub: FakeHub) -> AsyncIterator[str]:
+    app = web.Application()
+    app.router.add_get("/api/models/{repo:.+}/revision/{revision}", hub.repo_info)
+    app.router.add_route("*", "/{repo:[^/]+/[^/]+}/resolve/{revision}/{filename:.+}", hub.resolve)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_ahf_hub_download(tmp_path: Path) -> None:
+    hub = FakeHub()
+    async with run_fake_hub(hub) as endpoint:
+        path = await ahf_hub_download(REPO_ID, "config.json", cache_dir=tmp_path, endpoint=endpoint)
+
+    # Same cache layout as `hf_hub_download`
+    storage_folder = tmp_path / "models--user--repo"
+    assert Path(path) == storage_folder / "snapshots" / COMMIT_HASH / "config.json"
+    assert Path(path).read_bytes() == CONFIG_CONTENT
+    assert (storage_folder / "blobs" / CONFIG_BLOB_ID).read_bytes() == CONFIG_CONTENT
+    assert (storage_folder / "refs" / "main").read_text() == COMMIT_HASH
+
+
+@pytest.mark.asyncio
+async def test_ahf_hub_download_from_commit_hash_is_cached(tmp_path: Path) -> None:
+    hub = FakeHub()
+    async with run_fake_hub(hub) as endpoint:
+        path = await ahf_hub_download(REPO_ID, "config.json", cache_dir=tmp_path, endpoint=endpoint)
+        nb_requests = len(hub.requests)
+        path_2 = await ahf_hub_download(
+            REPO_ID, "config.json", revision=COMMIT_HASH, cache_dir=tmp_path, endpoint=endpoint
+        )
+    assert path == path_2
+    assert len(hub.requests) == nb_requests  # no HTTP call
+
+
+@pytest.mark.asyncio
+async def test_ahf_hub_download_interoperable_with_sync(tmp_path: Path) -> None:
+    hub = FakeHub()
+    async with run_fake_hub(hub) as endpoint:
+        path = await ahf_hub_download(REPO_ID, "model.bin", cache_dir=tmp_path, endpoint=endpoint)
+
+    # File is found in cache by the sync method
+    assert hf_hub_download(REPO_ID, "model.bin", cache_dir=tmp_path, local_files_only=True) == path
+
+
+@pytest.mark.asyncio
+async def test_ahf_hub_download_resume(tmp_path: Path) -> None:
+    hub = FakeHub()
+    blob_path = tmp_path / "models--user--repo" / "blobs" / MODEL_SHA256
+    blob_path.parent.mkdir(parents=True)
+    Path(str(blob_path) + ".incomplete").write_bytes(MODEL_CONTENT[:100])
+
+    async with run_fake_hub(hub) as endpoint:
+        path = await ahf_hub_download(REPO_ID, "model.bin", cache_dir=tmp_path, endpoint=endpoint)
+
+    assert Path(path).read_bytes() == MODEL_CONTENT
+    assert not Path(str(blob_path) + ".incomplete").exists()
+
+
+@pytest.mark.asyncio
+async def test_ahf_hub_download_sha256_mismatch(tmp_path: Path) -> None:
+    hub = FakeHub()
+    hub.corrupt_model = True
+    async with run_fake_hub(hub) as endpoint:
+        with pytest.raises(EnvironmentError, match="Consistency check failed"):
+            await ahf_hub_download(REPO_ID, "model.bin", cache_dir=tmp_path, endpoint=endpoint)
+
+    # Corrupted file is not kept in cache
+    assert not (tmp_path / "models--user--repo" / "blobs" / MODEL_SHA256).exists()
+
+
+@pytest.mark.asyncio
+async def test_ahf_hub_download_errors(tmp_path: Path) -> None:
+    hub = FakeHub()
+    async with run_fake_hub(hub) as endpoint:
+        with pytest.raises(EntryNotFoundError):
+            await ahf_hub_download(REPO_ID, "missing.txt", cache_dir=tmp_path, endpoint=endpoint)
+        with pytest.raises(RepositoryNotFoundError):
+            await ahf_hub_download("user/missing", "config.json", cache_dir=tmp_path, endpoint=endpoint)
+
+    # Non-existence of the file is cached, like with `hf_hub_download`
+    assert (tmp_path / "models--user--repo" / ".no_exist" / COMMIT_HASH / "missing.txt").exists()
+
+
+@pytest.mark.asyncio
+async def test_ahf_hub_download_offline(tmp_path: Path) -> None:
+    hub = FakeHub()
+    async with run_fake_hub(hub) as endpoint:
+        path = await ahf_hub_download(REPO_ID, "config.json", cache_dir=tmp_path, endpoint=endpoint)
+
+    with patch("huggingface_hub.constants.HF_HUB_OFFLINE", True):
+        # Server is down and offline mode enabled => file is returned from cache
+        assert await ahf_hub_download(REPO_ID, "config.json", cache_dir=tmp_path, endpoint=endpoint) == path
+        with pytest.raises(LocalEntryNotFoundError):
+            await ahf_hub_download(REPO_ID, "model.bin", cache_dir=tmp_path, endpoint=endpoint)
+
+
+@pytest.mark.asyncio
+async def test_ahf_hub_download_cache_tiers(tmp_path: Path) -> None:
+    hub = FakeHub()
+    fast_tier, shared_tier = tmp_path / "fast", tmp_path / "shared"
+    with patch("huggingface_hub.file_download.HF_HUB_CACHE_TIERS", [(str(fast_tier), None), (str(shared_tier), None)]):
+        async with run_fake_hub(hub) as endpoint:
+            await ahf_hub_download(REPO_ID, "model.bin", cache_dir=shared_tier, endpoint=endpoint)
+            assert len(hub.requests) == 2  # HEAD + GET
+
+            # Blob from the shared tier is copied to the fast tier => no download
+            path = await ahf_hub_download(REPO_ID, "config.json", cache_dir=fast_tier, endpoint=endpoint)
+            path = await ahf_hub_download(REPO_ID, "model.bin", cache_dir=fast_tier, endpoint=endpoint)
+            assert hub.requests[-1] == f"HEAD /{REPO_ID}/resolve/main/model.bin"
+            assert Path(path).read_bytes() == MODEL_CONTENT
+            assert path.startswith(str(fast_tier))
+            assert (shared_tier / "models--user--repo" / "blobs" / CONFIG_BLOB_ID).exists()  # downloaded to both
+
+        # Offline => file cached in the shared tier is promoted to the fast tier
+        (fast_tier / "models--user--repo").rename(tmp_path / "removed")
+        with patch("huggingface_hub.constants.HF_HUB_OFFLINE", True):
+            path = await ahf_hub_download(REPO_ID, "model.bin", cache_dir=fast_tier)
+    assert Path(path) == fast_tier / "models--user--repo" / "snapshots" / COMMIT_HASH / "model.bin"
+    assert Path(path).read_bytes() == MODEL_CONTENT
+
+
+@pytest.mark.asyncio
+async def test_ahf_hub_download_cache_tier_max_size(tmp_path: Path) -> None:
+    hub = FakeHub()
+    fast_tier, shared_tier = tmp_path / "fast", tmp_path / "shared"
+    tiers = [(str(fast_tier), 10**6), (str(shared_tier), None)]  # budget on the fast tier only
+    with patch("huggingface_hub.file_download.HF_HUB_CACHE_TIERS", tiers), patch(
+        "huggingface_hub.constants.HF_HUB_CACHE_TIERS", tiers
+    ), patch("huggingface_hub.constants.HF_HUB_CACHE_MAX_SIZE", None):
+        async with run_fake_hub(hub) as endpoint:
+            await ahf_hub_download(REPO_ID, "model.bin", cache_dir=fast_tier, endpoint=endpoint)
+
+    # Size of the fast tier is tracked for eviction, not the one of the shared tier (no budget)
+    assert json.loads((fast_tier / ".locks" / "cache_size.json").read_text())["size"] == len(MODEL_CONTENT)
+    assert not (shared_tier / ".locks" / "cache_size.json").exists()
+
+
+@pytest.mark.asyncio
+async def test_asnapshot_download(tmp_path: Path) -> None:
+    hub = FakeHub()
+    async with run_fake_hub(hub) as endpoint:
+        folder = await asnapshot_download(REPO_ID, cache_dir=tmp_path, endpoint=endpoint)
+
+    assert Path(folder) == tmp_path / "models--user--repo" / "snapshots" / COMMIT_HASH
+    assert sorted(os.listdir(folder)) == ["config.json", "model.bin"]
+    assert (Path(folder) / "model.bin").read_bytes() == MODEL_CONTENT
+
+    # Metadata are taken from the repo listing => no HEAD call
+    assert not any(request.startswith("HEAD") for request in hub.requests)
+
+
+@pytest.mark.asyncio
+async def test_asnapshot_download_progress_in_bytes(tmp_path: Path) -> None:
+    hub = FakeHub()
+    with patch("huggingface_hub._async_download.tqdm", wraps=tqdm) as mock_tqdm:
+        async with run_fake_hub(hub) as endpoint:
+            await asnapshot_download(REPO_ID, cache_dir=tmp_path, endpoint=endpoint)
+
+    # Same as `snapshot_download`: progress is reported in bytes
+    snapshot_progress = next(
+        call for call in mock_tqdm.call_args_list if call.kwargs["name"] == "huggingface_hub.snapshot_download"
+    )
+    assert snapshot_progress.kwargs["total"] == len(CONFIG_CONTENT) + len(MODEL_CONTENT)
+    assert snapshot_progress.kwargs["unit"] == "B"
+
+
+@pytest.mark.asyncio
+async def test_asnapshot_download_allow_patterns_and_offline(tmp_path: Path) -> None:
+    hub = FakeHub()
+    async with run_fake_hub(hub) as endpoint:
+        folder = await asnapshot_download(REPO_ID, cache_dir=tmp_path, endpoint=endpoint, allow_patterns="*.json")
+    assert os.listdir(folder) == ["config.json"]
+
+    # Snapshot folder is found from the cached ref
+    assert await asnapshot_download(REPO_ID, cache_dir=tmp_path, local_files_only=True) == folder
+
+
+@pytest.mark.asyncio
+async def test_asnapshot_download_cancelled(tmp_path: Path) -> None:
+    hub = FakeHub()
+    async with run_fake_hub(hub) as endpoint:
+        task = asyncio.ensure_future(asnapshot_download(REPO_ID, cache_dir=tmp_path, endpoint=endpoint))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # Next call completes the download
+        folder = await asnapshot_download(REPO_ID, cache_dir=tmp_path, endpoint=endpoint)
+    assert (Path(folder) / "model.bin").read_bytes() == MODEL_CONTENT
+
+
+@pytest.mark.asyncio
+async def test_ahf_hub_download_resume_server_ignores_range(tmp_path: Path) -> None:
+    hub = FakeHub()
+    blob_path = tmp_path / "models--user--repo" / "blobs" / MODEL_SHA256
+    blob_path.parent.mkdir(parents=True)
+    Path(str(blob_path) + ".incomplete").write_bytes(MODEL_CONTENT[:100])
+
+    async with run_fake_hub(hub) as endpoint:
+        with patch.object(FakeHub, "_supports_ranges", False):
+            path = await ahf_hub_download(REPO_ID, "model.bin", cache_dir=tmp_path, endpoint=endpoint)
+
+    # Full content is returned by the server => existing bytes are skipped and sha256 is still valid
+    assert Path(path).read_bytes() == MODEL_CONTENT
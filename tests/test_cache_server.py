@@ -0,0 +1,172 @@
+import os
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from huggingface_hub import get_hf_file_metadata, hf_hub_download, hf_hub_url
+from huggingface_hub._cache_server import CacheServer, _parse_range, _parse_resolve_path, _RangeNotSatisfiable
+from huggingface_hub.utils import EntryNotFoundError, LocalEntryNotFoundError
+from huggingface_hub.utils.insecure_hashlib import sha256
+
+
+COMMIT_HASH = "a" * 40
+CONFIG_BLOB_ID = "b" * 40
+CONFIG_CONTENT = b'{"hello": "world"}'
+MODEL_CONTENT = b"model weights" * 100
+MODEL_SHA256 = sha256(MODEL_CONTENT).hexdigest()
+UNREACHABLE_ENDPOINT = "http://127.0.0.1:1"
+
+
+def _start_server(cache_dir: Path, endpoint: str) -> CacheServer:
+    server = CacheServer(("127.0.0.1", 0), cache_dir=cache_dir, endpoint=endpoint)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _server_url(server: CacheServer) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+@pytest.mark.usefixtures("fx_cache_dir")
+class TestCacheServer(unittest.TestCase):
+    cache_dir: Path
+
+    def setUp(self) -> None:
+        # Cache of the server: 2 files, Hub is unreachable
+        self.server_cache = self.cache_dir / "server"
+        storage_folder = self.server_cache / "models--user--repo"
+        (storage_folder / "refs").mkdir(parents=True)
+        (storage_folder / "refs" / "main").write_text(COMMIT_HASH)
+        (storage_folder / "blobs").mkdir()
+        (storage_folder / "blobs" / CONFIG_BLOB_ID).write_bytes(CONFIG_CONTENT)
+        (storage_folder / "blobs" / MODEL_SHA256).write_bytes(MODEL_CONTENT)
+        snapshot = storage_folder / "snapshots" / COMMIT_HASH
+        snapshot.mkdir(parents=True)
+        os.symlink(f"../../blobs/{CONFIG_BLOB_ID}", snapshot / "config.json")
+        os.symlink(f"../../blobs/{MODEL_SHA256}", snapshot / "model.bin")
+        (storage_folder / ".no_exist" / COMMIT_HASH).mkdir(parents=True)
+        (storage_folder / ".no_exist" / COMMIT_HASH / "missing.json").touch()
+
+        self.server = _start_server(self.server_cache, UNREACHABLE_ENDPOINT)
+        self.endpoint = _server_url(self.server)
+        self.client_cache = self.cache_dir / "client"
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_download_from_server(self) -> None:
+        for filename, content in (("config.json", CONFIG_CONTENT), ("model.bin", MODEL_CONTENT)):
+            path = hf_hub_download("user/repo", filename, cache_dir=self.client_cache, endpoint=self.endpoint)
+            self.assertEqual(Path(path).read_bytes(), content)
+            self.assertEqual(Path(path).parent.name, COMMIT_HASH)
+
+    def test_metadata(self) -> None:
+        url = hf_hub_url("user/repo", "model.bin", endpoint=self.endpoint)
+        metadata = get_hf_file_metadata(url)
+        self.assertEqual(metadata.commit_hash, COMMIT_HASH)
+        self.assertEqual(metadata.etag, MODEL_SHA256)
+        self.assertEqual(metadata.size, len(MODEL_CONTENT))
+
+    def test_range_requests(self) -> None:
+        url = hf_hub_url("user/repo", "model.bin", revision=COMMIT_HASH, endpoint=self.endpoint)
+
+        response = requests.get(url, headers={"Range": "bytes=2-5"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, MODEL_CONTENT[2:6])
+        self.assertEqual(response.headers["Content-Range"], f"bytes 2-5/{len(MODEL_CONTENT)}")
+
+        response = requests.get(url, headers={"Range": "bytes=-10"})
+        self.assertEqual(response.content, MODEL_CONTENT[-10:])
+
+        response = requests.get(url, headers={"Range": f"bytes={len(MODEL_CONTENT)}-"})
+        self.assertEqual(response.status_code, 416)
+
+    def test_missing_files(self) -> None:
+        # Non-existence is cached
+        with self.assertRaises(EntryNotFoundError):
+            hf_hub_download("user/repo", "missing.json", cache_dir=self.client_cache, endpoint=self.endpoint)
+
+        # Not cached and Hub unreachable
+        url = hf_hub_url("user/repo", "other.json", endpoint=self.endpoint)
+        self.assertEqual(requests.get(url).status_code, 502)
+
+    def test_miss_falls_through_to_upstream(self) -> None:
+        # A server with an empty cache downloads missing files from upstream (here, the first server)
+        other_server = _start_server(self.cache_dir / "other_server", self.endpoint)
+        try:
+            path = hf_hub_download(
+                "user/repo", "model.bin", cache_dir=self.client_cache, endpoint=_server_url(other_server)
+            )
+        finally:
+            other_server.shutdown()
+            other_server.server_close()
+        self.assertEqual(Path(path).read_bytes(), MODEL_CONTENT)
+        self.assertTrue((self.cache_dir / "other_server" / "models--user--repo" / "blobs" / MODEL_SHA256).exists())
+
+    def test_api_requests_are_proxied(self) -> None:
+        mock_session = Mock()
+        mock_session.request.return_value = Mock(
+            status_code=200, content=b'{"id": "user/repo"}', headers={"Content-Type": "application/json"}
+        )
+        with patch("huggingface_hub._cache_server.get_session", return_value=mock_session):
+            for _ in range(2):
+                response = requests.get(f"{self.endpoint}/api/models/user/repo/revision/{COMMIT_HASH}")
+                self.assertEqual(response.json(), {"id": "user/repo"})
+            requests.get(f"{self.endpoint}/api/models/user/repo/revision/main")
+
+        # Repo info at a given commit is cached, not at a branch
+        self.assertEqual(mock_session.request.call_count, 2)
+        self.assertEqual(
+            mock_session.request.call_args_list[0].kwargs["url"],
+            f"{UNREACHABLE_ENDPOINT}/api/models/user/repo/revision/{COMMIT_HASH}",
+        )
+
+    def test_server_token_is_not_used(self) -> None:
+        url = hf_hub_url("user/repo", "other.json", endpoint=self.endpoint)
+        with patch("huggingface_hub._cache_server.hf_hub_download", side_effect=LocalEntryNotFoundError("")) as mock:
+            requests.get(url)
+            requests.get(url, headers={"Authorization": "Bearer hf_client"})
+        self.assertIs(mock.call_args_list[0].kwargs["token"], False)
+        self.assertEqual(mock.call_args_list[1].kwargs["token"], "hf_client")
+
+    def test_unexpected_error(self) -> None:
+        url = hf_hub_url("user/repo", "other.json", endpoint=self.endpoint)
+        with requests.Session() as session:  # same keep-alive connection
+            with patch("huggingface_hub._cache_server.hf_hub_download", side_effect=ValueError("boom")):
+                response = session.get(url)
+            self.assertEqual(response.status_code, 500)
+            self.assertIn("boom", response.text)
+            self.assertEqual(
+                session.get(hf_hub_url("user/repo", "config.json", endpoint=self.endpoint)).content, CONFIG_CONTENT
+            )
+
+
+class TestCacheServerHelpers(unittest.TestCase):
+    def test_parse_resolve_path(self) -> None:
+        self.assertEqual(
+            _parse_resolve_path("/user/repo/resolve/main/folder/file.txt"),
+            ("model", "user/repo", "main", "folder/file.txt"),
+        )
+        self.assertEqual(
+            _parse_resolve_path("/gpt2/resolve/main/config.json"), ("model", "gpt2", "main", "config.json")
+        )
+        self.assertEqual(
+            _parse_resolve_path("/datasets/user/repo/resolve/refs%2Fpr%2F1/data%20file.csv"),
+            ("dataset", "user/repo", "refs/pr/1", "data file.csv"),
+        )
+        self.assertIsNone(_parse_resolve_path("/api/models/user/repo/revision/main"))
+        self.assertIsNone(_parse_resolve_path("/user/repo/resolve/main"))
+
+    def test_parse_range(self) -> None:
+        self.assertIsNone(_parse_range(None, 10))
+        self.assertIsNone(_parse_range("bytes=0-1,3-4", 10))  # multiple ranges => whole file
+        self.assertEqual(_parse_range("bytes=2-", 10), (2, 9))
+        self.assertEqual(_parse_range("bytes=2-100", 10), (2, 9))
+        self.assertEqual(_parse_range("bytes=-3", 10), (7, 9))
+        with self.assertRaises(_RangeNotSatisfiable):
+            _parse_range("bytes=10-", 10)
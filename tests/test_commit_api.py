@@ -1,10 +1,26 @@
+import base64
+import json
+import os
+import threading
 import unittest
+from io import BytesIO
+from pathlib import Path
+from typing import List
+from unittest.mock import patch
+
+import pytest
 
 from huggingface_hub._commit_api import (
     CommitOperationAdd,
     CommitOperationDelete,
+    _payload_as_ndjson,
+    _prepare_commit_payload,
+    _preupload_additions,
     _warn_on_overwriting_operations,
 )
+from huggingface_hub.lfs import UploadInfo
+from huggingface_hub.utils.insecure_hashlib import sha256
+from huggingface_hub.utils.sha import sha_file
 
 
 class TestCommitOperationDelete(unittest.TestCase):
@@ -142,3 +158,125 @@ class TestWarnOnOverwritingOperations(unittest.TestCase):
 
     def test_delete_folder_then_add(self) -> None:
         _warn_on_overwriting_operations([self.delete_folder_a, self.add_file_ab, self.add_file_abc])
+
+
+@pytest.mark.usefixtures("fx_cache_dir")
+class TestCommitOperationAddUploadInfo(unittest.TestCase):
+    cache_dir: Path
+
+    def setUp(self) -> None:
+        self.paths = []
+        for idx in range(3):
+            path = self.cache_dir / f"file_{idx}.bin"
+            path.write_bytes(f"content {idx}".encode() * 100)
+            self.paths.append(path)
+
+    def test_hashing_is_deferred_for_paths(self) -> None:
+        with patch("huggingface_hub.lfs.sha_file", wraps=sha_file) as mock:
+            operation = CommitOperationAdd(path_in_repo="file.bin", path_or_fileobj=self.paths[0])
+            mock.assert_not_called()
+
+            upload_info = operation.upload_info
+            self.assertEqual(upload_info.sha256, sha256(self.paths[0].read_bytes()).digest())
+            self.assertEqual(upload_info.size, 900)
+            self.assertEqual(upload_info.sample, self.paths[0].read_bytes()[:512])
+            self.assertIs(operation.upload_info, upload_info)  # computed once
+            mock.assert_called_once()
+
+
+@pytest.mark.usefixtures("fx_cache_dir")
+class TestPreuploadPipeline(unittest.TestCase):
+    cache_dir: Path
+
+    def setUp(self) -> None:
+        self.operations = []
+        for name in ("model.bin", "ignored.bin", "config.json", "last.bin"):
+            path = self.cache_dir / name
+            path.write_bytes(name.encode() * 100)
+            self.operations.append(CommitOperationAdd(path_in_repo=name, path_or_fileobj=path))
+        self.uploaded: List[str] = []
+        self.first_upload = threading.Event()
+
+        def _fetch_upload_modes(additions, **kwargs) -> None:
+            for addition in additions:
+                addition._upload_mode = "regular" if addition.path_in_repo.endswith(".json") else "lfs"
+                addition._should_ignore = addition.path_in_repo == "ignored.bin"
+
+        def _post_lfs_batch_info(upload_infos, **kwargs):
+            return [{"oid": info.sha256.hex(), "actions": {"upload": {}}} for info in upload_infos], []
+
+        def _lfs_upload(operation, **kwargs) -> None:
+            self.uploaded.append(operation.path_in_repo)
+            self.first_upload.set()
+
+        for name, side_effect in [
+            ("_fetch_upload_modes", _fetch_upload_modes),
+            ("post_lfs_batch_info", _post_lfs_batch_info),
+            ("lfs_upload", _lfs_upload),
+        ]:
+            patch(f"huggingface_hub._commit_api.{name}", side_effect=side_effect).start()
+        patch("huggingface_hub._commit_api._PIPELINE_FLUSH_INTERVAL", 0.01).start()
+        self.addCleanup(patch.stopall)
+
+    def _preupload(self) -> List[CommitOperationAdd]:
+        return _preupload_additions(
+            additions=self.operations, repo_type="model", repo_id="user/repo", headers={}, revision="main"
+        )
+
+    def test_preupload_additions(self) -> None:
+        lfs_additions = self._preupload()
+        self.assertEqual({addition.path_in_repo for addition in lfs_additions}, {"model.bin", "last.bin"})
+        self.assertEqual(sorted(self.uploaded), ["last.bin", "model.bin"])
+        for operation in self.operations:
+            self.assertEqual(
+                operation.upload_info.sha256, sha256(Path(operation.path_or_fileobj).read_bytes()).digest()
+            )
+
+    def test_upload_starts_before_all_files_are_hashed(self) -> None:
+        def _hash_file(path: str):
+            if path.endswith("last.bin"):
+                # Last file is hashed only once the first file has started to upload
+                self.assertTrue(self.first_upload.wait(timeout=10))
+            return os.stat(path), UploadInfo.from_path(path)
+
+        with patch("huggingface_hub._commit_api._hash_file", side_effect=_hash_file):
+            self._preupload()
+        self.assertEqual(self.uploaded[-1], "last.bin")
+
+    def test_upload_error(self) -> None:
+        with patch("huggingface_hub._commit_api.lfs_upload", side_effect=ValueError("boom")):
+            with self.assertRaises(RuntimeError) as context:
+                self._preupload()
+        self.assertIsInstance(context.exception.__cause__, ValueError)
+
+
+class TestStreamedCommitPayload(unittest.TestCase):
+    def setUp(self) -> None:
+        self.operations = [
+            CommitOperationAdd(path_in_repo="file.txt", path_or_fileobj=b"content" * 1000),
+            CommitOperationAdd(path_in_repo='folder/"quoted".txt', path_or_fileobj=BytesIO(b"12345")),
+            CommitOperationAdd(path_in_repo="empty.txt", path_or_fileobj=b""),
+            CommitOperationDelete(path_in_repo="old.txt"),
+        ]
+        for operation in self.operations[:3]:
+            operation._upload_mode = "regular"
+
+    def _ndjson(self, lazy_content: bool) -> bytes:
+        payload = _prepare_commit_payload(
+            self.operations, files_to_copy={}, commit_message="Commit", lazy_content=lazy_content
+        )
+        return b"".join(_payload_as_ndjson(payload))
+
+    def test_lazy_content_same_payload(self) -> None:
+        ndjson = self._ndjson(lazy_content=False)
+        self.assertEqual(self._ndjson(lazy_content=True), ndjson)
+
+        lines = [json.loads(line) for line in ndjson.splitlines()]
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(lines[2]["value"]["path"], 'folder/"quoted".txt')
+        self.assertEqual(base64.b64decode(lines[2]["value"]["content"]), b"12345")
+
+    def test_iter_b64content(self) -> None:
+        operation = CommitOperationAdd(path_in_repo="file.txt", path_or_fileobj=BytesIO(bytes(range(256)) * 10))
+        for chunk_size in (1, 2, 3, 100, 10_000):
+            self.assertEqual(b"".join(operation._iter_b64content(chunk_size=chunk_size)), operation.b64content())
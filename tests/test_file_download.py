@@ -11,13 +11,17 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import errno
 import io
+import json
 import os
 import re
 import shutil
 import stat
+import time
 import unittest
 import warnings
+from collections import OrderedDict
 from contextlib import contextmanager
 from pathlib import Path
 from typing import Iterable
@@ -39,10 +43,21 @@ from huggingface_hub.constants import (
 from huggingface_hub.file_download import (
     _CACHED_NO_EXIST,
     HfFileMetadata,
+    _cache_commit_hash_for_specific_revision,
     _check_disk_space,
+    _check_snapshot_disk_space,
     _create_symlink,
+    _download_to_tmp_and_move,
+    _get_fresh_commit_hash,
     _get_pointer_path,
+    _get_shared_blob_path,
+    _hf_hub_download_blob_to_cache_dir,
+    _http_get_ranges,
+    _list_cached_folder,
+    _load_fallocate,
     _normalize_etag,
+    _preallocate,
+    _RangeRequestsNotSupported,
     _request_wrapper,
     cached_download,
     filename_to_url,
@@ -50,7 +65,9 @@ from huggingface_hub.file_download import (
     hf_hub_download,
     hf_hub_url,
     http_get,
+    open_cached,
     try_to_load_from_cache,
+    try_to_load_many_from_cache,
 )
 from huggingface_hub.utils import (
     EntryNotFoundError,
@@ -62,6 +79,7 @@ from huggingface_hub.utils import (
     get_session,
     hf_raise_for_status,
 )
+from huggingface_hub.utils.insecure_hashlib import sha256
 
 from .testing_constants import ENDPOINT_STAGING, OTHER_TOKEN, TOKEN
 from .testing_utils import (
@@ -135,6 +153,35 @@ class TestDiskUsageWarning(unittest.TestCase):
             _check_disk_space(expected_size=self.expected_size, target_dir="/path/to/not_existent_path")
             assert len(w) == 0
 
+    @patch("huggingface_hub.file_download.shutil.disk_usage")
+    def test_snapshot_disk_space_error(self, disk_usage_mock: Mock) -> None:
+        disk_usage_mock.return_value.free = 1024 * 1024
+        with self.assertRaises(OSError) as cm:
+            _check_snapshot_disk_space(expected_size=self.expected_size, target_dir="path/to/not_existent_path")
+        self.assertEqual(cm.exception.errno, errno.ENOSPC)
+
+        disk_usage_mock.return_value.free = 200 * 1024 * 1024
+        _check_snapshot_disk_space(expected_size=self.expected_size, target_dir="path/to/not_existent_path")
+
+
+@unittest.skipIf(_load_fallocate() is None, "fallocate is only available on Linux")
+class TestPreallocate(unittest.TestCase):
+    def test_preallocate(self) -> None:
+        with SoftTemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "file.incomplete"
+            with path.open("ab") as f:
+                if not _preallocate(f.fileno(), 1024 * 1024, keep_size=True):
+                    self.skipTest("Preallocation is not supported by the filesystem")
+                self.assertEqual(path.stat().st_size, 0)  # size unchanged => download progress still readable
+                self.assertGreaterEqual(path.stat().st_blocks * 512, 1024 * 1024)  # but disk space reserved
+                f.write(b"content")
+            self.assertEqual(path.read_bytes(), b"content")
+
+            with path.open("r+b") as f:
+                self.assertTrue(_preallocate(f.fileno(), 1024 * 1024))
+            self.assertEqual(path.stat().st_size, 1024 * 1024)
+            self.assertEqual(path.read_bytes()[:7], b"content")
+
 
 class StagingDownloadTests(unittest.TestCase):
     _api = HfApi(endpoint=ENDPOINT_STAGING, token=TOKEN)
@@ -1148,6 +1195,556 @@ class TestHttpGet(unittest.TestCase):
         self.assertEqual(mock.call_args_list[3].kwargs["headers"], {"Range": "bytes=60-"})
 
 
+def _fake_range_response(content: bytes, headers: dict) -> Mock:
+    """Build a fake streamed response honoring the `Range` header, if any."""
+    response = Mock()
+    match = re.match(r"bytes=(\d+)-(\d*)", headers.get("Range", ""))
+    if match is None:
+        response.status_code = 200
+        body = content
+    else:
+        response.status_code = 206
+        start = int(match.group(1))
+        end = int(match.group(2)) + 1 if match.group(2) else len(content)
+        body = content[start:end]
+    response.headers = {"Content-Length": str(len(body))}
+    response.iter_content.side_effect = lambda chunk_size: (
+        body[i : i + chunk_size] for i in range(0, len(body), chunk_size)
+    )
+    return response
+
+
+@patch("huggingface_hub.file_download.DOWNLOAD_RANGE_SIZE", 10)
+@patch("huggingface_hub.file_download.DOWNLOAD_CHUNK_SIZE", 4)
+class TestHttpGetRanges(unittest.TestCase):
+    content = bytes(range(95))
+
+    def setUp(self) -> None:
+        self.tmpdir = SoftTemporaryDirectory()
+        self.incomplete_path = Path(self.tmpdir.__enter__()) / "file.incomplete"
+        self.state_path = self.incomplete_path.with_name("file.incomplete.ranges")
+
+    def tearDown(self) -> None:
+        self.tmpdir.__exit__(None, None, None)
+
+    def _mock_request_wrapper(self, mock: Mock) -> None:
+        mock.side_effect = lambda **kwargs: _fake_range_response(self.content, kwargs["headers"])
+
+    def _requested_ranges(self, mock: Mock) -> list:
+        return sorted(call.kwargs["headers"]["Range"] for call in mock.call_args_list)
+
+    @patch("huggingface_hub.file_download._request_wrapper")
+    def test_download_with_ranges(self, mock: Mock) -> None:
+        self._mock_request_wrapper(mock)
+        _http_get_ranges("fake_url", self.incomplete_path, expected_size=95, max_connections=4)
+
+        self.assertEqual(self.incomplete_path.read_bytes(), self.content)
+        self.assertFalse(self.state_path.exists())  # state is removed on success
+
+        # 10 ranges requested, last one is shorter
+        self.assertEqual(len(mock.call_args_list), 10)
+        self.assertIn("bytes=90-94", self._requested_ranges(mock))
+        for call in mock.call_args_list:
+            self.assertEqual(call.kwargs["headers"]["Accept-Encoding"], "identity")
+
+    @patch("huggingface_hub.file_download._request_wrapper")
+    def test_resume_from_ranges_state(self, mock: Mock) -> None:
+        # Ranges 0 and 3 already downloaded
+        self.incomplete_path.write_bytes(self.content[:10] + b"\0" * 20 + self.content[30:40] + b"\0" * 55)
+        self.state_path.write_text(json.dumps({"size": 95, "range_size": 10, "done": [0, 3]}))
+
+        self._mock_request_wrapper(mock)
+        _http_get_ranges("fake_url", self.incomplete_path, expected_size=95, max_connections=4)
+
+        self.assertEqual(self.incomplete_path.read_bytes(), self.content)
+        self.assertEqual(len(mock.call_args_list), 8)
+        self.assertNotIn("bytes=0-9", self._requested_ranges(mock))
+        self.assertNotIn("bytes=30-39", self._requested_ranges(mock))
+
+    @patch("huggingface_hub.file_download._request_wrapper")
+    def test_resume_from_sequential_download(self, mock: Mock) -> None:
+        # Incomplete file without state => full ranges are kept
+        self.incomplete_path.write_bytes(self.content[:25])
+
+        self._mock_request_wrapper(mock)
+        _http_get_ranges("fake_url", self.incomplete_path, expected_size=95, max_connections=4)
+
+        self.assertEqual(self.incomplete_path.read_bytes(), self.content)
+        self.assertEqual(len(mock.call_args_list), 8)  # ranges 0 and 1 are not re-downloaded
+        self.assertIn("bytes=20-29", self._requested_ranges(mock))
+
+    @patch("huggingface_hub.file_download._request_wrapper")
+    def test_outdated_state_is_ignored(self, mock: Mock) -> None:
+        # State saved with another range size => incomplete file cannot be trusted
+        self.incomplete_path.write_bytes(b"\0" * 95)
+        self.state_path.write_text(json.dumps({"size": 95, "range_size": 50, "done": [0]}))
+
+        self._mock_request_wrapper(mock)
+        _http_get_ranges("fake_url", self.incomplete_path, expected_size=95, max_connections=4)
+
+        self.assertEqual(self.incomplete_path.read_bytes(), self.content)
+        self.assertEqual(len(mock.call_args_list), 10)  # everything is re-downloaded
+
+    @patch("huggingface_hub.file_download.time.sleep")
+    @patch("huggingface_hub.file_download._request_wrapper")
+    def test_retry_range_on_connection_error(self, mock: Mock, mock_sleep: Mock) -> None:
+        def _iter_content_with_error(chunk_size: int) -> Iterable[bytes]:
+            yield self.content[10:14]
+            raise requests.ConnectionError("Fake ConnectionError")
+
+        def _side_effect(**kwargs) -> Mock:
+            response = _fake_range_response(self.content, kwargs["headers"])
+            if kwargs["headers"]["Range"] == "bytes=10-19":
+                response.iter_content.side_effect = _iter_content_with_error
+            return response
+
+        mock.side_effect = _side_effect
+        with self.assertLogs("huggingface_hub.file_download", level="WARNING") as records:
+            _http_get_ranges("fake_url", self.incomplete_path, expected_size=95, max_connections=1)
+
+        self.assertEqual(len(records.records), 1)
+        self.assertEqual(self.incomplete_path.read_bytes(), self.content)
+        # Range is resumed where it failed
+        self.assertIn("bytes=14-19", self._requested_ranges(mock))
+
+    @patch("huggingface_hub.file_download._request_wrapper")
+    def test_range_requests_not_supported(self, mock: Mock) -> None:
+        mock.side_effect = lambda **kwargs: _fake_range_response(self.content, {})  # ignores Range => 200
+        with self.assertRaises(_RangeRequestsNotSupported):
+            _http_get_ranges("fake_url", self.incomplete_path, expected_size=95, max_connections=4)
+
+    @patch("huggingface_hub.file_download.HF_HUB_DOWNLOAD_CONNECTIONS", 4)
+    @patch("huggingface_hub.file_download._request_wrapper")
+    def test_download_to_tmp_and_move_falls_back_to_single_stream(self, mock: Mock) -> None:
+        mock.side_effect = lambda **kwargs: _fake_range_response(self.content, {})  # ignores Range => 200
+        destination_path = self.incomplete_path.with_name("file")
+
+        _download_to_tmp_and_move(
+            incomplete_path=self.incomplete_path,
+            destination_path=destination_path,
+            url_to_download="fake_url",
+            proxies=None,
+            headers={},
+            expected_size=95,
+            filename="file",
+            force_download=False,
+        )
+
+        self.assertEqual(destination_path.read_bytes(), self.content)
+        self.assertFalse(self.incomplete_path.exists())
+        self.assertFalse(self.state_path.exists())
+
+    @patch("huggingface_hub.file_download._request_wrapper")
+    def test_sha256_computed_on_resumed_ranges(self, mock: Mock) -> None:
+        # Ranges completed out of order + resumed ranges are all hashed
+        self.incomplete_path.write_bytes(b"\0" * 30 + self.content[30:40] + b"\0" * 55)
+        self.state_path.write_text(json.dumps({"size": 95, "range_size": 10, "done": [3]}))
+
+        self._mock_request_wrapper(mock)
+        sha = sha256()
+        _http_get_ranges("fake_url", self.incomplete_path, expected_size=95, max_connections=4, _sha256=sha)
+
+        self.assertEqual(sha.hexdigest(), sha256(self.content).hexdigest())
+
+
+class TestDownloadSha256Check(unittest.TestCase):
+    content = b"some LFS content"
+
+    def setUp(self) -> None:
+        tmpdir = SoftTemporaryDirectory()
+        self.incomplete_path = Path(tmpdir.__enter__()) / "blob.incomplete"
+        self.addCleanup(tmpdir.__exit__, None, None, None)
+        self.destination_path = self.incomplete_path.with_name("blob")
+
+    def _download(self, etag: str) -> None:
+        _download_to_tmp_and_move(
+            incomplete_path=self.incomplete_path,
+            destination_path=self.destination_path,
+            url_to_download="fake_url",
+            proxies=None,
+            headers={},
+            expected_size=len(self.content),
+            filename="blob",
+            force_download=False,
+            etag=etag,
+        )
+
+    @patch("huggingface_hub.file_download._request_wrapper")
+    def test_sha256_match(self, mock: Mock) -> None:
+        mock.side_effect = lambda **kwargs: _fake_range_response(self.content, kwargs["headers"])
+        self._download(etag=sha256(self.content).hexdigest())
+        self.assertEqual(self.destination_path.read_bytes(), self.content)
+
+    @patch("huggingface_hub.file_download._request_wrapper")
+    def test_sha256_match_on_resumed_download(self, mock: Mock) -> None:
+        self.incomplete_path.write_bytes(self.content[:5])
+        mock.side_effect = lambda **kwargs: _fake_range_response(self.content, kwargs["headers"])
+        self._download(etag=sha256(self.content).hexdigest())
+
+        self.assertEqual(self.destination_path.read_bytes(), self.content)
+        self.assertEqual(mock.call_args.kwargs["headers"]["Range"], "bytes=5-")
+
+    @patch("huggingface_hub.file_download._request_wrapper")
+    def test_sha256_mismatch(self, mock: Mock) -> None:
+        corrupted = b"some LFS c0ntent"
+        mock.side_effect = lambda **kwargs: _fake_range_response(corrupted, kwargs["headers"])
+        with self.assertRaisesRegex(EnvironmentError, "Consistency check failed"):
+            self._download(etag=sha256(self.content).hexdigest())
+
+        # Corrupted file is neither moved to the cache nor kept for a resume
+        self.assertFalse(self.destination_path.exists())
+        self.assertFalse(self.incomplete_path.exists())
+
+    @patch("huggingface_hub.file_download._request_wrapper")
+    def test_no_check_if_etag_is_not_a_sha256(self, mock: Mock) -> None:
+        # Regular files are identified by their git blob id
+        mock.side_effect = lambda **kwargs: _fake_range_response(self.content, kwargs["headers"])
+        self._download(etag="a" * 40)
+        self.assertEqual(self.destination_path.read_bytes(), self.content)
+
+    @patch("huggingface_hub.file_download.HF_HUB_DOWNLOAD_CONNECTIONS", 4)
+    @patch("huggingface_hub.file_download.DOWNLOAD_RANGE_SIZE", 4)
+    @patch("huggingface_hub.file_download._request_wrapper")
+    def test_sha256_mismatch_with_ranges(self, mock: Mock) -> None:
+        corrupted = b"some LFS c0ntent"
+        mock.side_effect = lambda **kwargs: _fake_range_response(corrupted, kwargs["headers"])
+        with self.assertRaisesRegex(EnvironmentError, "Consistency check failed"):
+            self._download(etag=sha256(self.content).hexdigest())
+
+        self.assertEqual(mock.call_count, 4)  # downloaded with range requests
+        self.assertFalse(self.destination_path.exists())
+        self.assertFalse(self.incomplete_path.exists())
+
+
+@pytest.mark.usefixtures("fx_cache_dir")
+@patch("huggingface_hub.file_download.HF_HUB_ENABLE_SHARED_BLOBS", True)
+class TestSharedBlobStore(unittest.TestCase):
+    cache_dir: Path
+    content = b"shared tokenizer"
+    etag = sha256(content).hexdigest()
+
+    def _download(self, repo_id: str, commit_hash: str) -> str:
+        return _hf_hub_download_blob_to_cache_dir(
+            cache_dir=str(self.cache_dir),
+            repo_id=repo_id,
+            repo_type="model",
+            filename="tokenizer.json",
+            revision=commit_hash,
+            commit_hash=commit_hash,
+            etag=self.etag,
+            url_to_download="fake_url",
+            expected_size=len(self.content),
+            headers={},
+            proxies=None,
+            force_download=False,
+        )
+
+    @patch("huggingface_hub.file_download._request_wrapper")
+    def test_blob_downloaded_once_across_repos(self, mock: Mock) -> None:
+        mock.side_effect = lambda **kwargs: _fake_range_response(self.content, kwargs["headers"])
+        path_a = self._download("user/repo_a", "a" * 40)
+        path_b = self._download("user/repo_b", "b" * 40)
+
+        self.assertEqual(mock.call_count, 1)  # downloaded only once
+        self.assertEqual(Path(path_a).read_bytes(), self.content)
+        self.assertEqual(Path(path_b).read_bytes(), self.content)
+
+        # Blob in each repo is a hardlink to the shared blob store
+        shared_blob = self.cache_dir / "blobs" / self.etag
+        blob_a = self.cache_dir / "models--user--repo_a" / "blobs" / self.etag
+        blob_b = self.cache_dir / "models--user--repo_b" / "blobs" / self.etag
+        self.assertTrue(shared_blob.samefile(blob_a))
+        self.assertTrue(shared_blob.samefile(blob_b))
+        self.assertEqual(shared_blob.stat().st_nlink, 3)
+
+    @patch("huggingface_hub.file_download._request_wrapper")
+    def test_shared_blobs_disabled(self, mock: Mock) -> None:
+        mock.side_effect = lambda **kwargs: _fake_range_response(self.content, kwargs["headers"])
+        with patch("huggingface_hub.file_download.HF_HUB_ENABLE_SHARED_BLOBS", False):
+            self._download("user/repo_a", "a" * 40)
+            self._download("user/repo_b", "b" * 40)
+
+        self.assertEqual(mock.call_count, 2)
+        self.assertFalse((self.cache_dir / "blobs").exists())
+
+    def test_non_content_addressed_etag_is_not_shared(self) -> None:
+        self.assertIsNone(_get_shared_blob_path(str(self.cache_dir), "not-a-hash"))
+        self.assertIsNotNone(_get_shared_blob_path(str(self.cache_dir), "a" * 40))
+
+
+@pytest.mark.usefixtures("fx_cache_dir")
+class TestCacheTiers(unittest.TestCase):
+    cache_dir: Path
+    content = b"model weights"
+    etag = sha256(content).hexdigest()
+    commit_hash = "a" * 40
+
+    def setUp(self) -> None:
+        self.fast_tier = self.cache_dir / "fast"
+        self.shared_tier = self.cache_dir / "shared"
+        tiers = [(str(self.fast_tier), None), (str(self.shared_tier), None)]
+        patcher = patch("huggingface_hub.file_download.HF_HUB_CACHE_TIERS", tiers)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _download(self) -> str:
+        return _hf_hub_download_blob_to_cache_dir(
+            cache_dir=str(self.fast_tier),
+            repo_id="user/repo",
+            repo_type="model",
+            filename="model.bin",
+            revision="main",
+            commit_hash=self.commit_hash,
+            etag=self.etag,
+            url_to_download="fake_url",
+            expected_size=len(self.content),
+            headers={},
+            proxies=None,
+            force_download=False,
+        )
+
+    def _blob_path(self, tier: Path) -> Path:
+        return tier / "models--user--repo" / "blobs" / self.etag
+
+    @patch("huggingface_hub.file_download._request_wrapper")
+    def test_new_download_is_written_to_both_tiers(self, mock: Mock) -> None:
+        mock.side_effect = lambda **kwargs: _fake_range_response(self.content, kwargs["headers"])
+        path = self._download()
+
+        self.assertEqual(mock.call_count, 1)
+        self.assertTrue(path.startswith(str(self.fast_tier)))
+        self.assertEqual(Path(path).read_bytes(), self.content)
+
+        # Shared tier is a valid cache as well => can be used by other machines (even offline)
+        self.assertEqual(self._blob_path(self.shared_tier).read_bytes(), self.content)
+        self.assertFalse(self._blob_path(self.shared_tier).samefile(self._blob_path(self.fast_tier)))
+        shared_path = try_to_load_from_cache("user/repo", "model.bin", cache_dir=self.shared_tier)
+        self.assertEqual(Path(shared_path).read_bytes(), self.content)
+
+    @patch("huggingface_hub.file_download._request_wrapper")
+    def test_blob_from_shared_tier_is_copied_to_fast_tier(self, mock: Mock) -> None:
+        self._blob_path(self.shared_tier).parent.mkdir(parents=True)
+        self._blob_path(self.shared_tier).write_bytes(self.content)
+
+        path = self._download()
+
+        mock.assert_not_called()
+        self.assertEqual(Path(path).read_bytes(), self.content)
+        self.assertEqual(self._blob_path(self.fast_tier).read_bytes(), self.content)
+
+    def test_offline_hit_in_shared_tier_is_promoted_to_fast_tier(self) -> None:
+        shared_repo = self.shared_tier / "models--user--repo"
+        self._blob_path(self.shared_tier).parent.mkdir(parents=True)
+        self._blob_path(self.shared_tier).write_bytes(self.content)
+        (shared_repo / "snapshots" / self.commit_hash).mkdir(parents=True)
+        (shared_repo / "snapshots" / self.commit_hash / "model.bin").symlink_to(self._blob_path(self.shared_tier))
+        (shared_repo / "refs").mkdir()
+        (shared_repo / "refs" / "main").write_text(self.commit_hash)
+
+        path = hf_hub_download("user/repo", "model.bin", cache_dir=self.fast_tier, local_files_only=True)
+
+        fast_repo = self.fast_tier / "models--user--repo"
+        self.assertEqual(Path(path), fast_repo / "snapshots" / self.commit_hash / "model.bin")
+        self.assertEqual(Path(path).read_bytes(), self.content)
+        self.assertFalse(self._blob_path(self.fast_tier).samefile(self._blob_path(self.shared_tier)))
+        self.assertEqual((fast_repo / "refs" / "main").read_text(), self.commit_hash)
+
+    def test_try_to_load_from_cache_looks_into_all_tiers(self) -> None:
+        snapshot = self.shared_tier / "models--user--repo" / "snapshots" / self.commit_hash
+        snapshot.mkdir(parents=True)
+        (snapshot / "model.bin").write_bytes(self.content)
+        (self.shared_tier / "models--user--repo" / "refs").mkdir()
+        (self.shared_tier / "models--user--repo" / "refs" / "main").write_text(self.commit_hash)
+
+        expected = str(snapshot / "model.bin")
+        self.assertEqual(try_to_load_from_cache("user/repo", "model.bin", cache_dir=self.fast_tier), expected)
+        self.assertEqual(
+            try_to_load_many_from_cache("user/repo", ["model.bin", "other.bin"], cache_dir=self.fast_tier),
+            {"model.bin": expected, "other.bin": None},
+        )
+
+        # Lower tiers are only used when looking into the first tier
+        self.assertIsNone(try_to_load_from_cache("user/repo", "model.bin", cache_dir=self.cache_dir / "other"))
+
+
+@pytest.mark.usefixtures("fx_cache_dir")
+@patch("huggingface_hub.file_download.HF_HUB_REVISION_CACHE_TTL", 60)
+class TestRevisionCacheTTL(unittest.TestCase):
+    cache_dir: Path
+    commit_hash = "a" * 40
+
+    def setUp(self) -> None:
+        huggingface_hub.file_download._RESOLVED_REVISIONS.clear()
+        self.storage_folder = self.cache_dir / "models--user--repo"
+        self.ref_path = self.storage_folder / "refs" / "main"
+        self.ref_path.parent.mkdir(parents=True)
+        self.ref_path.write_text(self.commit_hash)
+        self.pointer_path = self.storage_folder / "snapshots" / self.commit_hash / "config.json"
+        self.pointer_path.parent.mkdir(parents=True)
+        self.pointer_path.write_text("{}")
+
+    def _download(self, filename: str = "config.json") -> str:
+        return hf_hub_download("user/repo", filename, cache_dir=self.cache_dir)
+
+    @patch("huggingface_hub.file_download._get_metadata_or_catch_error")
+    def test_fresh_ref_skips_head_call(self, mock: Mock) -> None:
+        self.assertEqual(self._download(), str(self.pointer_path))
+        mock.assert_not_called()
+
+    @patch("huggingface_hub.file_download._get_metadata_or_catch_error")
+    def test_expired_ref_triggers_head_call(self, mock: Mock) -> None:
+        mock.return_value = (None, None, None, None, requests.ConnectionError("offline"))
+        os.utime(self.ref_path, (0, 0))  # resolved a long time ago
+        self.assertEqual(self._download(), str(self.pointer_path))  # fallback to cache
+        mock.assert_called_once()
+
+    @patch("huggingface_hub.file_download._get_metadata_or_catch_error")
+    def test_ttl_disabled(self, mock: Mock) -> None:
+        mock.return_value = (None, None, None, None, requests.ConnectionError("offline"))
+        with patch("huggingface_hub.file_download.HF_HUB_REVISION_CACHE_TTL", 0):
+            self._download()
+        mock.assert_called_once()
+
+    @patch("huggingface_hub.file_download._get_metadata_or_catch_error")
+    def test_fresh_ref_cached_no_exist(self, mock: Mock) -> None:
+        no_exist_path = self.storage_folder / ".no_exist" / self.commit_hash / "missing.json"
+        no_exist_path.parent.mkdir(parents=True)
+        no_exist_path.touch()
+        with self.assertRaises(EntryNotFoundError):
+            self._download("missing.json")
+        mock.assert_not_called()
+
+    def test_resolution_is_recorded_in_memory(self) -> None:
+        os.utime(self.ref_path, (0, 0))
+        self.assertIsNone(_get_fresh_commit_hash(str(self.storage_folder), "main"))
+
+        # Ref confirmed by the server => fresh again (in memory and on disk)
+        _cache_commit_hash_for_specific_revision(str(self.storage_folder), "main", self.commit_hash)
+        self.assertEqual(_get_fresh_commit_hash(str(self.storage_folder), "main"), self.commit_hash)
+        self.assertGreater(self.ref_path.stat().st_mtime, 0)
+
+        # Other process resolving the same revision => read from disk
+        huggingface_hub.file_download._RESOLVED_REVISIONS.clear()
+        self.assertEqual(_get_fresh_commit_hash(str(self.storage_folder), "main"), self.commit_hash)
+
+
+@pytest.mark.usefixtures("fx_cache_dir")
+class TestOpenCached(unittest.TestCase):
+    cache_dir: Path
+    commit_hash = "a" * 40
+
+    def setUp(self) -> None:
+        self.storage_folder = self.cache_dir / "models--user--repo"
+        (self.storage_folder / "refs").mkdir(parents=True)
+        (self.storage_folder / "refs" / "main").write_text(self.commit_hash)
+        self.snapshot = self.storage_folder / "snapshots" / self.commit_hash
+        self.snapshot.mkdir(parents=True)
+        (self.snapshot / "model.bin").write_bytes(b"0123456789")
+
+    def test_open_cached(self) -> None:
+        with open_cached("user/repo", "model.bin", cache_dir=self.cache_dir) as mapping:
+            self.assertEqual(len(mapping), 10)
+            self.assertEqual(mapping[2:5], b"234")
+            with memoryview(mapping) as view:
+                self.assertTrue(view.readonly)
+                self.assertEqual(view[5:].tobytes(), b"56789")
+        self.assertTrue(mapping.closed)
+
+    def test_open_cached_with_advice(self) -> None:
+        for advice in ("sequential", "willneed"):
+            with open_cached(
+                "user/repo", "model.bin", revision=self.commit_hash, cache_dir=self.cache_dir, advice=advice
+            ) as mapping:
+                self.assertEqual(mapping[:], b"0123456789")
+
+        with self.assertRaises(ValueError):
+            open_cached("user/repo", "model.bin", cache_dir=self.cache_dir, advice="dontneed")
+
+    def test_open_cached_not_cached(self) -> None:
+        with self.assertRaises(LocalEntryNotFoundError):
+            open_cached("user/repo", "missing.bin", cache_dir=self.cache_dir)
+        with self.assertRaises(LocalEntryNotFoundError):
+            open_cached("user/other", "model.bin", cache_dir=self.cache_dir)
+
+        no_exist_path = self.storage_folder / ".no_exist" / self.commit_hash / "missing.bin"
+        no_exist_path.parent.mkdir(parents=True)
+        no_exist_path.touch()
+        with self.assertRaises(EntryNotFoundError):
+            open_cached("user/repo", "missing.bin", cache_dir=self.cache_dir)
+
+
+@pytest.mark.usefixtures("fx_cache_dir")
+class TestTryToLoadManyFromCache(unittest.TestCase):
+    cache_dir: Path
+    commit_hash = "a" * 40
+
+    def setUp(self) -> None:
+        self.storage_folder = self.cache_dir / "models--user--repo"
+        (self.storage_folder / "refs").mkdir(parents=True)
+        (self.storage_folder / "refs" / "main").write_text(self.commit_hash)
+        self.snapshot = self.storage_folder / "snapshots" / self.commit_hash
+        (self.snapshot / "subfolder").mkdir(parents=True)
+        (self.snapshot / "config.json").touch()
+        (self.snapshot / "subfolder" / "model.bin").touch()
+        (self.storage_folder / ".no_exist" / self.commit_hash).mkdir(parents=True)
+        (self.storage_folder / ".no_exist" / self.commit_hash / "missing.json").touch()
+
+    def _load_many(self, **kwargs) -> dict:
+        filenames = ["config.json", "subfolder/model.bin", "missing.json", "unknown.json"]
+        return try_to_load_many_from_cache("user/repo", filenames, cache_dir=self.cache_dir, **kwargs)
+
+    def test_same_results_as_try_to_load_from_cache(self) -> None:
+        for revision in (None, "main", self.commit_hash, "other"):
+            results = self._load_many(revision=revision)
+            for filename, result in results.items():
+                expected = try_to_load_from_cache("user/repo", filename, cache_dir=self.cache_dir, revision=revision)
+                self.assertEqual(result, expected)
+
+        results = self._load_many()
+        self.assertEqual(results["config.json"], str(self.snapshot / "config.json"))
+        self.assertEqual(results["subfolder/model.bin"], os.path.join(self.snapshot, "subfolder/model.bin"))
+        self.assertIs(results["missing.json"], _CACHED_NO_EXIST)
+        self.assertIsNone(results["unknown.json"])
+
+    def test_repo_not_cached(self) -> None:
+        results = try_to_load_many_from_cache("user/other", ["config.json"], cache_dir=self.cache_dir)
+        self.assertEqual(results, {"config.json": None})
+
+    def test_listing_is_reused_until_folder_is_modified(self) -> None:
+        # Folders modified "a while ago" => listings are kept in memory
+        past = time.time() - 10
+        for path in (self.snapshot, self.snapshot / "subfolder", self.storage_folder / ".no_exist" / self.commit_hash):
+            os.utime(path, (past, past))
+        self._load_many()
+
+        with patch("huggingface_hub.file_download.os.scandir") as mock_scandir:
+            self.assertIsInstance(self._load_many()["config.json"], str)
+        mock_scandir.assert_not_called()
+
+        # File added in a subfolder => listing is refreshed
+        (self.snapshot / "subfolder" / "unknown.json").touch()
+        results = try_to_load_many_from_cache("user/repo", ["subfolder/unknown.json"], cache_dir=self.cache_dir)
+        self.assertIsInstance(results["subfolder/unknown.json"], str)
+
+    def test_listings_kept_in_memory_are_bounded(self) -> None:
+        folders = []
+        for idx in range(3):
+            folder = self.cache_dir / f"folder_{idx}"
+            folder.mkdir()
+            past = time.time() - 10
+            os.utime(folder, (past, past))
+            folders.append(str(folder))
+
+        with patch("huggingface_hub.file_download._CACHED_FOLDER_LISTINGS_MAX_SIZE", 2), patch(
+            "huggingface_hub.file_download._CACHED_FOLDER_LISTINGS", OrderedDict()
+        ) as listings:
+            _list_cached_folder(folders[0])
+            _list_cached_folder(folders[1])
+            _list_cached_folder(folders[0])  # most recently used
+            _list_cached_folder(folders[2])
+            self.assertEqual(list(listings), [folders[0], folders[2]])
+
+
 class CreateSymlinkTest(unittest.TestCase):
     @unittest.skipIf(os.name == "nt", "No symlinks on Windows")
     @patch("huggingface_hub.file_download.are_symlinks_supported")
@@ -2309,8 +2309,8 @@ class HfLargefilesTest(HfApiCommonTest):
 
         with patch.object(
             huggingface_hub.lfs,
-            "_upload_parts_iteratively",
-            wraps=huggingface_hub.lfs._upload_parts_iteratively,
+            "_upload_parts_concurrently",
+            wraps=huggingface_hub.lfs._upload_parts_concurrently,
         ) as mock:
             self._api.upload_file(repo_id=self.repo_id, path_or_fileobj=b"0" * 18 * 10**6, path_in_repo="lfs.bin")
             mock.assert_called_once()  # It used multipart upload
@@ -0,0 +1,113 @@
+import pickle
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from huggingface_hub import HfApi, LazySnapshot
+from huggingface_hub.hf_api import BlobLfsInfo, RepoSibling
+from huggingface_hub.utils.insecure_hashlib import sha256
+
+
+@pytest.mark.usefixtures("fx_cache_dir")
+class TestLazySnapshot(unittest.TestCase):
+    cache_dir: Path
+    commit_hash = "a" * 40
+
+    def setUp(self) -> None:
+        self.repo_info = Mock(
+            sha=self.commit_hash,
+            siblings=[
+                RepoSibling(rfilename="config.json", size=2, blob_id="b" * 40),
+                RepoSibling(
+                    rfilename="model.fp16.bin",
+                    size=135,
+                    blob_id="c" * 40,
+                    lfs=BlobLfsInfo(size=4, sha256=sha256(b"fp16").hexdigest(), pointer_size=135),
+                ),
+                RepoSibling(
+                    rfilename="model.fp32.bin",
+                    size=135,
+                    blob_id="d" * 40,
+                    lfs=BlobLfsInfo(size=4, sha256=sha256(b"fp32").hexdigest(), pointer_size=135),
+                ),
+            ],
+        )
+        self.contents = {"config.json": b"{}", "model.fp16.bin": b"fp16", "model.fp32.bin": b"fp32"}
+
+        def _http_get(url: str, temp_file, _sha256=None, **kwargs) -> None:
+            content = self.contents[url.split(f"/{self.commit_hash}/")[1]]
+            temp_file.write(content)
+            if _sha256 is not None:
+                _sha256.update(content)
+
+        patcher_repo_info = patch.object(HfApi, "repo_info", return_value=self.repo_info)
+        patcher_http_get = patch("huggingface_hub.file_download.http_get", side_effect=_http_get)
+        self.mock_repo_info = patcher_repo_info.start()
+        self.mock_http_get = patcher_http_get.start()
+        self.addCleanup(patch.stopall)
+
+    def _downloaded_files(self) -> set:
+        return {call.args[0].split("/")[-1] for call in self.mock_http_get.call_args_list}
+
+    def test_files_are_downloaded_on_access(self) -> None:
+        snapshot = LazySnapshot("user/repo", cache_dir=self.cache_dir)
+        self.assertEqual(set(snapshot), {"config.json", "model.fp16.bin", "model.fp32.bin"})
+        self.assertIn("model.fp32.bin", snapshot)
+        self.assertNotIn("missing.bin", snapshot)
+        self.mock_http_get.assert_not_called()
+
+        path = snapshot["model.fp16.bin"]
+        self.assertEqual(path, str(Path(snapshot.snapshot_folder) / "model.fp16.bin"))
+        self.assertEqual(Path(path).read_bytes(), b"fp16")
+        self.assertEqual(snapshot["model.fp16.bin"], path)  # cached => not downloaded again
+        self.assertEqual(self._downloaded_files(), {"model.fp16.bin"})
+
+        # Revision resolved and files listed only once
+        self.mock_repo_info.assert_called_once()
+        self.assertTrue(self.mock_repo_info.call_args.kwargs["files_metadata"])
+
+        with self.assertRaises(KeyError):
+            snapshot["missing.bin"]
+
+    def test_filter_patterns(self) -> None:
+        snapshot = LazySnapshot("user/repo", cache_dir=self.cache_dir, ignore_patterns="*.fp32.bin")
+        self.assertEqual(set(snapshot), {"config.json", "model.fp16.bin"})
+
+    def test_prefetch(self) -> None:
+        with LazySnapshot("user/repo", cache_dir=self.cache_dir) as snapshot:
+            snapshot.prefetch(allow_patterns="*.fp16.bin")
+            self.assertEqual(Path(snapshot["model.fp16.bin"]).read_bytes(), b"fp16")
+        self.assertEqual(self._downloaded_files(), {"model.fp16.bin"})
+
+    def test_prefetch_error_raised_on_access(self) -> None:
+        self.mock_http_get.side_effect = ValueError("download failed")
+        with LazySnapshot("user/repo", cache_dir=self.cache_dir) as snapshot:
+            snapshot.prefetch("config.json")
+            with self.assertRaises(ValueError):
+                snapshot["config.json"]
+
+    def test_pickle(self) -> None:
+        snapshot = LazySnapshot("user/repo", cache_dir=self.cache_dir)
+        snapshot.prefetch("config.json")
+
+        unpickled = pickle.loads(pickle.dumps(snapshot))
+        self.assertEqual(unpickled.commit_hash, self.commit_hash)
+        self.assertEqual(set(unpickled), set(snapshot))
+        self.assertIsInstance(unpickled._lock, type(threading.Lock()))
+        self.assertEqual(Path(unpickled["model.fp32.bin"]).read_bytes(), b"fp32")
+        self.mock_repo_info.assert_called_once()  # no call to the Hub on unpickling
+        snapshot.close()
+
+    def test_token_is_not_pickled(self) -> None:
+        snapshot = LazySnapshot(
+            "user/repo", cache_dir=self.cache_dir, token="hf_secret", headers={"Authorization": "Bearer hf_secret"}
+        )
+        self.assertNotIn(b"hf_secret", pickle.dumps(snapshot))
+        self.assertEqual(snapshot._token, "hf_secret")  # original object unchanged
+
+        # Disabling the token is not a secret => kept
+        snapshot = LazySnapshot("user/repo", cache_dir=self.cache_dir, token=False)
+        self.assertIs(pickle.loads(pickle.dumps(snapshot))._token, False)
@@ -2,8 +2,10 @@ import os
 import unittest
 from hashlib import sha256
 from io import BytesIO
+from unittest.mock import Mock, patch
 
-from huggingface_hub.lfs import SliceFileObj, UploadInfo
+from huggingface_hub import CommitOperationAdd
+from huggingface_hub.lfs import SliceFileObj, UploadInfo, _open_read_at, _PartFileObj, _upload_parts_concurrently
 from huggingface_hub.utils import SoftTemporaryDirectory
 
 
@@ -176,3 +178,79 @@ class TestSliceFileObj(unittest.TestCase):
                     fileobj_slice.seek(-200, os.SEEK_END)
                     self.assertEqual(fileobj_slice.tell(), 0)
                     self.assertEqual(fileobj_slice.fileobj.tell(), 100)
+
+
+class TestPartFileObj(unittest.TestCase):
+    content = bytes(range(256)) * 4
+
+    def test_read_and_seek(self):
+        with _open_read_at(self.content) as read_at:
+            part = _PartFileObj(read_at, offset=100, length=100)
+            self.assertEqual(len(part), 100)
+            self.assertEqual(part.read(30), self.content[100:130])
+            self.assertEqual(part.tell(), 30)
+            self.assertEqual(part.read(), self.content[130:200])
+            self.assertEqual(part.read(), b"")
+            part.seek(-10, os.SEEK_END)
+            self.assertEqual(part.read(), self.content[190:200])
+            part.seek(0)
+            self.assertEqual(part.read(1000), self.content[100:200])
+
+    def test_rewind_is_not_reported_twice(self):
+        reported = []
+        with _open_read_at(BytesIO(self.content)) as read_at:
+            part = _PartFileObj(read_at, offset=0, length=100, on_read=reported.append)
+            part.read(60)
+            part.seek(0)  # e.g. retried request
+            part.read()
+        self.assertEqual(reported, [60, 40])
+
+    def test_open_read_at_file(self):
+        with SoftTemporaryDirectory() as tmpdir:
+            filepath = os.path.join(tmpdir, "file.bin")
+            with open(filepath, "wb") as f:
+                f.write(self.content)
+            with _open_read_at(filepath) as read_at:
+                self.assertEqual(read_at(500, 20), self.content[500:520])
+
+            with open(filepath, "rb") as fileobj:
+                fileobj.seek(12)
+                with _open_read_at(fileobj) as read_at:
+                    self.assertEqual(read_at(500, 20), self.content[500:520])
+                self.assertEqual(fileobj.tell(), 12)  # position is restored
+
+
+class TestUploadPartsConcurrently(unittest.TestCase):
+    content = os.urandom(1000)
+
+    def _upload(self, path_or_fileobj) -> None:
+        uploaded = {}
+
+        def _fake_put(method: str, url: str, data: _PartFileObj, **kwargs) -> Mock:
+            uploaded[url] = data.read()
+            return Mock(status_code=200, headers={"etag": f"etag-{url}"})
+
+        operation = CommitOperationAdd(path_in_repo="file.bin", path_or_fileobj=path_or_fileobj)
+        urls = [f"url-{idx}" for idx in range(8)]
+        with patch("huggingface_hub.lfs.http_backoff", side_effect=_fake_put), patch(
+            "huggingface_hub.lfs.HF_HUB_UPLOAD_CONNECTIONS", 4
+        ):
+            headers = _upload_parts_concurrently(operation, sorted_parts_urls=urls, chunk_size=128)
+
+        # Headers are returned in part order, whatever the order in which parts are uploaded
+        self.assertEqual([header["etag"] for header in headers], [f"etag-{url}" for url in urls])
+        self.assertEqual(b"".join(uploaded[url] for url in urls), self.content)
+        self.assertEqual(len(uploaded[urls[-1]]), 1000 - 7 * 128)
+
+    def test_upload_bytes(self):
+        self._upload(self.content)
+
+    def test_upload_fileobj(self):
+        self._upload(BytesIO(self.content))
+
+    def test_upload_path(self):
+        with SoftTemporaryDirectory() as tmpdir:
+            filepath = os.path.join(tmpdir, "file.bin")
+            with open(filepath, "wb") as f:
+                f.write(self.content)
+            self._upload(filepath)
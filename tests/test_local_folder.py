@@ -18,6 +18,7 @@ See `huggingface_hub/src/_local_folder.py` for the implementation.
 """
 
 import logging
+import sqlite3
 import time
 from pathlib import Path
 
@@ -29,7 +30,9 @@ from huggingface_hub._local_folder import (
     _huggingface_dir,
     get_local_download_paths,
     read_download_metadata,
+    read_download_metadata_batch,
     write_download_metadata,
+    write_download_metadata_batch,
 )
 
 
@@ -81,18 +84,23 @@ def test_local_download_paths_are_cached(tmp_path: Path):
     assert paths1 is paths2
 
 
+def _read_index(local_dir: Path, filename: str) -> tuple:
+    with sqlite3.connect(str(local_dir / ".cache" / "huggingface" / "download.sqlite")) as index:
+        return index.execute(
+            "SELECT commit_hash, etag, timestamp FROM metadata WHERE filename = ?", (filename,)
+        ).fetchone()
+
+
 def test_write_download_metadata(tmp_path: Path):
     """Test download metadata content is valid."""
     # Write metadata
     write_download_metadata(tmp_path, filename="file.txt", commit_hash="commit_hash", etag="123456789")
-    metadata_path = tmp_path / ".cache" / "huggingface" / "download" / "file.txt.metadata"
-    assert metadata_path.exists()
 
-    # Metadata is valid
-    with metadata_path.open() as f:
-        assert f.readline() == "commit_hash\n"
-        assert f.readline() == "123456789\n"
-        timestamp = float(f.readline().strip())
+    # Metadata is valid (stored in the index, not in a file per download)
+    assert not (tmp_path / ".cache" / "huggingface" / "download" / "file.txt.metadata").exists()
+    commit_hash, etag, timestamp = _read_index(tmp_path, "file.txt")
+    assert commit_hash == "commit_hash"
+    assert etag == "123456789"
     assert timestamp <= time.time()  # in the past
     assert timestamp >= time.time() - 1  # but less than 1 seconds ago (we're not that slow)
 
@@ -100,13 +108,64 @@ def test_write_download_metadata(tmp_path: Path):
 
     # Overwriting works as expected
     write_download_metadata(tmp_path, filename="file.txt", commit_hash="commit_hash2", etag="987654321")
-    with metadata_path.open() as f:
-        assert f.readline() == "commit_hash2\n"
-        assert f.readline() == "987654321\n"
-        timestamp2 = float(f.readline().strip())
+    commit_hash2, etag2, timestamp2 = _read_index(tmp_path, "file.txt")
+    assert commit_hash2 == "commit_hash2"
+    assert etag2 == "987654321"
     assert timestamp <= timestamp2  # updated timestamp
 
 
+def test_batch_download_metadata(tmp_path: Path):
+    """Test reading and writing metadata of several files at once."""
+    for filename in ("file.txt", "folder/file.txt", "missing.txt"):
+        (tmp_path / filename).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / filename).write_text("content")
+    (tmp_path / "missing.txt").unlink()
+
+    write_download_metadata_batch(
+        tmp_path,
+        [
+            ("file.txt", "commit_hash", "etag1"),
+            ("folder/file.txt", "commit_hash", "etag2"),
+            ("missing.txt", "commit_hash", "etag3"),
+        ],
+    )
+    metadata = read_download_metadata_batch(tmp_path, ["file.txt", "folder/file.txt", "missing.txt", "unknown.txt"])
+    assert metadata["file.txt"].etag == "etag1"
+    assert metadata["folder/file.txt"].etag == "etag2"
+    assert metadata["missing.txt"] is None  # file has been deleted
+    assert metadata["unknown.txt"] is None  # no metadata
+
+
+def test_legacy_metadata_files_are_imported(tmp_path: Path):
+    """Test metadata files written by previous versions are imported in the index, then deleted."""
+    (tmp_path / "folder").mkdir()
+    (tmp_path / "folder" / "file.txt").write_text("content")
+    metadata_path = tmp_path / ".cache" / "huggingface" / "download" / "folder" / "file.txt.metadata"
+    metadata_path.parent.mkdir(parents=True)
+    metadata_path.write_text(f"commit_hash\n123456789\n{time.time()}\n")
+
+    metadata = read_download_metadata(tmp_path, filename="folder/file.txt")
+    assert metadata is not None
+    assert metadata.commit_hash == "commit_hash"
+    assert metadata.etag == "123456789"
+    assert not metadata_path.exists()
+
+
+def test_corrupted_index_is_removed(tmp_path: Path, caplog: pytest.LogCaptureFixture):
+    """Test a corrupted index is deleted and recreated."""
+    (tmp_path / "file.txt").write_text("content")
+    index_path = tmp_path / ".cache" / "huggingface" / "download.sqlite"
+    index_path.parent.mkdir(parents=True)
+    index_path.write_text("not a database" * 100)
+
+    with caplog.at_level(logging.WARNING):
+        assert read_download_metadata(tmp_path, filename="file.txt") is None
+    assert "Invalid metadata index" in caplog.text
+
+    write_download_metadata(tmp_path, filename="file.txt", commit_hash="commit_hash", etag="123456789")
+    assert read_download_metadata(tmp_path, filename="file.txt").etag == "123456789"
+
+
 def test_read_download_metadata_valid_metadata(tmp_path: Path):
     """Test reading download metadata when metadata is valid."""
     # Create file + write correct metadata
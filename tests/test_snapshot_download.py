@@ -1,10 +1,14 @@
 import os
 import unittest
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 from huggingface_hub import CommitOperationAdd, HfApi, snapshot_download
+from huggingface_hub._local_folder import read_download_metadata
+from huggingface_hub.hf_api import BlobLfsInfo, RepoSibling
 from huggingface_hub.utils import LocalEntryNotFoundError, RepositoryNotFoundError, SoftTemporaryDirectory
+from huggingface_hub.utils.insecure_hashlib import sha256
+from huggingface_hub.utils.sha import sha_file
 
 from .testing_constants import TOKEN
 from .testing_utils import OfflineSimulationMode, offline, repo_name
@@ -228,3 +232,189 @@ class SnapshotDownloadTests(unittest.TestCase):
                 # Nothing has been added to cache dir (except some subfolders created)
                 for path in cache_dir.glob("*"):
                     assert path.is_dir()
+
+
+class SnapshotDownloadFromRepoListingTest(unittest.TestCase):
+    """Test `snapshot_download` uses the files metadata from `repo_info` instead of a HEAD call per file."""
+
+    commit_hash = "a" * 40
+    regular_blob_id = "b" * 40
+    lfs_sha256 = sha256(b"model").hexdigest()
+
+    def setUp(self) -> None:
+        tmpdir = SoftTemporaryDirectory()
+        self.cache_dir = tmpdir.__enter__()
+        self.addCleanup(tmpdir.__exit__, None, None, None)
+        self.storage_folder = Path(self.cache_dir) / "models--user--repo"
+
+        self.repo_info = Mock(
+            sha=self.commit_hash,
+            siblings=[
+                RepoSibling(rfilename="config.json", size=2, blob_id=self.regular_blob_id),
+                RepoSibling(
+                    rfilename="subfolder/model.bin",
+                    size=135,
+                    blob_id="d" * 40,
+                    lfs=BlobLfsInfo(size=5, sha256=self.lfs_sha256, pointer_size=135),
+                ),
+            ],
+        )
+        self.contents = {"config.json": b"{}", "subfolder/model.bin": b"model"}
+
+        def _http_get(url: str, temp_file, _sha256=None, **kwargs) -> None:
+            content = self.contents[url.split(f"/{self.commit_hash}/")[1]]
+            temp_file.write(content)
+            if _sha256 is not None:
+                _sha256.update(content)
+
+        patcher_repo_info = patch.object(HfApi, "repo_info", return_value=self.repo_info)
+        patcher_http_get = patch("huggingface_hub.file_download.http_get", side_effect=_http_get)
+        patcher_metadata = patch("huggingface_hub.file_download.get_hf_file_metadata")
+        self.mock_repo_info = patcher_repo_info.start()
+        self.mock_http_get = patcher_http_get.start()
+        self.mock_metadata = patcher_metadata.start()
+        self.addCleanup(patch.stopall)
+
+    def test_download_without_head_calls(self) -> None:
+        snapshot_path = snapshot_download("user/repo", cache_dir=self.cache_dir)
+
+        self.assertEqual(snapshot_path, str(self.storage_folder / "snapshots" / self.commit_hash))
+        self.assertEqual((Path(snapshot_path) / "config.json").read_bytes(), b"{}")
+        self.assertEqual((Path(snapshot_path) / "subfolder" / "model.bin").read_bytes(), b"model")
+
+        # Blobs are stored by etag (git blob id for regular files, sha256 for LFS files)
+        self.assertTrue((self.storage_folder / "blobs" / self.regular_blob_id).is_file())
+        self.assertTrue((self.storage_folder / "blobs" / self.lfs_sha256).is_file())
+        self.assertEqual((self.storage_folder / "refs" / "main").read_text(), self.commit_hash)
+
+        # Files metadata requested once, no HEAD calls
+        self.assertTrue(self.mock_repo_info.call_args.kwargs["files_metadata"])
+        self.mock_metadata.assert_not_called()
+        self.assertEqual(self.mock_http_get.call_count, 2)
+
+    def test_existing_blob_is_not_downloaded_again(self) -> None:
+        blob_path = self.storage_folder / "blobs" / self.lfs_sha256
+        blob_path.parent.mkdir(parents=True)
+        blob_path.write_bytes(b"model")
+
+        snapshot_path = snapshot_download("user/repo", cache_dir=self.cache_dir)
+
+        self.assertEqual((Path(snapshot_path) / "subfolder" / "model.bin").read_bytes(), b"model")
+        self.assertEqual(self.mock_http_get.call_count, 1)  # only config.json
+        self.mock_metadata.assert_not_called()
+
+    def test_fallback_to_hf_hub_download_without_metadata(self) -> None:
+        self.repo_info.siblings = [RepoSibling(rfilename="config.json")]
+        with patch("huggingface_hub._snapshot_download.hf_hub_download") as mock_hf_hub_download:
+            snapshot_download("user/repo", cache_dir=self.cache_dir)
+
+        mock_hf_hub_download.assert_called_once()
+        self.assertEqual(mock_hf_hub_download.call_args.kwargs["filename"], "config.json")
+        self.assertEqual(mock_hf_hub_download.call_args.kwargs["revision"], self.commit_hash)
+        self.mock_http_get.assert_not_called()
+
+    def _move_main_to_new_commit(self) -> None:
+        # New commit on `main`: config.json is modified, model.bin is unchanged
+        self.commit_hash = "f" * 40
+        self.repo_info.sha = self.commit_hash
+        self.repo_info.siblings[0] = RepoSibling(rfilename="config.json", size=9, blob_id="e" * 40)
+        self.contents["config.json"] = b'{"a": 1}'
+        self.mock_http_get.reset_mock()
+
+    def test_update_only_downloads_changed_files(self) -> None:
+        old_snapshot_path = Path(snapshot_download("user/repo", cache_dir=self.cache_dir))
+        self._move_main_to_new_commit()
+
+        new_snapshot_path = Path(snapshot_download("user/repo", cache_dir=self.cache_dir))
+
+        self.assertNotEqual(old_snapshot_path, new_snapshot_path)
+        self.assertEqual((new_snapshot_path / "config.json").read_bytes(), b'{"a": 1}')
+        self.assertEqual(
+            (new_snapshot_path / "subfolder" / "model.bin").resolve(),
+            (old_snapshot_path / "subfolder" / "model.bin").resolve(),
+        )
+        self.assertEqual(self.mock_http_get.call_count, 1)  # only config.json
+        self.assertEqual((self.storage_folder / "refs" / "main").read_text(), self.commit_hash)
+
+    def test_update_local_dir_without_head_calls(self) -> None:
+        local_dir = Path(self.cache_dir) / "local"
+        snapshot_download("user/repo", cache_dir=self.cache_dir, local_dir=local_dir)
+        self._move_main_to_new_commit()
+
+        snapshot_download("user/repo", cache_dir=self.cache_dir, local_dir=local_dir)
+
+        self.assertEqual((local_dir / "config.json").read_bytes(), b'{"a": 1}')
+        self.assertEqual((local_dir / "subfolder" / "model.bin").read_bytes(), b"model")
+        self.assertEqual(self.mock_http_get.call_count, 1)  # only config.json
+        self.mock_metadata.assert_not_called()
+
+        # Metadata of the unchanged file points to the new commit
+        metadata = read_download_metadata(local_dir, "subfolder/model.bin")
+        self.assertEqual(metadata.commit_hash, self.commit_hash)
+        self.assertEqual(metadata.etag, self.lfs_sha256)
+
+    def test_local_dir_without_metadata_is_reconciled_by_hash(self) -> None:
+        # Local dir copied from another machine => no metadata
+        local_dir = Path(self.cache_dir) / "local"
+        (local_dir / "subfolder").mkdir(parents=True)
+        (local_dir / "subfolder" / "model.bin").write_bytes(b"model")
+
+        with patch("huggingface_hub.file_download.sha_file", wraps=sha_file) as mock_sha_file:
+            snapshot_download("user/repo", cache_dir=self.cache_dir, local_dir=local_dir)
+        mock_sha_file.assert_called_once()
+        self.assertEqual(self.mock_http_get.call_count, 1)  # only config.json (not an LFS file)
+        self.assertEqual(read_download_metadata(local_dir, "subfolder/model.bin").etag, self.lfs_sha256)
+
+    def test_local_dir_size_mismatch_is_not_hashed(self) -> None:
+        local_dir = Path(self.cache_dir) / "local"
+        (local_dir / "subfolder").mkdir(parents=True)
+        (local_dir / "subfolder" / "model.bin").write_bytes(b"another model")
+
+        with patch("huggingface_hub.file_download.sha_file") as mock_sha_file:
+            snapshot_download("user/repo", cache_dir=self.cache_dir, local_dir=local_dir)
+        mock_sha_file.assert_not_called()
+        self.assertEqual((local_dir / "subfolder" / "model.bin").read_bytes(), b"model")
+        self.assertEqual(self.mock_http_get.call_count, 2)
+
+    def test_disk_space_preflight(self) -> None:
+        blob_path = self.storage_folder / "blobs" / self.lfs_sha256
+        blob_path.parent.mkdir(parents=True)
+        blob_path.write_bytes(b"model")
+
+        # Only config.json must be downloaded (2 bytes)
+        with patch("huggingface_hub.file_download.shutil.disk_usage") as mock_disk_usage:
+            mock_disk_usage.return_value.free = 1
+            with self.assertRaises(OSError):
+                snapshot_download("user/repo", cache_dir=self.cache_dir)
+            self.mock_http_get.assert_not_called()  # failed before downloading anything
+
+            mock_disk_usage.return_value.free = 2
+            snapshot_download("user/repo", cache_dir=self.cache_dir)
+
+    def test_largest_files_first_and_split_across_connections(self) -> None:
+        self.repo_info.siblings = [
+            RepoSibling(rfilename="small.json", size=10, blob_id="1" * 40),
+            RepoSibling(
+                rfilename="huge.bin",
+                size=135,
+                blob_id="2" * 40,
+                lfs=BlobLfsInfo(size=700, sha256="3" * 64, pointer_size=135),
+            ),
+            RepoSibling(rfilename="medium.json", size=290, blob_id="4" * 40),
+        ]
+        with patch("huggingface_hub._snapshot_download._hf_hub_download_blob_to_cache_dir") as mock_download:
+            # Downloaded by descending size
+            snapshot_download("user/repo", cache_dir=self.cache_dir, max_workers=1)
+            self.assertEqual(
+                [call.kwargs["filename"] for call in mock_download.call_args_list],
+                ["huge.bin", "medium.json", "small.json"],
+            )
+
+            mock_download.reset_mock()
+            snapshot_download("user/repo", cache_dir=self.cache_dir, max_workers=4)
+            calls = {call.kwargs["filename"]: call.kwargs for call in mock_download.call_args_list}
+
+        # 'huge.bin' is 70% of the total => split across 3 connections (1 per 1/4 of the total size, rounded up)
+        self.assertEqual(calls["huge.bin"]["max_connections"], 3)
+        self.assertEqual(calls["medium.json"]["max_connections"], 2)
+        self.assertEqual(calls["small.json"]["max_connections"], 1)
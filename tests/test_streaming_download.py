@@ -0,0 +1,127 @@
+import json
+import os
+import threading
+import unittest
+from concurrent.futures import Future
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from huggingface_hub import hf_hub_open
+from huggingface_hub._streaming_download import _FollowDownloadReader
+
+
+REPO_ID = "user/repo"
+COMMIT_HASH = "a" * 40
+ETAG = "b" * 40
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.mark.usefixtures("fx_cache_dir")
+class TestHfHubOpen(unittest.TestCase):
+    cache_dir: Path
+
+    def setUp(self) -> None:
+        self.blob_path = self.cache_dir / "models--user--repo" / "blobs" / ETAG
+        self.metadata_patcher = patch(
+            "huggingface_hub.file_download._get_metadata_or_catch_error",
+            return_value=("https://url", ETAG, COMMIT_HASH, len(CONTENT), None),
+        )
+        self.metadata_patcher.start()
+        self.first_read_done = threading.Event()
+
+    def tearDown(self) -> None:
+        self.metadata_patcher.stop()
+
+    def _slow_download(self, incomplete_path: Path, destination_path: Path, **kwargs) -> None:
+        # Write the beginning of the file and wait for it to be read before completing the download
+        with incomplete_path.open("ab") as f:
+            f.write(CONTENT[:100])
+            f.flush()
+            if not self.first_read_done.wait(timeout=10):
+                raise TimeoutError("First bytes were not read while downloading")
+            f.write(CONTENT[100:])
+        os.replace(incomplete_path, destination_path)
+
+    def test_read_while_downloading(self) -> None:
+        with patch("huggingface_hub.file_download._download_to_tmp_and_move", side_effect=self._slow_download):
+            with hf_hub_open(REPO_ID, "model.bin", cache_dir=self.cache_dir) as f:
+                self.assertEqual(f.read(100), CONTENT[:100])  # download not complete yet
+                self.first_read_done.set()
+                self.assertEqual(f.read(), CONTENT[100:])
+
+        self.assertEqual(self.blob_path.read_bytes(), CONTENT)
+
+    def test_download_error_is_raised_on_read(self) -> None:
+        def _failing_download(incomplete_path: Path, **kwargs) -> None:
+            incomplete_path.write_bytes(CONTENT[:10])
+            self.first_read_done.wait(timeout=10)
+            raise EnvironmentError("Consistency check failed")
+
+        with patch("huggingface_hub.file_download._download_to_tmp_and_move", side_effect=_failing_download):
+            with hf_hub_open(REPO_ID, "model.bin", cache_dir=self.cache_dir) as f:
+                self.assertEqual(f.read(10), CONTENT[:10])
+                self.first_read_done.set()
+                with self.assertRaisesRegex(EnvironmentError, "Consistency check failed"):
+                    f.read()
+
+    def test_cached_file(self) -> None:
+        pointer_path = self.cache_dir / "models--user--repo" / "snapshots" / COMMIT_HASH / "model.bin"
+        pointer_path.parent.mkdir(parents=True)
+        pointer_path.write_bytes(CONTENT)
+        with hf_hub_open(REPO_ID, "model.bin", revision=COMMIT_HASH, cache_dir=self.cache_dir) as f:
+            self.assertEqual(f.name, str(pointer_path))
+            self.assertEqual(f.read(), CONTENT)
+
+
+@pytest.mark.usefixtures("fx_cache_dir")
+class TestFollowDownloadReader(unittest.TestCase):
+    cache_dir: Path
+
+    def test_parallel_download_progress(self) -> None:
+        blob_path = self.cache_dir / "blob"
+        incomplete_path = self.cache_dir / "blob.incomplete"
+        state_path = self.cache_dir / "blob.incomplete.ranges"
+        incomplete_path.write_bytes(b"\0" * 30)  # preallocated
+        download: Future = Future()
+        reader = _FollowDownloadReader(str(blob_path), expected_size=30, download=download, poll_interval=0.01)
+
+        # Only the second range is complete => nothing to read at the beginning of the file
+        state_path.write_text(json.dumps({"size": 30, "range_size": 10, "done": [1]}))
+        self.assertEqual(reader._available_bytes(), 0)
+        reader.seek(15)
+        self.assertEqual(reader._available_bytes(), 5)
+
+        # First range complete => first 2 ranges can be read
+        state_path.write_text(json.dumps({"size": 30, "range_size": 10, "done": [0, 1]}))
+        reader.seek(0)
+        self.assertEqual(reader._available_bytes(), 20)
+
+        # Download complete => reads are made on the final file
+        blob_path.write_bytes(CONTENT[:30])
+        download.set_result(str(blob_path))
+        self.assertEqual(reader.read(), CONTENT[:30])
+        reader.close()
+
+    def test_sequential_download_progress(self) -> None:
+        incomplete_path = self.cache_dir / "blob.incomplete"
+        incomplete_path.write_bytes(CONTENT[:50])
+        reader = _FollowDownloadReader(
+            str(self.cache_dir / "blob"), expected_size=len(CONTENT), download=Future(), poll_interval=0.01
+        )
+        self.assertEqual(reader._available_bytes(), 50)
+        self.assertEqual(reader.read(100), CONTENT[:50])
+        self.assertEqual(reader._available_bytes(), 0)
+        reader.close()
+
+    def test_unreadable_download_state(self) -> None:
+        incomplete_path = self.cache_dir / "blob.incomplete"
+        incomplete_path.write_bytes(CONTENT[:50])
+        (self.cache_dir / "blob.incomplete.ranges").write_text("{not json")
+        reader = _FollowDownloadReader(
+            str(self.cache_dir / "blob"), expected_size=len(CONTENT), download=Future(), poll_interval=0.01
+        )
+        # Unknown progress => nothing to read for now (caller polls again)
+        self.assertEqual(reader._available_bytes(), 0)
+        reader.close()
@@ -0,0 +1,99 @@
+import os
+import sqlite3
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from huggingface_hub import CommitOperationAdd
+from huggingface_hub._upload_hash_cache import cache_upload_infos, get_cached_upload_infos
+from huggingface_hub.lfs import UploadInfo
+from huggingface_hub.utils.sha import sha_file
+
+
+@pytest.mark.usefixtures("fx_cache_dir")
+class TestUploadHashCache(unittest.TestCase):
+    cache_dir: Path
+
+    def setUp(self) -> None:
+        self.path = self.cache_dir / "file.bin"
+        self.path.write_bytes(b"content")
+        one_hour_ago = time.time() - 3600
+        os.utime(self.path, (one_hour_ago, one_hour_ago))
+
+        patcher_enabled = patch("huggingface_hub.constants.HF_HUB_ENABLE_UPLOAD_HASH_CACHE", True)
+        patcher_path = patch(
+            "huggingface_hub.constants.HF_HUB_UPLOAD_HASH_CACHE_PATH", str(self.cache_dir / "upload_hashes.sqlite")
+        )
+        patcher_enabled.start()
+        patcher_path.start()
+        self.addCleanup(patch.stopall)
+
+    def _cache(self, path: Path) -> UploadInfo:
+        stat = path.stat()
+        upload_info = UploadInfo.from_path(str(path))
+        cache_upload_infos([(str(path), stat, upload_info)])
+        return upload_info
+
+    def test_cached_upload_info(self) -> None:
+        self.assertEqual(get_cached_upload_infos([str(self.path)]), {str(self.path): None})
+        upload_info = self._cache(self.path)
+        self.assertEqual(get_cached_upload_infos([str(self.path)]), {str(self.path): upload_info})
+
+    def test_modified_file_is_not_cached(self) -> None:
+        self._cache(self.path)
+        self.path.write_bytes(b"new content")
+        self.assertEqual(get_cached_upload_infos([str(self.path)]), {str(self.path): None})
+
+    def test_recently_modified_file_is_not_cached(self) -> None:
+        os.utime(self.path, None)  # mtime could be the same after a second write
+        self._cache(self.path)
+        self.assertEqual(get_cached_upload_infos([str(self.path)]), {str(self.path): None})
+
+    def test_disabled(self) -> None:
+        with patch("huggingface_hub.constants.HF_HUB_ENABLE_UPLOAD_HASH_CACHE", False):
+            self._cache(self.path)
+            self.assertEqual(get_cached_upload_infos([str(self.path)]), {})
+        self.assertFalse((self.cache_dir / "upload_hashes.sqlite").exists())
+
+    def test_corrupted_cache_is_removed(self) -> None:
+        (self.cache_dir / "upload_hashes.sqlite").write_bytes(b"not a database")
+        with self.assertLogs("huggingface_hub._upload_hash_cache", level="WARNING"):
+            self.assertEqual(get_cached_upload_infos([str(self.path)]), {str(self.path): None})
+        self._cache(self.path)  # new cache is created
+        self.assertIsNotNone(get_cached_upload_infos([str(self.path)])[str(self.path)])
+
+    def test_unusable_cache_path(self) -> None:
+        for cache_path in (self.cache_dir, self.path / "upload_hashes.sqlite"):  # a directory, parent is a file
+            with patch("huggingface_hub.constants.HF_HUB_UPLOAD_HASH_CACHE_PATH", str(cache_path)):
+                with self.assertLogs("huggingface_hub._upload_hash_cache", level="WARNING"):
+                    self._cache(self.path)
+                with self.assertLogs("huggingface_hub._upload_hash_cache", level="WARNING"):
+                    self.assertEqual(get_cached_upload_infos([str(self.path)]), {str(self.path): None})
+                operation = CommitOperationAdd(path_in_repo="file.bin", path_or_fileobj=self.path)
+                self.assertEqual(operation.upload_info.size, len(b"content"))
+        self.assertTrue(self.cache_dir.is_dir())
+        self.assertTrue(self.path.is_file())
+
+    def test_locked_cache(self) -> None:
+        self._cache(self.path)
+        with patch(
+            "huggingface_hub._upload_hash_cache.sqlite3.connect",
+            side_effect=sqlite3.OperationalError("database is locked"),
+        ):
+            with self.assertLogs("huggingface_hub._upload_hash_cache", level="WARNING"):
+                self.assertEqual(get_cached_upload_infos([str(self.path)]), {str(self.path): None})
+        self.assertTrue((self.cache_dir / "upload_hashes.sqlite").exists())  # not removed
+
+    def test_operations_are_not_hashed_again(self) -> None:
+        with patch("huggingface_hub.lfs.sha_file", wraps=sha_file) as mock:
+            operation = CommitOperationAdd(path_in_repo="file.bin", path_or_fileobj=self.path)
+            operation.upload_info
+            mock.assert_called_once()
+
+            operation_2 = CommitOperationAdd(path_in_repo="file.bin", path_or_fileobj=self.path)
+            operation_2.upload_info
+            mock.assert_called_once()  # read from cache
+        self.assertEqual(operation.upload_info, operation_2.upload_info)
@@ -768,6 +768,57 @@ class TestDeleteStrategyExecute(unittest.TestCase):
         self.assertFalse(snapshot_2.exists())
 
 
+@pytest.mark.usefixtures("fx_cache_dir")
+class TestSharedBlobStore(unittest.TestCase):
+    cache_dir: Path
+
+    def setUp(self) -> None:
+        """Build a cache where repo_A and repo_B share a blob through the shared blob store."""
+        self.shared_blob = self.cache_dir / "blobs" / "shared_hash"
+        self.shared_blob.parent.mkdir()
+        self.shared_blob.write_bytes(b"0" * 100)
+
+        for repo_name, commit_hash in (("repo_A", "a" * 40), ("repo_B", "b" * 40)):
+            repo_path = self.cache_dir / f"models--user--{repo_name}"
+            (repo_path / "blobs").mkdir(parents=True)
+            os.link(self.shared_blob, repo_path / "blobs" / "shared_hash")
+            (repo_path / "blobs" / "own_hash").write_bytes(b"0" * 10)
+            (repo_path / "refs").mkdir()
+            (repo_path / "refs" / "main").write_text(commit_hash)
+            snapshot_path = repo_path / "snapshots" / commit_hash
+            snapshot_path.mkdir(parents=True)
+            (snapshot_path / "tokenizer.json").symlink_to("../../blobs/shared_hash")
+            (snapshot_path / "model.bin").symlink_to("../../blobs/own_hash")
+
+    def test_scan_cache_counts_shared_blob_once(self) -> None:
+        cache_info = scan_cache_dir(self.cache_dir)
+
+        self.assertEqual(len(cache_info.repos), 2)  # shared blob store is not a repo
+        self.assertEqual(len(cache_info.warnings), 0)
+        for repo in cache_info.repos:
+            self.assertEqual(repo.size_on_disk, 110)
+        self.assertEqual(cache_info.size_on_disk, 120)
+
+    def test_delete_repo_with_shared_blob_still_referenced(self) -> None:
+        strategy = scan_cache_dir(self.cache_dir).delete_revisions("a" * 40)
+
+        self.assertEqual(strategy.expected_freed_size, 10)  # shared blob still used by repo_B
+        self.assertEqual(strategy.shared_blobs, frozenset())
+
+        strategy.execute()
+        self.assertTrue(self.shared_blob.exists())
+        self.assertEqual(self.shared_blob.stat().st_nlink, 2)
+
+    def test_delete_all_repos_referencing_shared_blob(self) -> None:
+        strategy = scan_cache_dir(self.cache_dir).delete_revisions("a" * 40, "b" * 40)
+
+        self.assertEqual(strategy.expected_freed_size, 120)
+        self.assertEqual(strategy.shared_blobs, frozenset({self.shared_blob}))
+
+        strategy.execute()
+        self.assertFalse(self.shared_blob.exists())
+
+
 @pytest.mark.usefixtures("fx_cache_dir")
 class TestTryDeletePath(unittest.TestCase):
     cache_dir: Path
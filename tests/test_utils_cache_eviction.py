@@ -0,0 +1,170 @@
+import json
+import os
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from huggingface_hub.constants import _as_cache_tiers, _as_size
+from huggingface_hub.file_download import _hf_hub_download_blob_to_cache_dir
+from huggingface_hub.utils import evict_cache, pin_cached_revision, scan_cache_dir, unpin_cached_revision
+from huggingface_hub.utils._cache_eviction import _get_max_cache_size, _on_blob_added
+
+
+def _add_cached_revision(cache_dir: Path, repo_name: str, size: int, last_used: float) -> str:
+    """Add a revision with a single file to a fake cache. Return its commit hash."""
+    repo_path = cache_dir / f"models--user--{repo_name}"
+    commit_hash = (repo_name.encode().hex() * 40)[:40]
+    blob_path = repo_path / "blobs" / ("0" * 40)
+    blob_path.parent.mkdir(parents=True)
+    blob_path.write_bytes(b"0" * size)
+    os.utime(blob_path, (last_used, last_used))
+
+    snapshot_path = repo_path / "snapshots" / commit_hash
+    snapshot_path.mkdir(parents=True)
+    (snapshot_path / "file.bin").symlink_to(blob_path)
+    (repo_path / "refs").mkdir()
+    (repo_path / "refs" / "main").write_text(commit_hash)
+    return commit_hash
+
+
+@pytest.mark.usefixtures("fx_cache_dir")
+class TestEvictCache(unittest.TestCase):
+    cache_dir: Path
+
+    def setUp(self) -> None:
+        now = time.time()
+        _add_cached_revision(self.cache_dir, "old", size=100, last_used=now - 3 * 3600)
+        _add_cached_revision(self.cache_dir, "middle", size=100, last_used=now - 2 * 3600)
+        _add_cached_revision(self.cache_dir, "recent", size=100, last_used=now - 3600)
+
+    def _cached_repos(self) -> set:
+        return {repo.repo_id for repo in scan_cache_dir(self.cache_dir).repos}
+
+    def test_evict_least_recently_used(self) -> None:
+        strategy = evict_cache(max_size=250, cache_dir=self.cache_dir)  # 300 bytes => evict down to 225 bytes
+        self.assertEqual(strategy.expected_freed_size, 100)
+        self.assertEqual(self._cached_repos(), {"user/middle", "user/recent"})
+
+    def test_nothing_to_evict(self) -> None:
+        strategy = evict_cache(max_size=300, cache_dir=self.cache_dir)
+        self.assertEqual(strategy.expected_freed_size, 0)
+        self.assertEqual(len(self._cached_repos()), 3)
+
+    def test_pinned_revision_is_not_evicted(self) -> None:
+        pin_cached_revision("user/old", cache_dir=self.cache_dir)
+        evict_cache(max_size=250, cache_dir=self.cache_dir)
+        self.assertEqual(self._cached_repos(), {"user/old", "user/recent"})
+
+        unpin_cached_revision("user/old", cache_dir=self.cache_dir)
+        evict_cache(max_size=150, cache_dir=self.cache_dir)
+        self.assertEqual(self._cached_repos(), {"user/recent"})
+
+    def test_pin_missing_revision(self) -> None:
+        with self.assertRaises(ValueError):
+            pin_cached_revision("user/old", revision="v1.0", cache_dir=self.cache_dir)
+
+    def test_recently_used_revision_is_not_evicted(self) -> None:
+        blob_path = self.cache_dir / "models--user--old" / "blobs" / ("0" * 40)
+        os.utime(blob_path, None)  # just accessed
+        evict_cache(max_size=250, cache_dir=self.cache_dir)
+        self.assertEqual(self._cached_repos(), {"user/old", "user/recent"})
+
+    @unittest.skipIf(not os.path.isdir("/proc/self/fd"), "Open files are only detected on Linux")
+    def test_open_revision_is_not_evicted(self) -> None:
+        blob_path = self.cache_dir / "models--user--old" / "blobs" / ("0" * 40)
+        with blob_path.open("rb"):
+            evict_cache(max_size=250, cache_dir=self.cache_dir)
+        self.assertEqual(self._cached_repos(), {"user/old", "user/recent"})
+
+    def test_on_blob_added_is_incremental(self) -> None:
+        state_path = self.cache_dir / ".locks" / "cache_size.json"
+        with patch("huggingface_hub.constants.HF_HUB_CACHE_MAX_SIZE", 1000):
+            # First call => unknown size => full scan
+            _on_blob_added(self.cache_dir, 100)
+            self.assertEqual(json.loads(state_path.read_text())["size"], 300)
+
+            # Next calls => size is tracked without scanning the cache
+            with patch("huggingface_hub.utils._cache_eviction.scan_cache_dir") as mock_scan:
+                _on_blob_added(self.cache_dir, 100)
+            mock_scan.assert_not_called()
+            self.assertEqual(json.loads(state_path.read_text())["size"], 400)
+
+        # Maximum size exceeded => scan and evict
+        with patch("huggingface_hub.constants.HF_HUB_CACHE_MAX_SIZE", 250):
+            _on_blob_added(self.cache_dir, 100)
+        self.assertEqual(self._cached_repos(), {"user/middle", "user/recent"})
+        self.assertEqual(json.loads(state_path.read_text())["size"], 200)
+
+    def test_max_size_per_cache_tier(self) -> None:
+        tiers = [(str(self.cache_dir), 250), (str(self.cache_dir / "shared"), None)]
+        with patch("huggingface_hub.constants.HF_HUB_CACHE_TIERS", tiers):
+            self.assertEqual(_get_max_cache_size(self.cache_dir), 250)
+            self.assertIsNone(_get_max_cache_size(self.cache_dir / "shared"))
+            evict_cache(cache_dir=self.cache_dir)
+        self.assertEqual(self._cached_repos(), {"user/middle", "user/recent"})
+
+    def test_on_blob_added_disabled_by_default(self) -> None:
+        _on_blob_added(self.cache_dir, 10**12)
+        self.assertFalse((self.cache_dir / ".locks" / "cache_size.json").exists())
+        self.assertEqual(len(self._cached_repos()), 3)
+
+
+@pytest.mark.usefixtures("fx_cache_dir")
+class TestBlobAddedTracking(unittest.TestCase):
+    cache_dir: Path
+
+    def _download(self, blob_path_callback=None) -> None:
+        _hf_hub_download_blob_to_cache_dir(
+            cache_dir=str(self.cache_dir),
+            repo_id="user/repo",
+            repo_type="model",
+            filename="file.bin",
+            revision="main",
+            commit_hash="a" * 40,
+            etag="0" * 40,
+            url_to_download="fake_url",
+            expected_size=100,
+            headers={},
+            proxies=None,
+            force_download=False,
+            blob_path_callback=blob_path_callback,
+        )
+
+    @patch("huggingface_hub.file_download._on_blob_added")
+    @patch("huggingface_hub.file_download._download_to_tmp_and_move")
+    def test_downloaded_blob_is_tracked(self, mock_download: Mock, mock_on_blob_added: Mock) -> None:
+        self._download()
+        mock_download.assert_called_once()
+        mock_on_blob_added.assert_called_once_with(str(self.cache_dir), 100)
+
+    @patch("huggingface_hub.file_download._on_blob_added")
+    @patch("huggingface_hub.file_download._download_to_tmp_and_move")
+    def test_blob_added_by_another_process_is_not_tracked(self, mock_download: Mock, mock_on_blob_added: Mock) -> None:
+        # Blob written by another process while waiting for the lock
+        self._download(blob_path_callback=lambda blob_path, size: Path(blob_path).write_bytes(b"0" * size))
+        mock_download.assert_not_called()
+        mock_on_blob_added.assert_not_called()
+
+
+class TestAsSize(unittest.TestCase):
+    def test_as_size(self) -> None:
+        self.assertIsNone(_as_size(None))
+        self.assertEqual(_as_size("123"), 123)
+        self.assertEqual(_as_size("200G"), 200 * 10**9)
+        self.assertEqual(_as_size("1.5TB"), 1_500 * 10**9)
+        self.assertEqual(_as_size("512MiB"), 512 * 1024**2)
+        self.assertEqual(_as_size("10 kb"), 10_000)
+        with self.assertRaises(ValueError):
+            _as_size("a lot")
+
+
+class TestAsCacheTiers(unittest.TestCase):
+    def test_as_cache_tiers(self) -> None:
+        self.assertEqual(_as_cache_tiers(None), [])
+        self.assertEqual(
+            _as_cache_tiers(os.pathsep.join(["/nvme/hf=200G", "/nfs/hf", ""])),
+            [("/nvme/hf", 200 * 10**9), ("/nfs/hf", None)],
+        )
@@ -4,7 +4,7 @@ from hashlib import sha256
 from io import BytesIO
 
 from huggingface_hub.utils import SoftTemporaryDirectory
-from huggingface_hub.utils.sha import sha_fileobj
+from huggingface_hub.utils.sha import sha_file, sha_fileobj
 
 
 class TestShaUtils(unittest.TestCase):
@@ -29,3 +29,14 @@ class TestShaUtils(unittest.TestCase):
             self.assertEqual(sha_fileobj(BytesIO(content), None), sha)
             self.assertEqual(sha_fileobj(BytesIO(content), 50), sha)
             self.assertEqual(sha_fileobj(BytesIO(content), 50_000), sha)
+
+    def test_sha_file(self):
+        with SoftTemporaryDirectory() as tmpdir:
+            content = b"Random content" * 1000
+            filepath = os.path.join(tmpdir, "file.bin")
+            with open(filepath, "wb") as file:
+                file.write(content)
+
+            self.assertEqual(sha_file(filepath), sha256(content).digest())
+            self.assertEqual(sha_file(filepath, 50), sha256(content).digest())
+            self.assertEqual(sha_file(filepath, 14_000), sha256(content).digest())  # exact multiple
@@ -0,0 +1,165 @@
+import io
+import threading
+import unittest
+from pathlib import Path
+from typing import Iterable, List
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from huggingface_hub.file_download import _hf_hub_download_blob_to_cache_dir, http_get
+from huggingface_hub.utils import (
+    TransferEvent,
+    add_transfer_callback,
+    http_backoff,
+    remove_transfer_callback,
+    track_transfer,
+    transfer_callback,
+    transfer_job,
+    with_current_context,
+)
+
+
+class TestTransferEvents(unittest.TestCase):
+    def test_track_transfer(self) -> None:
+        events: List[TransferEvent] = []
+        with transfer_callback(events.append), transfer_job(name="my-job"):
+            with track_transfer("download", name="file.bin", url="https://url", total=10) as tracker:
+                tracker.update(4)
+                tracker.retry("connection reset")
+                tracker.update(6)
+
+        self.assertEqual(
+            [event.type for event in events], ["start", "first_byte", "progress", "retry", "progress", "complete"]
+        )
+        self.assertEqual([event.nbytes for event in events if event.type == "progress"], [4, 6])
+        self.assertEqual(events[3].reason, "connection reset")
+        complete = events[-1]
+        self.assertEqual(complete.direction, "download")
+        self.assertEqual(complete.name, "file.bin")
+        self.assertEqual(complete.job, "my-job")
+        self.assertEqual(complete.transferred, 10)
+        self.assertEqual(complete.total, 10)
+        self.assertGreaterEqual(complete.elapsed, events[1].elapsed)  # time to first byte
+
+    def test_error_event(self) -> None:
+        events: List[TransferEvent] = []
+        with transfer_callback(events.append):
+            with self.assertRaises(ValueError):
+                with track_transfer("upload", name="file.bin"):
+                    raise ValueError("boom")
+        self.assertEqual([event.type for event in events], ["start", "error"])
+        self.assertEqual(events[-1].reason, "ValueError: boom")
+
+    def test_global_callback(self) -> None:
+        events: List[TransferEvent] = []
+        add_transfer_callback(events.append)
+        try:
+            with track_transfer("download"):
+                pass
+        finally:
+            remove_transfer_callback(events.append)
+        with track_transfer("download"):
+            pass
+        self.assertEqual([event.type for event in events], ["start", "complete"])
+
+    def test_context_callback_propagates_to_threads(self) -> None:
+        events: List[TransferEvent] = []
+
+        def _transfer() -> None:
+            with track_transfer("download", name="in-thread"):
+                pass
+
+        with transfer_callback(events.append):
+            thread = threading.Thread(target=with_current_context(_transfer))
+            thread.start()
+            thread.join()
+        _transfer()  # outside of the context => not reported
+
+        self.assertEqual([event.name for event in events], ["in-thread", "in-thread"])
+
+    def test_callback_errors_are_ignored(self) -> None:
+        def _failing_callback(event: TransferEvent) -> None:
+            raise RuntimeError("buggy callback")
+
+        events: List[TransferEvent] = []
+        with transfer_callback(_failing_callback), transfer_callback(events.append):
+            with self.assertLogs("huggingface_hub.utils._transfer_events", level="WARNING"):
+                with track_transfer("download"):
+                    pass
+        self.assertEqual(len(events), 2)  # other callbacks are still called
+
+
+class TestTransferEventsHooks(unittest.TestCase):
+    @patch("huggingface_hub.file_download.time.sleep")
+    @patch("huggingface_hub.file_download._request_wrapper")
+    def test_http_get_events(self, mock: Mock, mock_sleep: Mock) -> None:
+        def _iter_content_1() -> Iterable[bytes]:
+            yield b"0" * 10
+            raise requests.ReadTimeout("Fake ReadTimeout")
+
+        def _iter_content_2() -> Iterable[bytes]:
+            yield b"0" * 10
+
+        mock.return_value.headers = {"Content-Length": 10}
+        mock.return_value.iter_content.side_effect = [_iter_content_1(), _iter_content_2()]
+
+        events: List[TransferEvent] = []
+        with transfer_callback(events.append):
+            http_get("fake_url", temp_file=io.BytesIO(), expected_size=20, displayed_filename="file.bin")
+
+        self.assertEqual(
+            [event.type for event in events], ["start", "first_byte", "progress", "retry", "progress", "complete"]
+        )
+        self.assertEqual(events[3].reason, "Fake ReadTimeout (resuming at byte 10)")
+        self.assertEqual(events[-1].transferred, 20)
+        self.assertEqual(events[-1].name, "file.bin")
+
+    @patch("huggingface_hub.utils._http.time.sleep")
+    @patch("huggingface_hub.utils._http.get_session")
+    def test_http_backoff_reports_retries(self, mock_session: Mock, mock_sleep: Mock) -> None:
+        response_503, response_200 = Mock(status_code=503), Mock(status_code=200)
+        mock_session().request.side_effect = [response_503, response_200]
+
+        events: List[TransferEvent] = []
+        with transfer_callback(events.append), track_transfer("upload", name="file.bin"):
+            http_backoff("PUT", "fake_url", retry_on_status_codes=503)
+        self.assertEqual([event.type for event in events], ["start", "retry", "complete"])
+        self.assertEqual(events[1].reason, "HTTP Error 503 [Retry 1/5]")
+
+
+@pytest.mark.usefixtures("fx_cache_dir")
+class TestCacheEvents(unittest.TestCase):
+    cache_dir: Path
+
+    def _download(self) -> str:
+        return _hf_hub_download_blob_to_cache_dir(
+            cache_dir=str(self.cache_dir),
+            repo_id="user/repo",
+            repo_type="model",
+            filename="file.bin",
+            revision="main",
+            commit_hash="a" * 40,
+            etag="b" * 40,
+            url_to_download="fake_url",
+            expected_size=4,
+            headers={},
+            proxies=None,
+            force_download=False,
+        )
+
+    def test_cache_miss_then_hit(self) -> None:
+        def _fake_download(incomplete_path: Path, destination_path: Path, **kwargs) -> None:
+            destination_path.write_bytes(b"data")
+
+        events: List[TransferEvent] = []
+        with transfer_callback(events.append):
+            with patch("huggingface_hub.file_download._download_to_tmp_and_move", side_effect=_fake_download):
+                self._download()
+            self._download()
+
+        self.assertEqual([event.type for event in events], ["cache_miss", "cache_hit"])
+        self.assertEqual(events[0].repo_id, "user/repo")
+        self.assertEqual(events[0].name, "file.bin")
+        self.assertEqual(events[0].total, 4)
@@ -0,0 +1,162 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from huggingface_hub.utils import (
+    TransferJob,
+    TransferScheduler,
+    configure_transfer_scheduler,
+    default_transfer_job,
+    get_current_transfer_job,
+    get_transfer_scheduler,
+    transfer_job,
+    with_current_context,
+)
+from huggingface_hub.utils._transfer_scheduler import _ThreadWaiter
+
+
+class TestTransferScheduler(unittest.TestCase):
+    def test_no_limit_is_noop(self) -> None:
+        scheduler = TransferScheduler()
+        with scheduler.connection(), scheduler.connection():
+            self.assertEqual(scheduler._active_connections, 0)
+        with patch("huggingface_hub.utils._transfer_scheduler.time.sleep") as mock_sleep:
+            scheduler.throttle(10**9)
+        mock_sleep.assert_not_called()
+
+    def test_max_connections(self) -> None:
+        scheduler = TransferScheduler(max_connections=2)
+        max_concurrent = 0
+        lock = threading.Lock()
+
+        def _transfer(_: int) -> None:
+            nonlocal max_concurrent
+            with scheduler.connection():
+                with lock:
+                    max_concurrent = max(max_concurrent, scheduler._active_connections)
+                threading.Event().wait(0.01)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(_transfer, range(16)))
+
+        self.assertEqual(max_concurrent, 2)
+        self.assertEqual(scheduler._active_connections, 0)
+
+    def test_connection_is_reentrant(self) -> None:
+        scheduler = TransferScheduler(max_connections=1)
+        with scheduler.connection():
+            with scheduler.connection():  # would deadlock if not reentrant
+                self.assertEqual(scheduler._active_connections, 1)
+        self.assertEqual(scheduler._active_connections, 0)
+
+    def test_priority_and_fairness(self) -> None:
+        scheduler = TransferScheduler(max_connections=1)
+        job_a = TransferJob(name="a")
+        job_b = TransferJob(name="b")
+        job_urgent = TransferJob(priority=10)
+
+        # Job A holds the only slot
+        self.assertTrue(scheduler._try_acquire(_ThreadWaiter(job_a, 0)))
+
+        waiter_a = _ThreadWaiter(job_a, 1)
+        waiter_b = _ThreadWaiter(job_b, 2)
+        waiter_urgent = _ThreadWaiter(job_urgent, 3)
+        for waiter in (waiter_a, waiter_b, waiter_urgent):
+            self.assertFalse(scheduler._try_acquire(waiter))
+
+        # Highest priority first
+        scheduler._release(job_a)
+        self.assertTrue(waiter_urgent.event.is_set())
+        self.assertFalse(waiter_a.event.is_set())
+
+        # Then job B: it holds fewer connections than job A
+        # (job A is given a connection back to check that fairness is computed on active connections)
+        job_a.active_connections += 1
+        scheduler._release(job_urgent)
+        self.assertTrue(waiter_b.event.is_set())
+        self.assertFalse(waiter_a.event.is_set())
+
+        job_a.active_connections -= 1
+        scheduler._release(job_b)
+        self.assertTrue(waiter_a.event.is_set())
+
+    def test_throttle(self) -> None:
+        scheduler = TransferScheduler(max_bandwidth=1000)
+        with patch("huggingface_hub.utils._transfer_scheduler.time.sleep") as mock_sleep, patch(
+            "huggingface_hub.utils._transfer_scheduler.time.monotonic", return_value=scheduler._last_refill
+        ):
+            scheduler.throttle(1000)  # burst of 1 second is allowed
+            mock_sleep.assert_not_called()
+
+            scheduler.throttle(500)  # bucket is empty => wait for 500 bytes
+            mock_sleep.assert_called_once_with(0.5)
+
+    def test_throttled_reads(self) -> None:
+        scheduler = TransferScheduler(max_bandwidth=1000)
+        with open(__file__, "rb") as f:
+            original_read = f.read
+            with patch.object(scheduler, "throttle") as mock_throttle:
+                with scheduler.throttled_reads(f) as throttled:
+                    data = throttled.read(100)
+                mock_throttle.assert_called_once_with(len(data))
+            self.assertEqual(f.read, original_read)
+
+
+class TestTransferJob(unittest.TestCase):
+    def test_transfer_job_context(self) -> None:
+        self.assertIsNone(get_current_transfer_job())
+        with transfer_job(priority=5, name="my-job") as job:
+            self.assertIs(get_current_transfer_job(), job)
+            self.assertEqual(job.priority, 5)
+
+            # Default job reuses the current one
+            with default_transfer_job() as default_job:
+                self.assertIs(default_job, job)
+        self.assertIsNone(get_current_transfer_job())
+
+        with default_transfer_job(name="new") as default_job:
+            self.assertEqual(default_job.priority, 0)
+            self.assertEqual(default_job.name, "new")
+
+    def test_with_current_context_propagates_job_to_threads(self) -> None:
+        with transfer_job() as job:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                jobs = list(executor.map(with_current_context(lambda _: get_current_transfer_job()), range(4)))
+                jobs_without_context = list(executor.map(lambda _: get_current_transfer_job(), range(4)))
+        self.assertTrue(all(worker_job is job for worker_job in jobs))
+        self.assertTrue(all(worker_job is None for worker_job in jobs_without_context))
+
+    def test_configure_transfer_scheduler(self) -> None:
+        previous = get_transfer_scheduler()
+        try:
+            scheduler = configure_transfer_scheduler(max_connections=4, max_bandwidth=100)
+            self.assertIs(get_transfer_scheduler(), scheduler)
+            self.assertEqual(scheduler.max_connections, 4)
+            self.assertEqual(scheduler.max_bandwidth, 100)
+        finally:
+            configure_transfer_scheduler(
+                max_connections=previous.max_connections, max_bandwidth=previous.max_bandwidth
+            )
+
+
+@pytest.mark.asyncio
+async def test_aconnection_waits_without_blocking_and_can_be_cancelled() -> None:
+    scheduler = TransferScheduler(max_connections=1)
+    with scheduler.connection():
+        # Slot is held => waiting task is blocked but the event loop is not
+        task = asyncio.ensure_future(scheduler.aconnection().__aenter__())
+        await asyncio.sleep(0.01)
+        assert not task.done()
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert scheduler._waiters == []
+
+    async with scheduler.aconnection():
+        assert scheduler._active_connections == 1
+    assert scheduler._active_connections == 0